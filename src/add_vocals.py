@@ -94,15 +94,14 @@ def mix_vocals_with_music(music_file, lyrics, output_file=None,
     # Müziği yükle
     music_sr, music_audio = wavfile.read(music_file)
     
-    # Mono'ya çevir
-    if len(music_audio.shape) > 1:
-        music_audio = np.mean(music_audio, axis=1)
-    
+    # Float32, stereo ise [channels, samples] (kanallar korunur)
     music_audio = music_audio.astype(np.float32)
+    if music_audio.ndim > 1:
+        music_audio = music_audio.T
     if np.max(np.abs(music_audio)) > 0:
         music_audio = music_audio / np.max(np.abs(music_audio))
     
-    music_duration = len(music_audio) / music_sr
+    music_samples = music_audio.shape[-1]
     
     # TTS ile konuşma üret
     if not GTTS_AVAILABLE:
@@ -136,17 +135,16 @@ def mix_vocals_with_music(music_file, lyrics, output_file=None,
             num_samples = int(len(speech_audio) * music_sr / speech_sr)
             speech_audio = signal.resample(speech_audio, num_samples)
         
-        # Süreyi ayarla
-        speech_duration = len(speech_audio) / music_sr
-        if speech_duration > music_duration:
+        # Süreyi ayarla (örnek sayısı müzikle birebir aynı olmalı)
+        if len(speech_audio) > music_samples:
             # Kısalt
-            speech_audio = speech_audio[:int(music_duration * music_sr)]
-        elif speech_duration < music_duration:
-            # Uzat (sessizlik ekle veya loop)
-            silence = np.zeros(int((music_duration - speech_duration) * music_sr))
+            speech_audio = speech_audio[:music_samples]
+        elif len(speech_audio) < music_samples:
+            # Uzat (sessizlik ekle)
+            silence = np.zeros(music_samples - len(speech_audio))
             speech_audio = np.concatenate([speech_audio, silence])
         
-        # Mix
+        # Mix (mono vokal tüm müzik kanallarına, ortada)
         print("🎵 Mixing vocals with music...")
         mixed = (music_audio * music_volume + speech_audio * vocal_volume)
         
@@ -160,6 +158,8 @@ def mix_vocals_with_music(music_file, lyrics, output_file=None,
             output_file = f"{base_name}_with_vocals.wav"
         
         audio_int16 = (mixed * 32767).astype(np.int16)
+        if audio_int16.ndim > 1:
+            audio_int16 = audio_int16.T
         wavfile.write(output_file, music_sr, audio_int16)
         
         print(f"✅ Saved: {output_file}")
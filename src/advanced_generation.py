@@ -9,7 +9,8 @@ from prompt_enhancer import get_mastering_preset_for_genre
 def advanced_generate(instruments, genre, output_dir='output', duration=30,
                      model_size='medium', tempo=None, style=None, mood=None,
                      additional=None, guidance_scale=3.5, num_generations=3,
-                     auto_master=True, seed=None):
+                     auto_master=True, seed=None, batch_variations=False,
+                     scorer='energy'):
     """
     Gelişmiş müzik üretimi - Tüm iyileştirmeleri kullanır
     
@@ -27,6 +28,8 @@ def advanced_generate(instruments, genre, output_dir='output', duration=30,
         num_generations: int - Kaç farklı versiyon üret (3 = en iyisini seç)
         auto_master: bool - Otomatik mastering
         seed: int - Random seed
+        batch_variations: bool - Tüm varyasyonları tek batch çağrısında üret
+        scorer: str - En iyi varyasyon seçme kriteri ('energy', 'loudness', 'flatness', 'clap')
     """
     print("="*70)
     print("🚀 ADVANCED MUSIC GENERATION")
@@ -65,7 +68,9 @@ def advanced_generate(instruments, genre, output_dir='output', duration=30,
         guidance_scale=guidance_scale,
         num_generations=num_generations,
         seed=seed,
-        prompt_style='detailed'
+        prompt_style='detailed',
+        batch_variations=batch_variations,
+        scorer=scorer
     )
     
     if result:
@@ -118,6 +123,11 @@ def main():
                        help='Random seed (reproducible results)')
     parser.add_argument('--no-master', action='store_true',
                        help='Mastering uygulama')
+    parser.add_argument('--batch-variations', action='store_true',
+                       help='Tüm varyasyonları tek bir batch çağrısında üret')
+    parser.add_argument('--scorer', type=str, default='energy',
+                       choices=['energy', 'loudness', 'flatness', 'clap'],
+                       help='En iyi varyasyonu seçme kriteri')
     
     args = parser.parse_args()
     
@@ -136,7 +146,9 @@ def main():
         guidance_scale=args.guidance,
         num_generations=args.variations,
         auto_master=not args.no_master,
-        seed=args.seed
+        seed=args.seed,
+        batch_variations=args.batch_variations,
+        scorer=args.scorer
     )
 
 if __name__ == '__main__':
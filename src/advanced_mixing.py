@@ -5,141 +5,131 @@ Reverb, EQ, compression, stereo widening vb.
 
 import numpy as np
 import scipy.io.wavfile as wavfile
-from scipy import signal
 import argparse
 import os
 
-def apply_reverb(audio, sample_rate, room_size=0.5, damping=0.5, wet_level=0.3):
+from compressor import compress
+from eq_bank import apply_eq_bank, three_band
+from loudness import measure_loudness
+from reverb import ROOM_PRESETS, convolution_reverb
+
+# Bu süreden uzun dosyalar otomatik olarak blok blok (streaming) işlenir
+STREAMING_MIN_SECONDS = 600
+
+def apply_reverb(audio, sample_rate, room_size=0.5, damping=0.5, wet_level=0.3, preset=None, ir_file=None):
     """
-    Reverb (yankı) efekti ekler
+    Reverb (yankı) efekti ekler (FFT konvolüsyon, bkz. reverb.py)
     
     Args:
-        audio: Audio array
+        audio: Audio array ([samples] veya [channels, samples])
         sample_rate: Sample rate
         room_size: Oda boyutu (0-1)
         damping: Sönümleme (0-1)
         wet_level: Reverb seviyesi (0-1)
+        preset: Oda preset'i (small, room, hall, plate) - room_size/damping yerine
+        ir_file: Impulse response dosyası - sentetik IR yerine
     """
-    # Basit reverb (impulse response simülasyonu)
-    delay_samples = int(sample_rate * 0.03 * room_size)  # 30ms base delay
-    decay = 1.0 - damping
-    
-    # Delay lines
-    delays = [int(delay_samples * (1 + i * 0.3)) for i in range(3)]
-    reverb_signal = np.zeros_like(audio)
-    
-    for delay in delays:
-        if delay < len(audio):
-            delayed = np.zeros_like(audio)
-            delayed[delay:] = audio[:-delay] * (decay ** (delay / delay_samples))
-            reverb_signal += delayed * 0.3
-    
-    # Mix
-    wet = reverb_signal * wet_level
-    dry = audio * (1 - wet_level)
-    return dry + wet
+    return convolution_reverb(audio, sample_rate, room_size=room_size, damping=damping,
+                              wet_level=wet_level, preset=preset, ir_file=ir_file)
 
-def apply_eq(audio, sample_rate, bass_boost=0, mid_boost=0, treble_boost=0):
+def apply_eq(audio, sample_rate, bass_boost=0, mid_boost=0, treble_boost=0, chunk_size=None):
     """
     EQ (Equalizer) uygular
     
     Args:
-        audio: Audio array
+        audio: Audio array (mono veya [channels, samples])
         sample_rate: Sample rate
         bass_boost: Bas boost (dB)
         mid_boost: Orta frekans boost (dB)
         treble_boost: Tiz boost (dB)
+        chunk_size: Uzun dosyalar için blok boyutu (örnek, nedensel filtre)
     """
-    nyquist = sample_rate / 2
-    
-    # Bas (20-250 Hz)
-    if bass_boost != 0:
-        low = 250 / nyquist
-        b, a = signal.butter(4, low, btype='low')
-        bass = signal.filtfilt(b, a, audio)
-        audio = audio + bass * (10 ** (bass_boost / 20) - 1)
-    
-    # Orta (250-4000 Hz)
-    if mid_boost != 0:
-        low = 250 / nyquist
-        high = 4000 / nyquist
-        b, a = signal.butter(4, [low, high], btype='band')
-        mid = signal.filtfilt(b, a, audio)
-        audio = audio + mid * (10 ** (mid_boost / 20) - 1)
-    
-    # Tiz (4000+ Hz)
-    if treble_boost != 0:
-        high = 4000 / nyquist
-        b, a = signal.butter(4, high, btype='high')
-        treble = signal.filtfilt(b, a, audio)
-        audio = audio + treble * (10 ** (treble_boost / 20) - 1)
-    
-    return audio
+    # Bas (<250 Hz) low shelf, orta (250-4000 Hz) peak, tiz (>4000 Hz) high shelf - tek SOS geçişi
+    bands = three_band(bass_boost, mid_boost, treble_boost)
+    return apply_eq_bank(audio, sample_rate, bands, chunk_size=chunk_size)
 
-def apply_compression(audio, threshold=0.7, ratio=4.0, attack=0.003, release=0.1, sample_rate=32000):
+def apply_compression(audio, threshold=0.7, ratio=4.0, attack=0.003, release=0.1, sample_rate=32000,
+                      lookahead=0.0, stereo_link=True):
     """
     Kompresyon uygular (dinamik aralık kontrolü)
     
     Args:
-        audio: Audio array
+        audio: Audio array (mono veya [channels, samples])
         threshold: Eşik değeri (0-1)
         ratio: Kompresyon oranı (örn: 4:1)
         attack: Saldırı süresi (saniye)
         release: Bırakma süresi (saniye)
         sample_rate: Sample rate
+        lookahead: İleri bakma süresi (saniye)
+        stereo_link: Çok kanallı sinyalde tüm kanallara aynı kazanç
     """
-    # Basit kompresör
-    compressed = np.copy(audio)
-    
-    attack_samples = int(attack * sample_rate)
-    release_samples = int(release * sample_rate)
-    
-    envelope = np.abs(audio)
-    gain_reduction = np.ones_like(audio)
-    
-    for i in range(1, len(audio)):
-        if envelope[i] > threshold:
-            # Kompresyon
-            excess = envelope[i] - threshold
-            reduced_excess = excess / ratio
-            target_level = threshold + reduced_excess
-            reduction = target_level / envelope[i] if envelope[i] > 0 else 1.0
-            
-            # Attack
-            if gain_reduction[i-1] > reduction:
-                gain_reduction[i] = gain_reduction[i-1] - (gain_reduction[i-1] - reduction) / attack_samples
-            else:
-                gain_reduction[i] = reduction
+    # Vektörel kompresör (örnek döngüsü yok)
+    return compress(audio, threshold=threshold, ratio=ratio, attack=attack, release=release,
+                    sample_rate=sample_rate, lookahead=lookahead, stereo_link=stereo_link)
+
+class StereoWidener:
+    """
+    Mid/side stereo genişletici (blok blok kullanılabilir)
+
+    Stereo girişte side sinyali width ile ölçeklenir. Mono girişte side sinyali
+    gecikmeli mid'den üretilir (Lauridsen pseudo-stereo); L + R her iki durumda da
+    2 * mid olduğu için mono uyumluluğu korunur.
+    """
+
+    def __init__(self, sample_rate, width=1.5, delay=0.012):
+        """
+        Args:
+            sample_rate: Sample rate
+            width: Genişlik (1.0 = normal, >1.0 = daha geniş)
+            delay: Mono giriş için side gecikmesi (saniye)
+        """
+        self.width = width
+        self.delay_samples = max(1, int(delay * sample_rate))
+        self.history = np.zeros(self.delay_samples, dtype=np.float32)
+
+    def _delayed(self, mid):
+        extended = np.concatenate([self.history, mid])
+        self.history = extended[-self.delay_samples:]
+        return extended[:len(mid)]
+
+    def process(self, block):
+        """
+        Bir bloğu genişletir
+
+        Args:
+            block: [samples] (mono) veya [channels, samples]
+
+        Returns:
+            [2, samples] stereo blok
+        """
+        if block.ndim == 2 and block.shape[0] == 2:
+            mid = (block[0] + block[1]) / 2
+            side = (block[0] - block[1]) / 2 * self.width
         else:
-            # Release
-            if gain_reduction[i-1] < 1.0:
-                gain_reduction[i] = gain_reduction[i-1] + (1.0 - gain_reduction[i-1]) / release_samples
-            else:
-                gain_reduction[i] = 1.0
-    
-    return audio * gain_reduction
+            mid = block if block.ndim == 1 else block.mean(axis=0)
+            side = self._delayed(mid) * min(max(self.width - 1.0, 0.0), 1.0) * 0.5
+        return np.stack([mid + side, mid - side]).astype(block.dtype, copy=False)
 
-def apply_stereo_widening(audio, width=1.5):
+def apply_stereo_widening(audio, width=1.5, sample_rate=32000):
     """
-    Stereo genişletme (mono'yu stereo'ya çevirir ve genişletir)
+    Stereo genişletme (mid/side; mono giriş pseudo-stereo'ya çevrilir)
     
     Args:
-        audio: Mono audio array
+        audio: [samples] (mono) veya [channels, samples]
         width: Genişlik (1.0 = normal, >1.0 = daha geniş)
-    """
-    # Basit stereo widening
-    left = audio * (1.0 + width) / 2
-    right = audio * (1.0 - width) / 2
+        sample_rate: Sample rate
     
-    stereo = np.array([left, right]).T
-    return stereo
+    Returns:
+        [2, samples] stereo audio
+    """
+    return StereoWidener(sample_rate, width).process(audio)
 
 def apply_limiter(audio, ceiling=0.95):
     """
     Limiter (peak kontrolü)
     
     Args:
-        audio: Audio array
+        audio: Audio array (herhangi bir şekil)
         ceiling: Maksimum seviye (0-1)
     """
     max_val = np.max(np.abs(audio))
@@ -147,35 +137,47 @@ def apply_limiter(audio, ceiling=0.95):
         audio = audio * (ceiling / max_val)
     return audio
 
-def normalize_audio(audio, target_lufs=-14.0):
+def normalize_audio(audio, target_lufs=-14.0, sample_rate=None, ceiling=0.95):
     """
-    Normalize (LUFS hedefleme - basit versiyon)
+    Normalize (LUFS hedefleme)
     
     Args:
-        audio: Audio array
+        audio: Audio array ([samples] veya [channels, samples])
         target_lufs: Hedef LUFS seviyesi (genelde -14 to -16)
+        sample_rate: Verilirse BS.1770 integrated loudness + true-peak kullanılır,
+                     verilmezse basit RMS normalizasyon
+        ceiling: Maksimum (true-)peak seviyesi (0-1)
     """
-    # Basit RMS normalizasyon
-    rms = np.sqrt(np.mean(audio ** 2))
-    if rms > 0:
-        target_rms = 10 ** (target_lufs / 20)
-        audio = audio * (target_rms / rms)
+    if sample_rate is None:
+        # Basit RMS normalizasyon
+        rms = np.sqrt(np.mean(audio ** 2))
+        if rms > 0:
+            target_rms = 10 ** (target_lufs / 20)
+            audio = audio * (target_rms / rms)
+        peak = np.max(np.abs(audio))
+    else:
+        measurement = measure_loudness(audio, sample_rate)
+        gain = 1.0
+        if np.isfinite(measurement['integrated_lufs']):
+            gain = 10 ** ((target_lufs - measurement['integrated_lufs']) / 20)
+        audio = audio * gain
+        peak = 10 ** (measurement['true_peak_dbtp'] / 20) * gain
     
     # Peak kontrolü
-    if np.max(np.abs(audio)) > 0.95:
-        audio = audio * (0.95 / np.max(np.abs(audio)))
+    if peak > ceiling:
+        audio = audio * (ceiling / peak)
     
     return audio
 
 def master_audio(audio, sample_rate, 
                  bass_boost=2.0, mid_boost=0, treble_boost=1.0,
                  compression=True, reverb=True, stereo_widen=True,
-                 target_lufs=-14.0):
+                 target_lufs=-14.0, reverb_preset=None, reverb_ir=None):
     """
     Tam mastering pipeline
     
     Args:
-        audio: Audio array
+        audio: Audio array ([samples] veya [channels, samples], kanallar ayrı işlenir)
         sample_rate: Sample rate
         bass_boost: Bas boost (dB)
         mid_boost: Orta boost (dB)
@@ -184,6 +186,8 @@ def master_audio(audio, sample_rate,
         reverb: Reverb ekle
         stereo_widen: Stereo genişletme
         target_lufs: Hedef LUFS seviyesi
+        reverb_preset: Reverb oda preset'i (None = küçük oda)
+        reverb_ir: Reverb impulse response dosyası
     """
     print("🎚️  Mastering audio...")
     
@@ -200,13 +204,21 @@ def master_audio(audio, sample_rate,
     # 3. Reverb
     if reverb:
         print("   → Adding reverb...")
-        audio = apply_reverb(audio, sample_rate, room_size=0.3, wet_level=0.15)
+        audio = apply_reverb(audio, sample_rate, room_size=0.3, wet_level=0.15,
+                             preset=reverb_preset, ir_file=reverb_ir)
+    
+    # 4. Stereo genişletme (normalizasyon/limiter genişletilmiş sinyale uygulanır)
+    if stereo_widen:
+        print("   → Applying stereo widening...")
+        audio = apply_stereo_widening(audio, width=1.3, sample_rate=sample_rate)
     
-    # 4. Normalize
+    # 5. Normalize
     print("   → Normalizing...")
-    audio = normalize_audio(audio, target_lufs=target_lufs)
+    audio = normalize_audio(audio, target_lufs=target_lufs, sample_rate=sample_rate)
+    measurement = measure_loudness(audio, sample_rate)
+    print(f"     {measurement['integrated_lufs']:.1f} LUFS, {measurement['true_peak_dbtp']:.1f} dBTP")
     
-    # 5. Limiter
+    # 6. Limiter
     print("   → Applying limiter...")
     audio = apply_limiter(audio, ceiling=0.95)
     
@@ -215,7 +227,8 @@ def master_audio(audio, sample_rate,
 def process_audio_advanced(input_file, output_file=None,
                          bass_boost=2.0, mid_boost=0, treble_boost=1.0,
                          compression=True, reverb=True, stereo_widen=False,
-                         target_lufs=-14.0):
+                         target_lufs=-14.0, streaming=None, block_size=65536,
+                         reverb_preset=None, reverb_ir=None):
     """
     Gelişmiş audio işleme
     
@@ -229,45 +242,52 @@ def process_audio_advanced(input_file, output_file=None,
         reverb: Reverb
         stereo_widen: Stereo genişletme
         target_lufs: Hedef LUFS
+        streaming: Blok blok işle (bellek sabit). None = STREAMING_MIN_SECONDS'tan uzunsa otomatik
+        block_size: Streaming blok boyutu (örnek)
+        reverb_preset: Reverb oda preset'i
+        reverb_ir: Reverb impulse response dosyası
     """
+    if streaming is None:
+        import soundfile as sf
+        streaming = sf.info(input_file).duration > STREAMING_MIN_SECONDS
+    if streaming:
+        from streaming_mastering import master_file_streaming
+        return master_file_streaming(
+            input_file, output_file,
+            bass_boost=bass_boost, mid_boost=mid_boost, treble_boost=treble_boost,
+            compression=compression, reverb=reverb, stereo_widen=stereo_widen,
+            target_lufs=target_lufs, block_size=block_size,
+            reverb_preset=reverb_preset, reverb_ir=reverb_ir
+        )
+    
     # Dosyayı oku
     sample_rate, audio = wavfile.read(input_file)
     
-    # Mono'ya çevir (işleme için)
-    is_stereo = len(audio.shape) > 1
-    if is_stereo:
-        audio_mono = np.mean(audio, axis=1)
-    else:
-        audio_mono = audio
-    
-    # Float32'ye çevir
-    audio_mono = audio_mono.astype(np.float32)
-    if np.max(np.abs(audio_mono)) > 0:
-        audio_mono = audio_mono / np.max(np.abs(audio_mono))
+    # Float32, [channels, samples] (stereo kanallar birlikte işlenir)
+    audio = audio.astype(np.float32)
+    if audio.ndim > 1:
+        audio = audio.T
+    if np.max(np.abs(audio)) > 0:
+        audio = audio / np.max(np.abs(audio))
     
     # Mastering
     processed = master_audio(
-        audio_mono, sample_rate,
+        audio, sample_rate,
         bass_boost=bass_boost,
         mid_boost=mid_boost,
         treble_boost=treble_boost,
         compression=compression,
         reverb=reverb,
-        stereo_widen=False,  # Önce mono işle
-        target_lufs=target_lufs
+        stereo_widen=stereo_widen,
+        target_lufs=target_lufs,
+        reverb_preset=reverb_preset,
+        reverb_ir=reverb_ir
     )
     
-    # Stereo genişletme (eğer istenirse)
-    if stereo_widen:
-        print("   → Applying stereo widening...")
-        processed = apply_stereo_widening(processed, width=1.3)
-        is_stereo = True
-    
-    # Int16'ya çevir
-    if is_stereo:
-        audio_int16 = (processed * 32767).astype(np.int16)
-    else:
-        audio_int16 = (processed * 32767).astype(np.int16)
+    # Int16'ya çevir ([samples, channels] dosya düzeni)
+    audio_int16 = (processed * 32767).astype(np.int16)
+    if audio_int16.ndim > 1:
+        audio_int16 = audio_int16.T
     
     # Çıktı dosya adı
     if output_file is None:
@@ -291,6 +311,12 @@ def main():
     parser.add_argument('--no-reverb', action='store_true', help='Disable reverb')
     parser.add_argument('--stereo-widen', action='store_true', help='Enable stereo widening')
     parser.add_argument('--target-lufs', type=float, default=-14.0, help='Target LUFS level')
+    parser.add_argument('--reverb-preset', type=str, default=None, choices=list(ROOM_PRESETS),
+                       help='Reverb room preset')
+    parser.add_argument('--reverb-ir', type=str, default=None, help='Reverb impulse response file')
+    parser.add_argument('--streaming', action='store_true',
+                       help=f'Process in fixed-size blocks (automatic for files over {STREAMING_MIN_SECONDS}s)')
+    parser.add_argument('--block-size', type=int, default=65536, help='Streaming block size (samples)')
     
     args = parser.parse_args()
     
@@ -303,7 +329,11 @@ def main():
         compression=not args.no_compression,
         reverb=not args.no_reverb,
         stereo_widen=args.stereo_widen,
-        target_lufs=args.target_lufs
+        target_lufs=args.target_lufs,
+        streaming=True if args.streaming else None,
+        block_size=args.block_size,
+        reverb_preset=args.reverb_preset,
+        reverb_ir=args.reverb_ir
     )
 
 if __name__ == '__main__':
@@ -5,14 +5,19 @@ sonra benzer müzik üretir
 """
 
 import numpy as np
-import librosa
 import scipy.io.wavfile as wavfile
 from scipy import signal
 import argparse
 import os
 import re
 import tempfile
-import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from audio_features import KARADENIZ_BANDS, FeatureContext
+from audio_io import audio_duration, decode_ffmpeg, load_audio, load_segment
+from cache_utils import get_cache_dir, text_hash
+from media_tools import find_ffmpeg
 
 # Enstrüman frekans aralıkları (Hz)
 INSTRUMENT_FREQUENCIES = {
@@ -38,6 +43,13 @@ INSTRUMENT_FREQUENCIES = {
     'accordion': (100, 3000),  # Akordeon - geniş aralık
 }
 
+# analyze_audio_multiple_segments bölüm yerleşimleri
+SEGMENT_PLACEMENTS = ('even', 'start')
+
+# YouTube bölümleri: mono, bu hızda WAV olarak önbelleğe yazılır
+YOUTUBE_SAMPLE_RATE = 44100
+YOUTUBE_CACHE_DIR = 'youtube_audio'
+
 # Müzik türü karakteristikleri
 GENRE_CHARACTERISTICS = {
     'rock': {
@@ -93,33 +105,89 @@ GENRE_CHARACTERISTICS = {
     }
 }
 
-def is_youtube_url(url):
-    """YouTube URL kontrolü"""
+def youtube_video_id(url):
+    """YouTube URL'sinden 11 karakterlik video ID'si (YouTube URL'si değilse None)"""
     youtube_patterns = [
         r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})',
         r'(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})',
         r'(?:https?://)?(?:www\.)?youtube\.com/v/([a-zA-Z0-9_-]{11})'
     ]
     for pattern in youtube_patterns:
-        if re.search(pattern, url):
-            return True
-    return False
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+def is_youtube_url(url):
+    """YouTube URL kontrolü"""
+    return youtube_video_id(url) is not None
+
+def youtube_cache_path(url, skip_seconds=5, max_duration=60, sample_rate=YOUTUBE_SAMPLE_RATE):
+    """
+    İndirilen bölümün önbellek yolu (aynı video + aralık = aynı dosya)
+
+    Args:
+        url: YouTube URL (watch / youtu.be / embed biçimleri aynı anahtarı verir)
+        skip_seconds: Bölüm başlangıcı (saniye)
+        max_duration: Bölüm süresi (saniye, None = sona kadar)
+        sample_rate: Çıkış sample rate
+    """
+    key = text_hash(youtube_video_id(url) or url, skip_seconds, max_duration, sample_rate)
+    return os.path.join(get_cache_dir(YOUTUBE_CACHE_DIR), f"{key[:32]}.wav")
+
+def _write_wav(path, y, sr):
+    """Mono 16-bit WAV'ı atomik yazar (yarım kalan dosya önbellekte görünmez)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    wavfile.write(tmp_path, sr, (np.clip(y, -1.0, 1.0) * 32767).astype(np.int16))
+    os.replace(tmp_path, path)
+
+def _stream_segment(info, skip_seconds, max_duration, sample_rate):
+    """Stream URL'sinden sadece istenen aralığı ffmpeg ile decode eder (-ss/-t, HTTP range)"""
+    duration = max_duration
+    if duration is None and info.get('duration'):
+        duration = max(info['duration'] - skip_seconds, 0)
+    return decode_ffmpeg(info['url'], offset=skip_seconds, duration=duration,
+                         sample_rate=sample_rate, headers=info.get('http_headers'))
+
+def _download_full(ydl, url, output_dir, skip_seconds, max_duration):
+    """ffmpeg yoksa / stream okunamazsa: tüm stream'i indirip aralığı keser"""
+    ydl.download([url])
+    files = [f for f in os.listdir(output_dir) if f.startswith('youtube_audio_temp.')]
+    if not files:
+        return None
+    downloaded_file = max((os.path.join(output_dir, f) for f in files), key=os.path.getmtime)
+    try:
+        return load_segment(downloaded_file, offset=skip_seconds, duration=max_duration)
+    finally:
+        try:
+            os.remove(downloaded_file)
+        except OSError:
+            pass
 
-def download_youtube_audio(url, output_dir=None, max_duration=60, skip_seconds=5):
+def download_youtube_audio(url, output_dir=None, max_duration=60, skip_seconds=5, use_cache=True):
     """
-    YouTube'dan audio indirir
+    YouTube'dan sadece analiz edilecek aralığı mono WAV olarak indirir
+    
+    Stream URL'si ffmpeg'e verilir; ffmpeg -ss ile seek edip sadece -t kadarını okur.
+    Sonuç video ID + aralık anahtarıyla önbelleklenir, aynı link tekrar indirilmez.
     
     Args:
         url: YouTube URL
-        output_dir: Çıktı klasörü (None ise temp)
+        output_dir: Geçici klasör (sadece ffmpeg yokken tam indirme için, None ise temp)
         max_duration: Maksimum süre (saniye) - analiz için ilk 60 saniye yeterli
         skip_seconds: Başlangıçtan kaç saniye atla (reklamları atlamak için)
+        use_cache: Önbellekteki bölümü kullan
     
     Returns:
         str: İndirilen dosya yolu
     """
     print(f"📥 Downloading audio from YouTube: {url}")
     
+    cache_file = youtube_cache_path(url, skip_seconds, max_duration)
+    if use_cache and os.path.exists(cache_file):
+        print(f"💾 Cached: {cache_file}")
+        return cache_file
+    
     try:
         import yt_dlp
     except ImportError:
@@ -133,39 +201,24 @@ def download_youtube_audio(url, output_dir=None, max_duration=60, skip_seconds=5
     else:
         os.makedirs(output_dir, exist_ok=True)
     
-    # Geçici dosya adı
-    output_file = os.path.join(output_dir, "youtube_audio_temp.%(ext)s")
-    
-    # yt-dlp options
-    output_file = os.path.join(output_dir, "youtube_audio_temp.%(ext)s")
-    
-    # FFmpeg kontrolü
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        has_ffmpeg = True
-    except:
-        has_ffmpeg = False
-        print("   ⚠️  FFmpeg not found. Will try to use original format or pydub.")
+    # FFmpeg kontrolü (process başına bir kez çözülür)
+    ffmpeg_cmd = find_ffmpeg()
+    if not ffmpeg_cmd:
+        print("   ⚠️  FFmpeg not found. Full stream will be downloaded and trimmed.")
     
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': output_file,
+        'outtmpl': os.path.join(output_dir, "youtube_audio_temp.%(ext)s"),
         'noplaylist': True,
         'quiet': False,
         'no_warnings': False,
     }
-    
-    # FFmpeg varsa post-processor ekle
-    if has_ffmpeg:
-        ydl_opts['postprocessors'] = [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'wav',
-            'preferredquality': '192',
-        }]
+    if ffmpeg_cmd:
+        ydl_opts['ffmpeg_location'] = ffmpeg_cmd
     
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Video bilgilerini al
+            # Video bilgileri ve stream URL'si (indirme yok)
             info = ydl.extract_info(url, download=False)
             video_title = info.get('title', 'Unknown')
             duration = info.get('duration', 0)
@@ -174,138 +227,27 @@ def download_youtube_audio(url, output_dir=None, max_duration=60, skip_seconds=5
             if duration:
                 print(f"   Duration: {duration}s")
             
-            # İndir
-            ydl.download([url])
-            
-            # İndirilen dosyayı bul
-            # yt-dlp genelde .wav'a çevirir
-            possible_extensions = ['wav', 'm4a', 'webm', 'mp3', 'opus']
-            downloaded_file = None
-            
-            for ext in possible_extensions:
-                temp_file = os.path.join(output_dir, f"youtube_audio_temp.{ext}")
-                if os.path.exists(temp_file):
-                    downloaded_file = temp_file
-                    break
-            
-            if not downloaded_file:
-                # Son çare: output_dir'deki son değiştirilen dosyayı bul
-                files = [f for f in os.listdir(output_dir) if 'youtube_audio_temp' in f]
-                if files:
-                    # En son değiştirilen dosyayı al
-                    files_with_time = [(f, os.path.getmtime(os.path.join(output_dir, f))) for f in files]
-                    files_with_time.sort(key=lambda x: x[1], reverse=True)
-                    downloaded_file = os.path.join(output_dir, files_with_time[0][0])
+            segment = None
+            if ffmpeg_cmd and info.get('url'):
+                try:
+                    segment = _stream_segment(info, skip_seconds, max_duration, YOUTUBE_SAMPLE_RATE)
+                    print(f"   ⏩ Fetched {skip_seconds}s-{skip_seconds + len(segment[0]) / segment[1]:.0f}s only")
+                except RuntimeError as e:
+                    print(f"   ⚠️  Range fetch failed: {str(e)[:200]}")
+                    print(f"   → Downloading full stream")
+            if segment is None:
+                segment = _download_full(ydl, url, output_dir, skip_seconds, max_duration)
             
-            if downloaded_file:
-                file_ext = os.path.splitext(downloaded_file)[1].lower()
-                
-                # Webm/m4a/mp3 formatındaysa WAV'a çevir
-                if file_ext in ['.webm', '.m4a', '.mp3', '.opus']:
-                    wav_file = downloaded_file.replace(file_ext, '.wav')
-                    print(f"   🔄 Converting {file_ext} to WAV...")
-                    
-                    # FFmpeg ile dönüştür (subprocess kullan)
-                    try:
-                        # FFmpeg yolunu bul
-                        ffmpeg_cmd = None
-                        
-                        # 1. PATH'te ara
-                        try:
-                            result = subprocess.run(['ffmpeg', '-version'], 
-                                                   capture_output=True, 
-                                                   timeout=5)
-                            if result.returncode == 0:
-                                ffmpeg_cmd = 'ffmpeg'
-                        except:
-                            pass
-                        
-                        # 2. Winget kurulum yolu (Windows)
-                        if not ffmpeg_cmd:
-                            import glob
-                            winget_pattern = os.path.expanduser(
-                                r'~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_*\ffmpeg-*\bin\ffmpeg.exe'
-                            )
-                            matches = glob.glob(winget_pattern)
-                            if matches:
-                                ffmpeg_cmd = matches[0]
-                        
-                        # 3. Common locations
-                        if not ffmpeg_cmd:
-                            common_paths = [
-                                r'C:\ffmpeg\bin\ffmpeg.exe',
-                                r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-                            ]
-                            for path in common_paths:
-                                if os.path.exists(path):
-                                    ffmpeg_cmd = path
-                                    break
-                        
-                        if not ffmpeg_cmd:
-                            raise Exception("FFmpeg not found")
-                        
-                        # Dönüştür
-                        cmd = [
-                            ffmpeg_cmd,
-                            '-i', downloaded_file,
-                            '-acodec', 'pcm_s16le',
-                            '-ar', '44100',
-                            '-ac', '2',
-                            '-y',  # Overwrite
-                            wav_file
-                        ]
-                        
-                        result = subprocess.run(cmd, 
-                                              capture_output=True, 
-                                              timeout=60,
-                                              text=True)
-                        
-                        if result.returncode == 0 and os.path.exists(wav_file):
-                            print(f"   ✅ Converted to WAV")
-                            # Eski dosyayı sil
-                            try:
-                                os.remove(downloaded_file)
-                            except:
-                                pass
-                            downloaded_file = wav_file
-                        else:
-                            print(f"   ⚠️  FFmpeg conversion failed: {result.stderr[:200]}")
-                            # Pydub ile dene
-                            try:
-                                from pydub import AudioSegment
-                                audio = AudioSegment.from_file(downloaded_file)
-                                audio.export(wav_file, format='wav')
-                                if os.path.exists(wav_file):
-                                    try:
-                                        os.remove(downloaded_file)
-                                    except:
-                                        pass
-                                    downloaded_file = wav_file
-                                    print(f"   ✅ Converted using pydub")
-                            except Exception as e:
-                                print(f"   ⚠️  Could not convert: {e}")
-                                print(f"   → Trying to use original format (may fail)")
-                    
-                    except Exception as e:
-                        print(f"   ⚠️  Conversion error: {e}")
-                        print(f"   → Trying to use original format")
-                
-                # Maksimum süre sınırı ve reklam atlama (eğer belirtilmişse ve WAV ise)
-                if max_duration and downloaded_file.endswith('.wav') and os.path.exists(downloaded_file):
-                    try:
-                        # Reklamları atla ve kısalt
-                        y, sr = librosa.load(downloaded_file, sr=None, offset=skip_seconds, duration=max_duration)
-                        # Kısaltılmış versiyonu kaydet
-                        wavfile.write(downloaded_file, sr, (y * 32767).astype(np.int16))
-                        print(f"   ⏩ Skipped first {skip_seconds}s (ads/intro)")
-                    except Exception as e:
-                        print(f"   ⚠️  Could not process duration limit: {e}")
-                
-                print(f"✅ Downloaded: {downloaded_file}")
-                return downloaded_file
-            else:
+            if segment is None:
                 print("❌ Could not find downloaded file")
                 return None
+            if len(segment[0]) == 0:
+                print(f"❌ No audio after {skip_seconds}s")
+                return None
+            
+            _write_wav(cache_file, *segment)
+            print(f"✅ Downloaded: {cache_file}")
+            return cache_file
                 
     except Exception as e:
         print(f"❌ Error downloading from YouTube: {e}")
@@ -335,116 +277,95 @@ def get_audio_file(input_source, temp_dir=None):
             print(f"❌ File not found: {input_source}")
             return None
 
-def convert_to_wav_if_needed(audio_file):
-    """Gerekirse audio dosyasını WAV'a çevirir"""
-    file_ext = os.path.splitext(audio_file)[1].lower()
-    
-    if file_ext == '.wav':
-        return audio_file
+def segment_offsets(total_duration, skip_seconds=5, num_segments=3, segment_duration=30, placement='even'):
+    """
+    Analiz bölümlerinin başlangıçları
     
-    # MP3, M4A, WebM gibi formatları WAV'a çevir
-    if file_ext in ['.mp3', '.m4a', '.webm', '.opus', '.flac']:
-        wav_file = audio_file.replace(file_ext, '.wav')
-        
-        # FFmpeg ile çevir
-        try:
-            import glob
-            # FFmpeg yolunu bul
-            ffmpeg_cmd = None
-            
-            # PATH'te ara
-            try:
-                result = subprocess.run(['ffmpeg', '-version'], 
-                                       capture_output=True, 
-                                       timeout=5)
-                if result.returncode == 0:
-                    ffmpeg_cmd = 'ffmpeg'
-            except:
-                pass
-            
-            # Winget yolu
-            if not ffmpeg_cmd:
-                winget_pattern = os.path.expanduser(
-                    r'~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_*\ffmpeg-*\bin\ffmpeg.exe'
-                )
-                matches = glob.glob(winget_pattern)
-                if matches:
-                    ffmpeg_cmd = matches[0]
-            
-            if ffmpeg_cmd:
-                cmd = [
-                    ffmpeg_cmd,
-                    '-i', audio_file,
-                    '-acodec', 'pcm_s16le',
-                    '-ar', '44100',
-                    '-ac', '2',
-                    '-y',
-                    wav_file
-                ]
-                result = subprocess.run(cmd, capture_output=True, timeout=60, text=True)
-                if result.returncode == 0 and os.path.exists(wav_file):
-                    return wav_file
-        
-        except Exception as e:
-            print(f"   ⚠️  Could not convert {file_ext} to WAV: {e}")
+    Args:
+        total_duration: Parça süresi (saniye)
+        skip_seconds: Baştan atlanacak süre
+        num_segments: Bölüm sayısı
+        segment_duration: Maksimum bölüm süresi (saniye)
+        placement: 'even' (parçaya eşit aralıklarla yayılır) veya 'start' (skip'ten itibaren ardışık)
     
-    return audio_file
+    Returns:
+        (offsets, segment_duration)
+    """
+    if placement not in SEGMENT_PLACEMENTS:
+        raise ValueError(f"Unknown placement: {placement} (choices: {', '.join(SEGMENT_PLACEMENTS)})")
+    usable = total_duration - skip_seconds
+    if usable <= 0 or num_segments < 1:
+        return [], 0.0
+    segment_duration = min(segment_duration, usable / num_segments)
+    
+    if placement == 'start':
+        offsets = [skip_seconds + i * segment_duration for i in range(num_segments)]
+    elif num_segments == 1:
+        offsets = [skip_seconds + (usable - segment_duration) / 2]
+    else:
+        step = (usable - segment_duration) / (num_segments - 1)
+        offsets = [skip_seconds + i * step for i in range(num_segments)]
+    return [offset for offset in offsets if offset + segment_duration <= total_duration + 1e-6], segment_duration
+
+def _analyze_segment(y_seg, sr):
+    """Tek bölüm: tempo + enstrümanlar (hata olursa None)"""
+    try:
+        ctx = FeatureContext(y_seg, sr)
+        energies = ctx.band_energies(INSTRUMENT_FREQUENCIES)
+        return int(round(ctx.tempo)), [inst for inst, energy in energies.items() if energy > 0.1]
+    except Exception:
+        return None
 
-def analyze_audio_multiple_segments(audio_file, skip_seconds=5, num_segments=3):
+def analyze_audio_multiple_segments(audio_file, skip_seconds=5, num_segments=3, segment_duration=30,
+                                    placement='even', workers=None):
     """
     Audio'yu birden fazla bölümden analiz eder (daha doğru sonuç için)
+    
+    Dosya bir kez decode edilir; bölümler aynı buffer'ın kopyasız view'ları olarak
+    thread havuzunda eşzamanlı analiz edilir (FFT/BLAS işlemleri GIL'i bırakır).
+    
+    Args:
+        audio_file: Audio dosya yolu
+        skip_seconds: Baştan atlanacak süre (saniye)
+        num_segments: Bölüm sayısı
+        segment_duration: Maksimum bölüm süresi (saniye)
+        placement: 'even' (parçaya yayılmış) veya 'start' (baştan ardışık)
+        workers: Thread sayısı (None = bölüm sayısı, CPU sayısıyla sınırlı)
     """
-    audio_file = convert_to_wav_if_needed(audio_file)
+    # Toplam süreyi al (dosya başlığından, decode etmeden)
+    total_duration = audio_duration(audio_file)
+    if total_duration is None:
+        return None
     
-    # Toplam süreyi al
-    try:
-        y_full, sr = librosa.load(audio_file, sr=None)
-        total_duration = len(y_full) / sr
-    except:
+    offsets, segment_duration = segment_offsets(total_duration, skip_seconds, num_segments,
+                                                segment_duration, placement)
+    if not offsets:
         return None
     
-    # Farklı bölümlerden analiz yap
-    segment_duration = min(30, (total_duration - skip_seconds) / num_segments)
+    # Tek decode (önbellekte kalır), bölümler aynı buffer'ın view'ları
+    _, sr = load_audio(audio_file)
+    segments = [load_segment(audio_file, offset=offset, duration=segment_duration)[0] for offset in offsets]
+    
+    workers = workers or min(len(segments), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_analyze_segment(y_seg, sr) for y_seg in segments]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda y_seg: _analyze_segment(y_seg, sr), segments))
+    
     all_instruments = []
     all_tempos = []
-    all_genres = []
-    
-    for i in range(num_segments):
-        offset = skip_seconds + (i * segment_duration)
-        if offset + segment_duration > total_duration:
-            break
-        
-        try:
-            y_seg, sr = librosa.load(audio_file, sr=None, offset=offset, duration=segment_duration)
-            
-            # Tempo
-            tempo, _ = librosa.beat.beat_track(y=y_seg, sr=sr)
-            if isinstance(tempo, np.ndarray):
-                tempo = float(tempo[0]) if len(tempo) > 0 else 120.0
-            else:
-                tempo = float(tempo)
-            all_tempos.append(int(round(tempo)))
-            
-            # Enstrüman tespiti
-            stft = librosa.stft(y_seg)
-            magnitude = np.abs(stft)
-            frequency_bins = librosa.fft_frequencies(sr=sr)
-            
-            segment_instruments = []
-            for inst, (low, high) in INSTRUMENT_FREQUENCIES.items():
-                freq_mask = (frequency_bins >= low) & (frequency_bins <= high)
-                if np.any(freq_mask):
-                    energy = np.mean(magnitude[freq_mask, :])
-                    if energy > 0.1:
-                        segment_instruments.append(inst)
-            
-            all_instruments.extend(segment_instruments)
-            
-        except:
+    segment_results = []
+    for offset, result in zip(offsets, results):
+        if result is None:
             continue
+        tempo, segment_instruments = result
+        all_tempos.append(tempo)
+        all_instruments.extend(segment_instruments)
+        segment_results.append({'offset': offset, 'duration': segment_duration,
+                                'tempo': tempo, 'instruments': segment_instruments})
     
     # En sık görülen enstrümanları seç
-    from collections import Counter
     instrument_counts = Counter(all_instruments)
     most_common = [inst for inst, count in instrument_counts.most_common(6)]
     
@@ -454,7 +375,8 @@ def analyze_audio_multiple_segments(audio_file, skip_seconds=5, num_segments=3):
     return {
         'instruments': most_common,
         'tempo': avg_tempo,
-        'multiple_segments': True
+        'multiple_segments': True,
+        'segments': segment_results
     }
 
 def analyze_audio(audio_file, skip_seconds=5, analysis_duration=90):
@@ -472,13 +394,11 @@ def analyze_audio(audio_file, skip_seconds=5, analysis_duration=90):
     print(f"🔍 Analyzing audio: {audio_file}")
     print(f"   ⏱️  Analysis duration: {analysis_duration}s (skip first {skip_seconds}s)")
     
-    # Gerekirse WAV'a çevir
-    audio_file = convert_to_wav_if_needed(audio_file)
-    
-    # Önce tüm dosyayı yükle (süre kontrolü için)
+    # Süre kontrolü (dosya başlığından, decode etmeden)
     try:
-        y_full, sr_full = librosa.load(audio_file, sr=None)
-        total_duration = len(y_full) / sr_full
+        total_duration = audio_duration(audio_file)
+        if total_duration is None:
+            raise ValueError("unknown duration")
         print(f"   📊 Total duration: {total_duration:.1f}s")
         
         # Analiz süresini dosya uzunluğuna göre ayarla
@@ -492,68 +412,51 @@ def analyze_audio(audio_file, skip_seconds=5, analysis_duration=90):
         print(f"   ⚠️  Could not get file duration: {e}")
         max_analysis = analysis_duration
     
-    # Audio yükle (daha uzun analiz için)
+    # Audio yükle (dosya bir kez decode edilir, bölüm kopyasız view)
     try:
-        y, sr = librosa.load(audio_file, sr=None, offset=skip_seconds, duration=max_analysis)
+        y, sr = load_segment(audio_file, offset=skip_seconds, duration=max_analysis)
+        if len(y) == 0:
+            # Offset dosya sonunu aşıyorsa baştan al
+            y, sr = load_segment(audio_file, duration=max_analysis)
         print(f"   ✅ Loaded {len(y)/sr:.1f}s of audio")
     except Exception as e:
-        print(f"   ⚠️  Error with offset, trying without: {e}")
-        # Offset olmadan dene
-        try:
-            y, sr = librosa.load(audio_file, sr=None, duration=max_analysis)
-            print(f"   ✅ Loaded {len(y)/sr:.1f}s of audio (no offset)")
-        except Exception as e2:
-            # Daha kısa süre dene
-            try:
-                y, sr = librosa.load(audio_file, sr=None, duration=30)
-                print(f"   ✅ Loaded {len(y)/sr:.1f}s of audio (fallback)")
-            except Exception as e3:
-                print(f"❌ Error loading audio: {e3}")
-                return None
+        print(f"❌ Error loading audio: {e}")
+        return None
+    
+    # STFT, onset envelope ve beat grid bir kez hesaplanır, tüm özellikler paylaşır
+    ctx = FeatureContext(y, sr)
     
     # Tempo analizi
-    tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-    if isinstance(tempo, np.ndarray):
-        tempo = float(tempo[0]) if len(tempo) > 0 else 120.0
-    else:
-        tempo = float(tempo)
-    tempo = int(round(tempo))
+    tempo = int(round(ctx.tempo))
     
     # Key detection (basit)
-    chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+    chroma = ctx.chroma
     chroma_mean = np.mean(chroma, axis=1)
     key_idx = np.argmax(chroma_mean)
     keys = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
     estimated_key = keys[key_idx]
     
     # Spektral analiz
-    stft = librosa.stft(y)
-    magnitude = np.abs(stft)
-    frequency_bins = librosa.fft_frequencies(sr=sr)
+    magnitude = ctx.magnitude
+    frequency_bins = ctx.frequencies
     
     # Enstrüman tespiti (frekans analizi + spektral özellikler)
     detected_instruments = []
     instrument_scores = {}
     
-    # Temel frekans analizi
-    for instrument, (low_freq, high_freq) in INSTRUMENT_FREQUENCIES.items():
-        # Frekans aralığındaki enerjiyi hesapla
-        freq_mask = (frequency_bins >= low_freq) & (frequency_bins <= high_freq)
-        if np.any(freq_mask):
-            energy = np.mean(magnitude[freq_mask, :])
-            instrument_scores[instrument] = energy
+    # Temel frekans analizi (tüm bantlar tek matris çarpımıyla)
+    instrument_scores.update(ctx.band_energies(INSTRUMENT_FREQUENCIES))
+    band_energy = ctx.band_energies(KARADENIZ_BANDS)
     
     # Spektral özellikler (daha gelişmiş tespit)
     mean_energy = np.mean(list(instrument_scores.values())) if instrument_scores else 0.1
     
     # Kemençe tespiti: Yüksek frekanslarda güçlü, harmonik zengin, karakteristik tını
     # Karadeniz kemençesi: 200-3000 Hz arası, özellikle 800-2000 Hz'de güçlü
-    kemenche_range = (frequency_bins >= 800) & (frequency_bins <= 2500)
-    if np.any(kemenche_range):
-        kemenche_energy = np.mean(magnitude[kemenche_range, :])
+    if 'kemenche' in band_energy:
+        kemenche_energy = band_energy['kemenche']
         # Harmonik zenginlik kontrolü (spektral centroid)
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        high_centroid = np.mean(spectral_centroids) > 2000  # Yüksek spektral centroid
+        high_centroid = np.mean(ctx.spectral_centroid) > 2000  # Yüksek spektral centroid
         
         # Daha hassas tespit: Eğer yüksek frekanslarda güçlü enerji varsa ve violin tespit edildiyse, kemençe olabilir
         violin_detected = instrument_scores.get('violin', 0) > 0
@@ -564,28 +467,26 @@ def analyze_audio(audio_file, skip_seconds=5, analysis_duration=90):
                 instrument_scores['kemenche'] = instrument_scores.get('kemenche', 0) + kemenche_energy * 0.5
     
     # Tulum tespiti: Orta-yüksek frekanslarda karakteristik ses, sürekli ton
-    tulum_range = (frequency_bins >= 400) & (frequency_bins <= 1800)
-    if np.any(tulum_range):
-        tulum_energy = np.mean(magnitude[tulum_range, :])
+    if 'tulum' in band_energy:
+        tulum_energy = band_energy['tulum']
         # Tulum genelde sürekli ton üretir (düşük varyans)
+        low, high = KARADENIZ_BANDS['tulum']
+        tulum_range = (frequency_bins >= low) & (frequency_bins <= high)
         tulum_variance = np.var(magnitude[tulum_range, :])
         if tulum_energy > mean_energy * 1.2 and tulum_variance < np.var(magnitude) * 0.8:
             instrument_scores['tulum'] = instrument_scores.get('tulum', 0) + tulum_energy * 0.6
     
     # Zurna tespiti: Çok yüksek, keskin frekanslar
-    zurna_range = (frequency_bins >= 1500) & (frequency_bins <= 5000)
-    if np.any(zurna_range):
-        zurna_energy = np.mean(magnitude[zurna_range, :])
+    if 'zurna' in band_energy:
+        zurna_energy = band_energy['zurna']
         if zurna_energy > mean_energy * 1.4:
             instrument_scores['zurna'] = instrument_scores.get('zurna', 0) + zurna_energy * 0.5
     
     # Davul tespiti: Düşük frekanslarda güçlü vuruşlar, ritmik pattern
-    davul_range = (frequency_bins >= 50) & (frequency_bins <= 300)
-    if np.any(davul_range):
-        davul_energy = np.mean(magnitude[davul_range, :])
+    if 'davul' in band_energy:
+        davul_energy = band_energy['davul']
         # Ritmik pattern kontrolü
-        onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
-        rhythmic = len(onset_frames) > 10  # Yeterli vuruş varsa
+        rhythmic = len(ctx.onsets) > 10  # Yeterli vuruş varsa
         
         if davul_energy > mean_energy * 1.1 and rhythmic:
             instrument_scores['davul'] = instrument_scores.get('davul', 0) + davul_energy * 0.7
@@ -598,7 +499,7 @@ def analyze_audio(audio_file, skip_seconds=5, analysis_duration=90):
     estimated_genre = estimate_genre(tempo, detected_instruments, instrument_scores)
     
     # Enerji seviyesi
-    rms = librosa.feature.rms(y=y)[0]
+    rms = ctx.rms
     energy_level = 'high' if np.mean(rms) > 0.1 else 'medium' if np.mean(rms) > 0.05 else 'low'
     
     # Bas vurgusu
@@ -868,8 +769,10 @@ def generate_similar_music(audio_source, output_dir='output', duration=30,
     is_temp_file = audio_file.startswith(temp_dir) or 'youtube_audio_temp' in audio_file
     
     try:
-        # Analiz (reklamları atla)
-        analysis = analyze_audio(audio_file, skip_seconds=skip_seconds if is_youtube_url(audio_source) else 5)
+        # Analiz (reklamları atla; özellik deposunda varsa tekrar analiz edilmez)
+        from feature_store import analyze_cached
+        analysis = analyze_cached(audio_file, 'basic',
+                                  skip_seconds=skip_seconds if is_youtube_url(audio_source) else 5)
         if not analysis:
             return None
         
@@ -897,8 +800,8 @@ def generate_similar_music(audio_source, output_dir='output', duration=30,
         print(f"\n🎵 Generated Prompt: {prompt}\n")
         
         # Müzik üret
-        from generate import MusicGenerator
-        generator = MusicGenerator(model_size=model_size)
+        from generation_server import get_generator
+        generator = get_generator(model_size=model_size)
         results = generator.generate(
             [prompt],
             output_dir=output_dir,
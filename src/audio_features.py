@@ -0,0 +1,206 @@
+"""
+Ortak özellik çıkarma bağlamı
+STFT, onset envelope ve beat grid bir kez hesaplanır; chroma, spektral centroid/rolloff,
+pitch tracking ve HPSS gibi tüm özellikler aynı spektrogramdan türetilir.
+Frekans bandı enerjileri önbelleklenen seyrek bant matrisiyle tek çarpımda hesaplanır.
+Sonuçlar librosa'nın y= ile çağrılan karşılıklarıyla aynıdır (aynı n_fft/hop varsayılanları).
+"""
+
+from functools import cached_property, lru_cache
+
+import librosa
+import numpy as np
+from scipy import sparse
+
+N_FFT = 2048
+HOP_LENGTH = 512
+
+# Karadeniz enstrüman heuristiklerinin dar bantları (Hz)
+KARADENIZ_BANDS = {
+    'kemenche': (800, 2500),
+    'tulum': (400, 1800),
+    'zurna': (1500, 5000),
+    'davul': (50, 300),
+}
+
+
+@lru_cache(maxsize=32)
+def band_matrix(sr, n_fft, bands):
+    """
+    Seyrek bant üyelik matrisi (her satır bandındaki bin'lerin ortalamasını alır)
+
+    Args:
+        sr: Sample rate
+        n_fft: FFT boyutu
+        bands: ((isim, alt_hz, üst_hz), ...) - hashable, önbellek anahtarı
+
+    Returns:
+        (names, matrix): Boş olmayan bantların isimleri ve [bantlar, bins] CSR matrisi
+    """
+    frequencies = librosa.fft_frequencies(sr=sr, n_fft=n_fft)
+    names, rows, cols, weights = [], [], [], []
+    for name, low, high in bands:
+        bins = np.flatnonzero((frequencies >= low) & (frequencies <= high))
+        if len(bins) == 0:
+            continue
+        rows.extend([len(names)] * len(bins))
+        cols.extend(bins)
+        weights.extend([1.0 / len(bins)] * len(bins))
+        names.append(name)
+    matrix = sparse.csr_matrix((weights, (rows, cols)), shape=(len(names), len(frequencies)))
+    return tuple(names), matrix
+
+
+def _band_key(bands):
+    """dict/iterable bant tanımı → hashable tuple"""
+    if isinstance(bands, dict):
+        bands = bands.items()
+    return tuple((name, float(low), float(high)) for name, (low, high) in bands)
+
+
+class FeatureContext:
+    """Bir sinyal için tembel (lazy) hesaplanan ve önbelleklenen özellikler"""
+
+    def __init__(self, y, sr, n_fft=N_FFT, hop_length=HOP_LENGTH):
+        """
+        Args:
+            y: Mono audio [samples]
+            sr: Sample rate
+            n_fft: FFT boyutu
+            hop_length: Frame adımı (örnek)
+        """
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+
+    @property
+    def duration(self):
+        return len(self.y) / self.sr
+
+    @cached_property
+    def stft(self):
+        """Kompleks STFT [1 + n_fft/2, frames]"""
+        return librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length)
+
+    @cached_property
+    def magnitude(self):
+        return np.abs(self.stft)
+
+    @cached_property
+    def power(self):
+        return self.magnitude ** 2
+
+    @cached_property
+    def frequencies(self):
+        return librosa.fft_frequencies(sr=self.sr, n_fft=self.n_fft)
+
+    @cached_property
+    def mean_magnitude(self):
+        """Zaman ortalamalı genlik spektrumu [bins]"""
+        return self.magnitude.mean(axis=1, dtype=np.float64)
+
+    def band_energies(self, bands):
+        """
+        Bantların ortalama genliği (np.mean(magnitude[mask, :]) ile aynı)
+
+        Args:
+            bands: {isim: (alt_hz, üst_hz)} - bin içermeyen bantlar sonuçta yer almaz
+
+        Returns:
+            dict: {isim: enerji}
+        """
+        names, matrix = band_matrix(self.sr, self.n_fft, _band_key(bands))
+        return dict(zip(names, matrix @ self.mean_magnitude))
+
+    @cached_property
+    def chroma(self):
+        """Chroma [12, frames] (chroma_stft ile aynı)"""
+        return librosa.feature.chroma_stft(S=self.power, sr=self.sr, n_fft=self.n_fft,
+                                           hop_length=self.hop_length)
+
+    @cached_property
+    def spectral_centroid(self):
+        return librosa.feature.spectral_centroid(S=self.magnitude, sr=self.sr, n_fft=self.n_fft,
+                                                 hop_length=self.hop_length)[0]
+
+    @cached_property
+    def spectral_rolloff(self):
+        return librosa.feature.spectral_rolloff(S=self.magnitude, sr=self.sr, n_fft=self.n_fft,
+                                                hop_length=self.hop_length)[0]
+
+    @cached_property
+    def rms(self):
+        """Zaman bölgesinde RMS (FFT gerektirmez)"""
+        return librosa.feature.rms(y=self.y, frame_length=self.n_fft, hop_length=self.hop_length)[0]
+
+    @cached_property
+    def zero_crossing_rate(self):
+        return librosa.feature.zero_crossing_rate(self.y, frame_length=self.n_fft,
+                                                  hop_length=self.hop_length)[0]
+
+    @cached_property
+    def mel_db(self):
+        """Log-mel spektrogram (paylaşılan güç spektrumundan)"""
+        return librosa.power_to_db(librosa.feature.melspectrogram(S=self.power, sr=self.sr))
+
+    @cached_property
+    def onset_envelope(self):
+        """Onset gücü (onset_strength / onset_detect varsayılanı: ortalama)"""
+        return librosa.onset.onset_strength(S=self.mel_db, sr=self.sr, hop_length=self.hop_length)
+
+    @cached_property
+    def beat_envelope(self):
+        """Beat tracking onset gücü (beat_track varsayılanı: medyan)"""
+        return librosa.onset.onset_strength(S=self.mel_db, sr=self.sr, hop_length=self.hop_length,
+                                            aggregate=np.median)
+
+    @cached_property
+    def beat_track(self):
+        """(tempo, beat frame'leri) - tempo skaler float"""
+        tempo, beats = librosa.beat.beat_track(onset_envelope=self.beat_envelope, sr=self.sr,
+                                               hop_length=self.hop_length)
+        if isinstance(tempo, np.ndarray):
+            tempo = float(tempo[0]) if len(tempo) > 0 else 120.0
+        return float(tempo), beats
+
+    @property
+    def tempo(self):
+        return self.beat_track[0]
+
+    @property
+    def beats(self):
+        return self.beat_track[1]
+
+    @cached_property
+    def onsets(self):
+        """Onset frame'leri"""
+        return librosa.onset.onset_detect(onset_envelope=self.onset_envelope, sr=self.sr,
+                                          hop_length=self.hop_length)
+
+    @cached_property
+    def piptrack(self):
+        """(pitches, magnitudes) [bins, frames]"""
+        return librosa.piptrack(S=self.magnitude, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length)
+
+    @cached_property
+    def hpss(self):
+        """(y_harmonic, y_percussive) - effects.hpss ile aynı, STFT paylaşılır"""
+        harmonic, percussive = librosa.decompose.hpss(self.stft)
+        return (librosa.istft(harmonic, hop_length=self.hop_length, length=len(self.y)),
+                librosa.istft(percussive, hop_length=self.hop_length, length=len(self.y)))
+
+    def harmonic_ratio(self, kernel_size=31):
+        """
+        Harmonik enerji oranı - genlik spektrogramında HPSS (istft yok)
+
+        Args:
+            kernel_size: Medyan filtre boyutu (küçük = daha hızlı, daha kaba ayrım)
+        """
+        harmonic, percussive = librosa.decompose.hpss(self.magnitude, kernel_size=kernel_size)
+        harmonic_energy = np.sum(harmonic ** 2, dtype=np.float64)
+        total_energy = harmonic_energy + np.sum(percussive ** 2, dtype=np.float64)
+        return float(harmonic_energy / total_energy) if total_energy > 0 else 0.5
+
+    def frames_to_time(self, frames):
+        return librosa.frames_to_time(frames, sr=self.sr, hop_length=self.hop_length)
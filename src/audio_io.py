@@ -0,0 +1,256 @@
+"""
+Ortak audio erişim katmanı
+Süre dosya başlığından okunur (decode yok); dosya bir kez float32 mono olarak decode
+edilip önbelleğe alınır (bellekte ve istenirse diskte memory-mapped .npy olarak).
+Segmentler önbellekteki diziden kopyasız view olarak döner.
+soundfile'ın açamadığı formatlar (mp3, m4a, webm...) geçici WAV'a çevrilmeden ffmpeg'in
+float32 çıktısı pipe'tan doğrudan NumPy buffer'ına okunur; sadece istenen pencere decode edilir.
+"""
+
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import soundfile as sf
+
+from cache_utils import get_cache_dir, text_hash
+from media_tools import find_ffmpeg, find_ffprobe
+
+# Bellekte tutulacak decode edilmiş dosya sayısı
+MAX_CACHED_FILES = 4
+
+# ffmpeg ile decode ederken sample rate okunamazsa kullanılan hız
+FALLBACK_SAMPLE_RATE = 44100
+
+_decoded = OrderedDict()
+_decoded_lock = threading.Lock()
+
+
+def _file_key(path):
+    """Yol + değişiklik zamanı + boyut (dosya değişince önbellek geçersiz olur)"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def audio_duration(path):
+    """
+    Süreyi (saniye) decode etmeden okur: soundfile başlığı, yoksa ffprobe
+
+    Returns:
+        float veya None (okunamazsa)
+    """
+    try:
+        return sf.info(path).duration
+    except Exception:
+        pass
+
+    ffprobe = find_ffprobe()
+    if ffprobe:
+        try:
+            result = subprocess.run(
+                [ffprobe, '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+                capture_output=True, text=True, timeout=30
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                return float(result.stdout.strip())
+        except (OSError, ValueError, subprocess.SubprocessError):
+            pass
+    return None
+
+
+def _soundfile_readable(path):
+    try:
+        sf.info(path)
+        return True
+    except Exception:
+        return False
+
+
+def _probe_sample_rate(path):
+    """İlk audio stream'in sample rate'i (ffprobe, okunamazsa None)"""
+    ffprobe = find_ffprobe()
+    if not ffprobe:
+        return None
+    try:
+        result = subprocess.run(
+            [ffprobe, '-v', 'error', '-select_streams', 'a:0', '-show_entries', 'stream=sample_rate',
+             '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=30
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return int(result.stdout.strip().splitlines()[0])
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+def _read_pipe(stream, expected_bytes=0):
+    """
+    Pipe'ı tek bir önceden ayrılmış buffer'a okur (parça birleştirme kopyası yok)
+
+    Returns:
+        (buffer, okunan bayt sayısı)
+    """
+    buffer = bytearray(max(expected_bytes, 1 << 20))
+    view = memoryview(buffer)
+    filled = 0
+    while True:
+        if filled == len(buffer):
+            # Beklenenden uzun: buffer'ı iki katına çıkar
+            view.release()
+            buffer.extend(bytes(len(buffer)))
+            view = memoryview(buffer)
+        count = stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    view.release()
+    return buffer, filled
+
+
+def decode_ffmpeg(path, offset=0.0, duration=None, sample_rate=None, headers=None):
+    """
+    ffmpeg ile float32 mono decode (geçici dosya yok, f32le stdout → NumPy)
+
+    Args:
+        path: Audio dosyası (ffmpeg'in açabildiği her format)
+        offset: Başlangıç (saniye) - ffmpeg bu noktaya seek eder
+        duration: Süre (saniye, None = sona kadar) - sadece bu pencere decode edilir
+        sample_rate: Çıkış sample rate (None = dosyanın kendi hızı)
+        headers: HTTP(S) stream'leri için istek başlıkları (dict)
+
+    Returns:
+        (y, sr): Salt okunur float32 mono dizi ve sample rate
+    """
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+    sr = sample_rate or _probe_sample_rate(path) or FALLBACK_SAMPLE_RATE
+
+    cmd = [ffmpeg, '-v', 'error', '-nostdin']
+    if headers:
+        cmd += ['-headers', ''.join(f"{name}: {value}\r\n" for name, value in headers.items())]
+    if offset and offset > 0:
+        cmd += ['-ss', f"{offset:.6f}"]
+    if duration is not None:
+        cmd += ['-t', f"{duration:.6f}"]
+    cmd += ['-i', path, '-map', '0:a:0', '-ac', '1', '-ar', str(sr), '-f', 'f32le', '-acodec', 'pcm_f32le', 'pipe:1']
+
+    # Buffer beklenen boyutta bir kez ayrılır (süre bilinmiyorsa başlıktan okunur)
+    expected = duration if duration is not None else max((audio_duration(path) or 0.0) - (offset or 0.0), 0.0)
+    expected_bytes = int(expected * sr) * 4 + 4096
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        buffer, filled = _read_pipe(process.stdout, expected_bytes)
+        stderr = process.stderr.read()
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode('utf-8', 'replace').strip()}")
+
+    audio = np.frombuffer(buffer, dtype='<f4', count=filled // 4)
+    audio.setflags(write=False)
+    return audio, sr
+
+
+def _decode(path):
+    """Dosyayı float32 mono olarak decode eder (librosa.load(sr=None) ile aynı değerler)"""
+    try:
+        audio, sr = sf.read(path, dtype='float32', always_2d=True)
+        return np.ascontiguousarray(audio.mean(axis=1, dtype=np.float32)), sr
+    except Exception:
+        pass
+    # soundfile'ın açamadığı formatlar (mp3, m4a, webm...): ffmpeg pipe, yoksa librosa/audioread
+    if find_ffmpeg():
+        return decode_ffmpeg(path)
+    import librosa
+    audio, sr = librosa.load(path, sr=None, mono=True)
+    return audio.astype(np.float32, copy=False), sr
+
+
+def _is_cached(path):
+    with _decoded_lock:
+        return _file_key(path) in _decoded
+
+
+def _disk_path(key):
+    return os.path.join(get_cache_dir('decoded_audio'), f"{text_hash(*key)}.npy")
+
+
+def load_audio(path, mmap=False):
+    """
+    Dosyanın tamamını decode edilmiş olarak döndürür (dosya başına bir kez decode)
+
+    Args:
+        path: Audio dosyası
+        mmap: Decode edilmiş diziyi diskte .npy olarak sakla ve memory-map ile aç
+              (büyük dosyalar için RAM kullanımı düşük, sonraki process'ler decode etmez)
+
+    Returns:
+        (y, sr): Salt okunur float32 mono dizi ve sample rate
+    """
+    key = _file_key(path)
+    with _decoded_lock:
+        if key in _decoded:
+            _decoded.move_to_end(key)
+            return _decoded[key]
+
+    entry = None
+    if mmap:
+        disk_path = _disk_path(key)
+        sr_path = f"{disk_path}.sr"
+        if os.path.exists(disk_path) and os.path.exists(sr_path):
+            with open(sr_path, 'r') as f:
+                entry = (np.load(disk_path, mmap_mode='r'), int(f.read()))
+        else:
+            audio, sr = _decode(path)
+            tmp_path = f"{disk_path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, audio)
+            os.replace(tmp_path, disk_path)
+            with open(sr_path, 'w') as f:
+                f.write(str(sr))
+            entry = (np.load(disk_path, mmap_mode='r'), sr)
+    else:
+        audio, sr = _decode(path)
+        audio.setflags(write=False)
+        entry = (audio, sr)
+
+    with _decoded_lock:
+        _decoded[key] = entry
+        while len(_decoded) > MAX_CACHED_FILES:
+            _decoded.popitem(last=False)
+    return entry
+
+
+def load_segment(path, offset=0.0, duration=None, mmap=False):
+    """
+    Dosyanın bir bölümünü döndürür (önbellekteki diziden kopyasız view)
+
+    Args:
+        path: Audio dosyası
+        offset: Başlangıç (saniye)
+        duration: Süre (saniye, None = sona kadar)
+        mmap: bkz. load_audio
+
+    Returns:
+        (y, sr): Salt okunur float32 mono view ve sample rate
+    """
+    if not mmap and not _is_cached(path) and not _soundfile_readable(path) and find_ffmpeg():
+        # Sıkıştırılmış format: tüm dosya yerine sadece pencere decode edilir
+        return decode_ffmpeg(path, offset=max(offset, 0.0), duration=duration)
+
+    audio, sr = load_audio(path, mmap=mmap)
+    start = min(int(round(max(offset, 0.0) * sr)), len(audio))
+    end = len(audio) if duration is None else min(start + int(round(duration * sr)), len(audio))
+    return audio[start:end], sr
+
+
+def clear_cache():
+    """Bellekteki decode önbelleğini boşaltır"""
+    with _decoded_lock:
+        _decoded.clear()
@@ -2,13 +2,13 @@
 Sosyal medya için batch üretim
 """
 
-from generate import MusicGenerator
+from generation_server import get_generator
 from prompt_engineer import SOCIAL_MEDIA_PROMPTS, get_prompt
 import json
 
 def batch_generate_social_media(output_dir='output/social_media', model_size='small'):
     """Sosyal medya için çeşitli müzikler üretir"""
-    generator = MusicGenerator(model_size=model_size)
+    generator = get_generator(model_size=model_size)
     
     all_prompts = []
     for category, prompts in SOCIAL_MEDIA_PROMPTS.items():
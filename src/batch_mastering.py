@@ -0,0 +1,282 @@
+"""
+Toplu (paralel) mastering
+Klasörler / glob'lar / dosyalar process havuzunda process_audio_advanced'dan geçirilir.
+Çıktısı girişten yeni olan ve aynı ayarlarla (ayar hash'i) üretilmiş dosyalar atlanır.
+Ayar hash'leri her çıktı klasöründeki manifest dosyasında tutulur; farklı yerlerdeki
+aynı içerikli girişler mastering_cache üzerinden tekrar işlenmez. Aynı çıktı yoluna
+düşen girişler (farklı klasörlerde aynı ad) klasör hash'iyle ayrıştırılır.
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cache_utils import text_hash
+from mastering_cache import master_file_cached, settings_key
+from mastering_presets import get_preset, preset_names
+
+MANIFEST_NAME = '.mastering_manifest.json'
+MASTERED_SUFFIX = '_mastered.wav'
+
+# process_audio_advanced varsayılanları (hash her zaman tam ayar seti üzerinden alınır)
+DEFAULT_SETTINGS = {
+    'bass_boost': 2.0,
+    'mid_boost': 0,
+    'treble_boost': 1.0,
+    'compression': True,
+    'reverb': True,
+    'stereo_widen': False,
+    'target_lufs': -14.0,
+    'reverb_preset': None,
+    'reverb_ir': None,
+}
+
+
+def settings_hash(settings):
+    """Mastering ayarlarının kararlı hash'i (reverb IR dosyasının içeriği dahil)"""
+    return text_hash(settings_key({**DEFAULT_SETTINGS, **settings}))
+
+
+def collect_inputs(patterns):
+    """
+    Dosya, klasör (recursive) ve glob desenlerinden .wav girişlerini toplar
+    (*_mastered.wav çıktıları hariç, sıra korunur, tekrarlar atılır)
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith('.wav'))
+        elif glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            files.append(pattern)
+
+    seen = set()
+    inputs = []
+    for path in files:
+        key = os.path.abspath(path)
+        if key in seen or path.endswith(MASTERED_SUFFIX):
+            continue
+        seen.add(key)
+        inputs.append(path)
+    return inputs
+
+
+def output_path_for(input_file, output_dir=None, disambiguate=False):
+    """
+    Giriş dosyası → *_mastered.wav yolu
+
+    disambiguate=True ise ada giriş klasörünün kısa hash'i eklenir
+    (farklı klasörlerdeki aynı adlı girişler aynı çıktı klasörüne yazılırken)
+    """
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    directory = output_dir or os.path.dirname(input_file)
+    if disambiguate:
+        base_name = f"{base_name}_{text_hash(os.path.dirname(os.path.abspath(input_file)))[:8]}"
+    return os.path.join(directory, f"{base_name}{MASTERED_SUFFIX}")
+
+
+def output_paths_for(inputs, output_dir=None):
+    """
+    Girişlerin çıktı yolları (sıra korunur)
+
+    Aynı çıktı yoluna düşen girişler (ör. --output-dir ile a/x.wav ve b/x.wav)
+    klasör hash'iyle ayrıştırılır; iki worker aynı dosyaya yazmaz.
+    """
+    outputs = [output_path_for(input_file, output_dir) for input_file in inputs]
+    counts = {}
+    for output_file in outputs:
+        key = os.path.abspath(output_file)
+        counts[key] = counts.get(key, 0) + 1
+    return [output_path_for(input_file, output_dir, disambiguate=True)
+            if counts[os.path.abspath(output_file)] > 1 else output_file
+            for input_file, output_file in zip(inputs, outputs)]
+
+
+def _load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_fresh(input_file, output_file, digest):
+    """Çıktı girişten yeni ve aynı ayar hash'iyle üretilmişse True"""
+    if not os.path.exists(output_file):
+        return False
+    if os.path.getmtime(output_file) < os.path.getmtime(input_file):
+        return False
+    manifest = _load_manifest(os.path.dirname(output_file) or '.')
+    return manifest.get(os.path.basename(output_file)) == digest
+
+
+def _master_one(task):
+    """Worker: tek dosyayı masterlar (hatalar sonuç olarak döner)"""
+    input_file, output_file, settings, use_cache = task
+
+    start = time.perf_counter()
+    try:
+        if use_cache:
+            cached = master_file_cached(input_file, output_file, settings)
+        else:
+            from advanced_mixing import process_audio_advanced
+            process_audio_advanced(input_file, output_file, **settings)
+            cached = False
+        status, error = ('cached' if cached else 'mastered'), None
+    except Exception as e:
+        status, error = 'failed', str(e)
+    result = {
+        'input': input_file,
+        'output': output_file,
+        'status': status,
+        'seconds': time.perf_counter() - start,
+    }
+    if error:
+        result['error'] = error
+    return result
+
+
+def master_batch(inputs, settings=None, workers=None, output_dir=None, force=False, summary_path=None,
+                 use_cache=True, manifest=True):
+    """
+    Dosyaları paralel masterlar
+
+    Args:
+        inputs: Giriş dosyaları (bkz. collect_inputs)
+        settings: process_audio_advanced ayarları (bass_boost, reverb, target_lufs...)
+        workers: Process sayısı (None = CPU sayısı, 1 = havuz kullanmadan sırayla)
+        output_dir: Çıktı klasörü (None = girişin yanına)
+        force: Güncel çıktıları da yeniden üret
+        summary_path: JSON özetin yazılacağı dosya
+        use_cache: İçerik adresli mastering önbelleğini kullan (bkz. mastering_cache)
+        manifest: Skip-if-fresh manifest'ini oku/yaz (False = her dosyayı işle, klasöre manifest bırakma)
+
+    Returns:
+        dict: files (dosya başına status/seconds), mastered, cached, skipped, failed, total_seconds
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    digest = settings_hash(settings)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    results = {}
+    tasks = []
+    for input_file, output_file in zip(inputs, output_paths_for(inputs, output_dir)):
+        if manifest and not force and is_fresh(input_file, output_file, digest):
+            results[input_file] = {'input': input_file, 'output': output_file,
+                                   'status': 'skipped', 'seconds': 0.0}
+        else:
+            tasks.append((input_file, output_file, settings, use_cache))
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(tasks)) if tasks else 1
+    print(f"🎚️  Mastering {len(tasks)} file(s) with {workers} worker(s), "
+          f"{len(results)} up to date (settings {digest[:8]})")
+    if workers == 1:
+        finished = [_master_one(task) for task in tasks]
+    else:
+        # spawn: fork, thread'li (torch/OpenMP) bir process'ten kilitlenebilir
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            finished = list(executor.map(_master_one, tasks))
+
+    # Manifest güncellemesi sadece ana process'te (worker'lar arası yarış olmasın)
+    manifests = {}
+    for result in finished:
+        results[result['input']] = result
+        if not manifest:
+            continue
+        directory = os.path.dirname(result['output']) or '.'
+        if directory not in manifests:
+            manifests[directory] = _load_manifest(directory)
+        name = os.path.basename(result['output'])
+        if result['status'] in ('mastered', 'cached'):
+            manifests[directory][name] = digest
+        else:
+            manifests[directory].pop(name, None)
+    for directory, manifest in manifests.items():
+        _save_manifest(directory, manifest)
+
+    files = [results[input_file] for input_file in inputs]
+    summary = {
+        'settings': settings,
+        'settings_hash': digest,
+        'workers': workers,
+        'files': files,
+        'mastered': sum(1 for result in files if result['status'] == 'mastered'),
+        'cached': sum(1 for result in files if result['status'] == 'cached'),
+        'skipped': sum(1 for result in files if result['status'] == 'skipped'),
+        'failed': sum(1 for result in files if result['status'] == 'failed'),
+        'total_seconds': time.perf_counter() - start,
+    }
+
+    print(f"✅ Mastered {summary['mastered']}, cached {summary['cached']}, skipped {summary['skipped']}, "
+          f"failed {summary['failed']} in {summary['total_seconds']:.1f}s")
+    for result in files:
+        if result['status'] == 'failed':
+            print(f"❌ {result['input']}: {result['error']}")
+
+    if summary_path:
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Summary saved to: {summary_path}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Toplu Paralel Mastering')
+    parser.add_argument('inputs', type=str, nargs='+', help='Dosyalar, klasörler veya glob desenleri')
+    parser.add_argument('--output-dir', type=str, default=None, help='Çıktı klasörü (varsayılan: girişin yanı)')
+    parser.add_argument('--workers', type=int, default=None, help='Process sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--force', action='store_true', help='Güncel çıktıları da yeniden üret')
+    parser.add_argument('--json', type=str, default=None, help='JSON özet dosyası')
+    parser.add_argument('--no-cache', action='store_true', help='Mastering önbelleğini kullanma')
+    parser.add_argument('--preset', type=str, default=None, choices=preset_names(),
+                       help='Mastering preset (EQ/compression/reverb ayarlarının yerine)')
+    parser.add_argument('--bass-boost', type=float, default=2.0, help='Bass boost (dB)')
+    parser.add_argument('--mid-boost', type=float, default=0, help='Mid boost (dB)')
+    parser.add_argument('--treble-boost', type=float, default=1.0, help='Treble boost (dB)')
+    parser.add_argument('--no-compression', action='store_true', help='Disable compression')
+    parser.add_argument('--no-reverb', action='store_true', help='Disable reverb')
+    parser.add_argument('--stereo-widen', action='store_true', help='Enable stereo widening')
+    parser.add_argument('--target-lufs', type=float, default=-14.0, help='Target LUFS level')
+
+    args = parser.parse_args()
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("❌ No input files found")
+        return
+
+    settings = {
+        'bass_boost': args.bass_boost,
+        'mid_boost': args.mid_boost,
+        'treble_boost': args.treble_boost,
+        'compression': not args.no_compression,
+        'reverb': not args.no_reverb,
+        'stereo_widen': args.stereo_widen,
+        'target_lufs': args.target_lufs,
+    }
+    if args.preset:
+        settings.update(get_preset(args.preset))
+    master_batch(inputs, settings, workers=args.workers, output_dir=args.output_dir,
+                 force=args.force, summary_path=args.json, use_cache=not args.no_cache)
+
+if __name__ == '__main__':
+    main()
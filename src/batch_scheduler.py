@@ -0,0 +1,144 @@
+"""
+Dinamik istek batching'i (micro-batching)
+Farklı çağıranlardan kısa bir pencere içinde gelen prompt'ları toplar,
+aynı üretim ayarlarına sahip olanları tek bir model.generate çağrısında üretir
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _PendingJob:
+    def __init__(self, descriptions, kwargs, group_key):
+        self.descriptions = list(descriptions)
+        self.kwargs = kwargs
+        self.group_key = group_key
+        self.future = Future()
+        self.arrived = time.monotonic()
+
+
+class GenerationBatcher:
+    """
+    MusicGenerator.generate önünde çalışan micro-batching zamanlayıcısı
+
+    Aynı parametrelerle (duration, guidance_scale, output_dir, mastering...) gelen
+    işler tek bir batch'te birleştirilir, sonuçlar her işe geri dağıtılır.
+    Seed verilen işler tekrarlanabilirlik için tek başına çalıştırılır.
+    """
+
+    def __init__(self, generator, window=0.25, max_batch_size=8):
+        """
+        Args:
+            generator: MusicGenerator (generate(descriptions, **kwargs) arayüzü)
+            window: İlk işten sonra diğer işler için beklenecek süre (saniye)
+            max_batch_size: Tek model.generate çağrısındaki maksimum prompt sayısı
+        """
+        self.generator = generator
+        self.window = window
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.batches_run = 0
+        self.prompts_run = 0
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._solo_ids = itertools.count()
+        self._worker = threading.Thread(target=self._run, name='GenerationBatcher', daemon=True)
+        self._worker.start()
+
+    def _group_key(self, kwargs):
+        if kwargs.get('seed') is not None:
+            return ('solo', next(self._solo_ids))
+        return tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+
+    def submit_async(self, descriptions, **kwargs):
+        """İşi kuyruğa ekler, Future döndürür (sonuç: dosya yolları listesi)"""
+        if not descriptions:
+            raise ValueError("'descriptions' is required")
+        job = _PendingJob(descriptions, kwargs, self._group_key(kwargs))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("GenerationBatcher is closed")
+            self._pending.append(job)
+            self._condition.notify()
+        return job.future
+
+    def submit(self, descriptions, **kwargs):
+        """İşi kuyruğa ekler ve sonucu bekler (MusicGenerator.generate ile aynı parametreler)"""
+        return self.submit_async(descriptions, **kwargs).result()
+
+    def close(self):
+        """Bekleyen işleri bitirip worker'ı durdurur"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+
+    def _pending_prompt_count(self):
+        return sum(len(job.descriptions) for job in self._pending)
+
+    def _collect(self):
+        """Pencere dolana veya batch dolana kadar bekler, bekleyen işleri döndürür"""
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return None
+
+            deadline = self._pending[0].arrived + self.window
+            while not self._closed and self._pending_prompt_count() < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            jobs, self._pending = self._pending, []
+            return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            if jobs is None:
+                return
+
+            groups = {}
+            for job in jobs:
+                groups.setdefault(job.group_key, []).append(job)
+
+            for group in groups.values():
+                for batch in self._split(group):
+                    self._run_batch(batch)
+
+    def _split(self, group):
+        """Grubu max_batch_size prompt'luk batch'lere böler (işler bölünmez)"""
+        batch, size = [], 0
+        for job in group:
+            if batch and size + len(job.descriptions) > self.max_batch_size:
+                yield batch
+                batch, size = [], 0
+            batch.append(job)
+            size += len(job.descriptions)
+        if batch:
+            yield batch
+
+    def _run_batch(self, batch):
+        descriptions = [desc for job in batch for desc in job.descriptions]
+        if len(batch) > 1:
+            print(f"📦 Micro-batch: {len(batch)} requests → {len(descriptions)} prompts in one call")
+        try:
+            results = self.generator.generate(descriptions, **batch[0].kwargs)
+        except Exception as e:
+            for job in batch:
+                job.future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.prompts_run += len(descriptions)
+
+        # Sonuçları işlere geri dağıt
+        offset = 0
+        for job in batch:
+            job.future.set_result(list(results[offset:offset + len(job.descriptions)]))
+            offset += len(job.descriptions)
@@ -0,0 +1,204 @@
+"""
+Melodik / spektral analiz benchmark'ı
+Vektörel key tespiti ve pitch konturunu eski döngülü implementasyonlarla,
+pyin konturunu mevcut piptrack konturuyla, hızlı profilin harmonik oranını tam HPSS ile,
+detaylı analizin tamamını da iki profilde hız ve sonuç açısından karşılaştırır
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from audio_features import FeatureContext
+from benchmark_mixing import load_track, timed
+from detailed_audio_analyzer import (FAST_HPSS_KERNEL, detailed_analyze_audio, dominant_pitches, estimate_key,
+                                     fast_harmonic_ratio, pyin_pitches)
+
+
+def legacy_estimate_key(chroma_mean):
+    """Eski 12 key x 2 mod corrcoef döngüsü (sadece referans olarak)"""
+    keys = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+    major_profile = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+    minor_profile = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+    best_key, best_mode, best_correlation = None, None, -1
+    for i, key in enumerate(keys):
+        corr_major = np.corrcoef(chroma_mean, np.roll(major_profile, i))[0, 1]
+        corr_minor = np.corrcoef(chroma_mean, np.roll(minor_profile, i))[0, 1]
+        if corr_major > best_correlation:
+            best_key, best_mode, best_correlation = key, 'major', corr_major
+        if corr_minor > best_correlation:
+            best_key, best_mode, best_correlation = key, 'minor', corr_minor
+    return best_key, best_mode, best_correlation
+
+
+def legacy_dominant_pitches(pitches, magnitudes, threshold=0.1):
+    """Eski frame-frame Python döngüsü (sadece referans olarak)"""
+    pitch_values = []
+    for t in range(pitches.shape[1]):
+        idx = np.argmax(pitches[:, t])
+        if magnitudes[idx, t] > threshold:
+            pitch_values.append(pitches[idx, t])
+    return np.array(pitch_values)
+
+
+def melodic_direction(pitch_values):
+    """analyze_melodic_structure ile aynı yön kararı"""
+    if len(pitch_values) <= 10:
+        return 'stable'
+    pitch_diff = np.diff(pitch_values)
+    if np.sum(pitch_diff > 0) / len(pitch_diff) > 0.4:
+        return 'ascending'
+    if np.sum(pitch_diff < 0) / len(pitch_diff) > 0.4:
+        return 'descending'
+    return 'stable'
+
+
+def synthetic_melody(duration, sample_rate, seed=0):
+    """Test sinyali: A minör gamda harmonikli melodi + perküsif vuruşlar + hafif gürültü"""
+    rng = np.random.default_rng(seed)
+    scale = 220.0 * 2 ** (np.array([0, 2, 3, 5, 7, 8, 10, 12]) / 12)
+    note_length = int(0.25 * sample_rate)
+    notes = rng.choice(scale, size=int(np.ceil(duration * sample_rate / note_length)))
+    freqs = np.repeat(notes, note_length)[:int(duration * sample_rate)]
+    phase = 2 * np.pi * np.cumsum(freqs) / sample_rate
+    audio = sum(np.sin(k * phase) / k for k in (1, 2, 3))
+    t = np.arange(len(audio)) / sample_rate
+    hits = rng.standard_normal(len(audio)) * np.exp(-((t * 2.0) % 1.0) * 40)  # 120 BPM
+    audio = audio + 0.8 * hits + 0.05 * rng.standard_normal(len(audio))
+    return (audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+def benchmark_key(ctx, repeats):
+    print(f"\n{'='*60}\n🎹 Key detection (24 profiles)\n{'='*60}")
+    chroma_mean = np.mean(ctx.chroma, axis=1)
+    legacy_time, legacy = timed(lambda: legacy_estimate_key(chroma_mean), repeats)
+    fast_time, fast = timed(lambda: estimate_key(chroma_mean), repeats)
+    print(f"   legacy loop:        {legacy_time * 1000:9.3f} ms  → {legacy[0]} {legacy[1]} ({legacy[2]:.4f})")
+    print(f"   profile matrix:     {fast_time * 1000:9.3f} ms  → {fast[0]} {fast[1]} ({fast[2]:.4f})"
+          f"  ({legacy_time / fast_time:.0f}x faster)")
+    print(f"   same result:        {legacy[:2] == fast[:2] and abs(legacy[2] - fast[2]) < 1e-9}")
+    return {'legacy_seconds': legacy_time, 'vectorized_seconds': fast_time, 'speedup': legacy_time / fast_time}
+
+
+def benchmark_contour(y, sr, ctx, repeats, pyin=True):
+    print(f"\n{'='*60}\n🎼 Melodic contour ({len(y) / sr:.1f}s @ {sr} Hz)\n{'='*60}")
+    piptrack_time, (pitches, magnitudes) = timed(lambda: FeatureContext(y, sr).piptrack)
+    legacy_time, legacy = timed(lambda: legacy_dominant_pitches(pitches, magnitudes), repeats)
+    fast_time, fast = timed(lambda: dominant_pitches(pitches, magnitudes), repeats)
+    identical = len(legacy) == len(fast) and np.array_equal(legacy, fast)
+
+    print(f"   piptrack:           {piptrack_time * 1000:9.1f} ms")
+    print(f"   legacy frame loop:  {legacy_time * 1000:9.1f} ms")
+    print(f"   argmax + indexing:  {fast_time * 1000:9.1f} ms  ({legacy_time / fast_time:.0f}x faster)")
+    print(f"   identical contour:  {identical}  ({len(fast)} voiced frames, {melodic_direction(fast)})")
+    results = {
+        'legacy_seconds': legacy_time,
+        'vectorized_seconds': fast_time,
+        'speedup': legacy_time / fast_time,
+        'identical': identical,
+    }
+
+    if pyin:
+        pyin_time, f0 = timed(lambda: pyin_pitches(y, sr))
+        median_f0 = np.median(f0) if len(f0) else float('nan')
+        print(f"   pyin (decimated):   {pyin_time * 1000:9.1f} ms  "
+              f"({len(f0)} voiced frames, median f0 {median_f0:.1f} Hz, {melodic_direction(f0)})")
+        print(f"   piptrack median:    {np.median(fast) if len(fast) else float('nan'):9.1f} Hz")
+        results['pyin_seconds'] = pyin_time
+    return results
+
+
+def time_domain_harmonic_ratio(ctx):
+    """Tam profil: HPSS + istft, zaman bölgesi enerjileri"""
+    y_harmonic, y_percussive = ctx.hpss
+    harmonic_energy = np.sum(y_harmonic ** 2)
+    total_energy = harmonic_energy + np.sum(y_percussive ** 2)
+    return harmonic_energy / total_energy if total_energy > 0 else 0.5
+
+
+def benchmark_harmonic_ratio(y, sr):
+    print(f"\n{'='*60}\n🎻 Harmonic ratio ({len(y) / sr:.1f}s @ {sr} Hz)\n{'='*60}")
+    full_time, full = timed(lambda: time_domain_harmonic_ratio(FeatureContext(y, sr)))
+    magnitude_time, magnitude = timed(lambda: FeatureContext(y, sr).harmonic_ratio())
+
+    fast_time, fast_ratio = timed(lambda: fast_harmonic_ratio(y, sr))
+
+    print(f"   full (HPSS + istft):        {full_time * 1000:9.1f} ms  ratio {full:.4f}")
+    print(f"   magnitude HPSS, kernel 31:  {magnitude_time * 1000:9.1f} ms  ratio {magnitude:.4f}"
+          f"  (error {magnitude - full:+.4f})")
+    print(f"   fast profile, kernel {FAST_HPSS_KERNEL}:   {fast_time * 1000:9.1f} ms  ratio {fast_ratio:.4f}"
+          f"  (error {fast_ratio - full:+.4f}, {full_time / fast_time:.1f}x faster)")
+    return {
+        'full_seconds': full_time,
+        'fast_seconds': fast_time,
+        'speedup': full_time / fast_time,
+        'full_ratio': full,
+        'fast_ratio': fast_ratio,
+    }
+
+
+def benchmark_profiles(y, sr, duration=None):
+    print(f"\n{'='*60}\n⚡ Detailed analysis profiles (full vs fast)\n{'='*60}")
+    fd, path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+    try:
+        sf.write(path, y, sr)
+        analyses = {}
+        times = {}
+        for profile in ('full', 'fast'):
+            # Bölümlerin kendi çıktıları bastırılır
+            with contextlib.redirect_stdout(io.StringIO()):
+                times[profile], analyses[profile] = timed(lambda: detailed_analyze_audio(
+                    path, skip_seconds=0, analysis_duration=duration or len(y) / sr, profile=profile))
+    finally:
+        os.remove(path)
+
+    full, fast = analyses['full'], analyses['fast']
+    same = {
+        'key': (full['melodic']['key'], full['melodic']['mode']) == (fast['melodic']['key'], fast['melodic']['mode']),
+        'tempo': full['tempo'] == fast['tempo'],
+        'genre': full['estimated_genre'] == fast['estimated_genre'],
+        'instruments': full['instruments'] == fast['instruments'],
+    }
+    print(f"   full:               {times['full']:9.2f} s")
+    print(f"   fast:               {times['fast']:9.2f} s  ({times['full'] / times['fast']:.1f}x faster)")
+    print(f"   key / tempo:        {full['melodic']['key']} {full['melodic']['mode']}, {full['tempo']} BPM"
+          f"  (same: {same['key'] and same['tempo']})")
+    print(f"   genre / instruments same: {same['genre'] and same['instruments']}")
+    print(f"   harmonic ratio:     {full['spectral']['harmonic_ratio']:.4f} → {fast['spectral']['harmonic_ratio']:.4f}")
+    return {'full_seconds': times['full'], 'fast_seconds': times['fast'], 'same': same}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Melodik / Spektral Analiz Benchmark')
+    parser.add_argument('input', type=str, nargs='?', default=None,
+                       help='Test için WAV dosyası (varsayılan: sentetik melodi)')
+    parser.add_argument('--duration', type=float, default=30.0,
+                       help='Sentetik sinyal süresi (saniye)')
+    parser.add_argument('--sample-rate', type=int, default=44100,
+                       help='Sentetik sinyal sample rate')
+    parser.add_argument('--repeats', type=int, default=3,
+                       help='Vektörel işlemler için tekrar sayısı (en iyi süre alınır)')
+    parser.add_argument('--no-pyin', action='store_true',
+                       help='pyin karşılaştırmasını atla')
+
+    args = parser.parse_args()
+
+    if args.input:
+        y, sr = load_track(args.input)
+    else:
+        y, sr = synthetic_melody(args.duration, args.sample_rate), args.sample_rate
+
+    ctx = FeatureContext(y, sr)
+    benchmark_key(ctx, args.repeats)
+    benchmark_contour(y, sr, ctx, args.repeats, pyin=not args.no_pyin)
+    benchmark_harmonic_ratio(y, sr)
+    benchmark_profiles(y, sr)
+
+if __name__ == '__main__':
+    main()
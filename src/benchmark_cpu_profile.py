@@ -0,0 +1,121 @@
+"""
+CPU performans profillerinin benchmark'ı
+Her profil için token/saniye hızını ve varsayılan profile göre ses kalitesi farkını ölçer
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import torch
+from scipy import signal
+
+import model_registry
+from generate import CPU_PROFILES, MusicGenerator
+
+BENCHMARK_PROMPTS = [
+    "upbeat electronic dance music, driving bass, 128 BPM",
+    "calm acoustic guitar and piano, warm, relaxed",
+]
+
+
+def average_spectrum_db(audio, sample_rate):
+    """Ortalama güç spektrumu (dB) - Welch"""
+    _, psd = signal.welch(audio, fs=sample_rate, nperseg=2048, axis=-1)
+    return 10 * np.log10(np.mean(psd, axis=0) + 1e-12)
+
+
+def quality_metrics(audio, sample_rate):
+    """Basit kalite göstergeleri: RMS (dB), spektral düzlük, ortalama spektrum"""
+    mono = audio.mean(axis=1) if audio.ndim == 3 else audio
+    rms_db = 10 * np.log10(np.mean(mono ** 2, axis=-1) + 1e-10)
+    _, psd = signal.welch(mono, fs=sample_rate, nperseg=2048, axis=-1)
+    psd = psd + 1e-12
+    flatness = np.exp(np.mean(np.log(psd), axis=-1)) / np.mean(psd, axis=-1)
+    return {
+        'rms_db': float(np.mean(rms_db)),
+        'spectral_flatness': float(np.mean(flatness)),
+        'spectrum_db': average_spectrum_db(mono, sample_rate)
+    }
+
+
+def benchmark_profile(profile_name, model_size, duration, seed, runs):
+    """Tek profil için hız ve kalite ölçer"""
+    print(f"\n{'='*60}\n⏱️  Profile: {profile_name}\n{'='*60}")
+    generator = MusicGenerator(model_size=model_size, device='cpu', cpu_profile=profile_name)
+    frame_rate = generator.sample_rate / generator.model.config.audio_encoder.hop_length
+    max_new_tokens = int(duration * frame_rate)
+
+    inputs = generator.processor(text=BENCHMARK_PROMPTS, padding=True, return_tensors="pt")
+
+    # Isınma (torch.compile ve oneDNN ilk çağrıda hazırlanır)
+    generator._model_generate(inputs, 3.0, min(max_new_tokens, int(frame_rate)))
+
+    timings = []
+    audio = None
+    for _ in range(runs):
+        torch.manual_seed(seed)
+        start = time.perf_counter()
+        audio = generator._model_generate(inputs, 3.0, max_new_tokens)
+        timings.append(time.perf_counter() - start)
+
+    elapsed = float(np.median(timings))
+    tokens = max_new_tokens * len(BENCHMARK_PROMPTS)
+    metrics = quality_metrics(audio.float().cpu().numpy(), generator.sample_rate)
+    # Profil modeli bellekte kalmasın (derlenmiş decoder ayrı anahtarda)
+    model_registry.unload_model(generator.model_size, 'cpu', generator.model_dtype,
+                                compiled=generator.model_compiled)
+    print(f"   {tokens / elapsed:.1f} tokens/s ({elapsed:.2f}s for {len(BENCHMARK_PROMPTS)}x{duration}s)")
+    return {
+        'profile': profile_name,
+        'seconds': elapsed,
+        'tokens_per_second': tokens / elapsed,
+        'realtime_factor': duration * len(BENCHMARK_PROMPTS) / elapsed,
+        **metrics
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CPU Profil Benchmark')
+    parser.add_argument('--model', type=str, default='small',
+                       choices=['small', 'medium', 'large'])
+    parser.add_argument('--duration', type=int, default=8,
+                       help='Üretilecek süre (saniye)')
+    parser.add_argument('--profiles', type=str, nargs='*', default=list(CPU_PROFILES),
+                       choices=list(CPU_PROFILES),
+                       help='Karşılaştırılacak profiller (ilk profil referanstır)')
+    parser.add_argument('--runs', type=int, default=2,
+                       help='Profil başına tekrar sayısı (medyan alınır)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', type=str, default=None,
+                       help='Sonuçları JSON olarak kaydet')
+
+    args = parser.parse_args()
+
+    results = [benchmark_profile(name, args.model, args.duration, args.seed, args.runs)
+               for name in args.profiles]
+
+    reference = results[0]
+    print(f"\n{'='*78}")
+    print(f"{'profile':<10} {'tok/s':>8} {'speedup':>8} {'x realtime':>11} "
+          f"{'rms dB':>8} {'flatness':>9} {'spec. dist dB':>14}")
+    print('-' * 78)
+    for result in results:
+        # Ortalama spektrumlar arası ortalama mutlak fark (örnekleme farklı olsa da tını kayması görünür)
+        spectral_distance = float(np.mean(np.abs(result['spectrum_db'] - reference['spectrum_db'])))
+        result['spectral_distance_db'] = spectral_distance
+        print(f"{result['profile']:<10} {result['tokens_per_second']:>8.1f} "
+              f"{result['tokens_per_second'] / reference['tokens_per_second']:>7.2f}x "
+              f"{result['realtime_factor']:>10.2f}x {result['rms_db']:>8.1f} "
+              f"{result['spectral_flatness']:>9.4f} {spectral_distance:>14.2f}")
+
+    if args.json:
+        for result in results:
+            result.pop('spectrum_db')
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Mastering zinciri benchmark'ı
+Vektörel işlemcileri eski (referans) implementasyonlarla hız ve çıktı farkı açısından karşılaştırır
+"""
+
+import argparse
+import time
+
+import numpy as np
+import scipy.io.wavfile as wavfile
+from scipy import signal
+
+from compressor import compress
+from eq_bank import apply_eq_bank, design_eq_bank, three_band
+from mastering_presets import get_preset, preset_names
+from reverb import ConvolutionReverb, convolution_reverb
+
+
+def legacy_apply_compression(audio, threshold=0.7, ratio=4.0, attack=0.003, release=0.1, sample_rate=32000):
+    """Eski örnek-örnek Python döngülü kompresör (sadece referans olarak)"""
+    attack_samples = int(attack * sample_rate)
+    release_samples = int(release * sample_rate)
+
+    envelope = np.abs(audio)
+    gain_reduction = np.ones_like(audio)
+
+    for i in range(1, len(audio)):
+        if envelope[i] > threshold:
+            excess = envelope[i] - threshold
+            reduced_excess = excess / ratio
+            target_level = threshold + reduced_excess
+            reduction = target_level / envelope[i] if envelope[i] > 0 else 1.0
+
+            if gain_reduction[i-1] > reduction:
+                gain_reduction[i] = gain_reduction[i-1] - (gain_reduction[i-1] - reduction) / attack_samples
+            else:
+                gain_reduction[i] = reduction
+        else:
+            if gain_reduction[i-1] < 1.0:
+                gain_reduction[i] = gain_reduction[i-1] + (1.0 - gain_reduction[i-1]) / release_samples
+            else:
+                gain_reduction[i] = 1.0
+
+    return audio * gain_reduction
+
+
+def legacy_apply_eq(audio, sample_rate, bass_boost=0, mid_boost=0, treble_boost=0):
+    """Eski 3 ayrı Butterworth + filtfilt geçişli EQ (sadece referans olarak)"""
+    nyquist = sample_rate / 2
+    if bass_boost != 0:
+        b, a = signal.butter(4, 250 / nyquist, btype='low')
+        audio = audio + signal.filtfilt(b, a, audio) * (10 ** (bass_boost / 20) - 1)
+    if mid_boost != 0:
+        b, a = signal.butter(4, [250 / nyquist, 4000 / nyquist], btype='band')
+        audio = audio + signal.filtfilt(b, a, audio) * (10 ** (mid_boost / 20) - 1)
+    if treble_boost != 0:
+        b, a = signal.butter(4, 4000 / nyquist, btype='high')
+        audio = audio + signal.filtfilt(b, a, audio) * (10 ** (treble_boost / 20) - 1)
+    return audio
+
+
+def legacy_eq_response_db(freqs, sample_rate, bass_boost, mid_boost, treble_boost):
+    """Eski EQ'nun (zero-phase) frekans cevabı, dB"""
+    nyquist = sample_rate / 2
+    response = np.ones_like(freqs)
+    stages = ((bass_boost, 250 / nyquist, 'low'),
+              (mid_boost, [250 / nyquist, 4000 / nyquist], 'band'),
+              (treble_boost, 4000 / nyquist, 'high'))
+    for gain_db, cutoff, btype in stages:
+        if gain_db != 0:
+            b, a = signal.butter(4, cutoff, btype=btype)
+            _, h = signal.freqz(b, a, worN=freqs, fs=sample_rate)
+            response = response * (1 + (10 ** (gain_db / 20) - 1) * np.abs(h) ** 2)
+    return 20 * np.log10(response)
+
+
+def legacy_apply_reverb(audio, sample_rate, room_size=0.5, damping=0.5, wet_level=0.3):
+    """Eski 3 gecikme hatlı reverb (sadece referans olarak)"""
+    delay_samples = int(sample_rate * 0.03 * room_size)
+    decay = 1.0 - damping
+    delays = [int(delay_samples * (1 + i * 0.3)) for i in range(3)]
+    reverb_signal = np.zeros_like(audio)
+    for delay in delays:
+        if delay < len(audio):
+            delayed = np.zeros_like(audio)
+            delayed[delay:] = audio[:-delay] * (decay ** (delay / delay_samples))
+            reverb_signal += delayed * 0.3
+    return audio * (1 - wet_level) + reverb_signal * wet_level
+
+
+def synthetic_track(duration, sample_rate, seed=0):
+    """Müziğe benzer test sinyali: akor + perküsif gürültü vuruşları, tepe 1.0"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    chord = sum(np.sin(2 * np.pi * freq * t) for freq in (110.0, 220.0, 277.2, 329.6))
+    beat_phase = (t * 2.0) % 1.0  # 120 BPM
+    hits = rng.standard_normal(len(t)) * np.exp(-beat_phase * 25)
+    swell = 0.6 + 0.4 * np.sin(2 * np.pi * 0.1 * t)
+    audio = (chord * 0.3 * swell + hits).astype(np.float32)
+    return audio / np.max(np.abs(audio))
+
+
+def load_track(path):
+    """WAV dosyasını mono float32 [-1, 1] olarak okur"""
+    sample_rate, audio = wavfile.read(path)
+    audio = audio.astype(np.float32)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    peak = np.max(np.abs(audio))
+    return (audio / peak if peak > 0 else audio), sample_rate
+
+
+def timed(fn, repeats=1):
+    """En iyi süre (saniye) ve son çıktı"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def difference_db(reference, candidate):
+    """Fark sinyalinin referansa göre seviyesi (dB, düşük = daha benzer)"""
+    noise = np.sqrt(np.mean((reference - candidate) ** 2))
+    level = np.sqrt(np.mean(reference ** 2))
+    return 20 * np.log10(noise / level + 1e-12)
+
+
+def benchmark_compression(audio, sample_rate, repeats):
+    print(f"\n{'='*60}\n🗜️  Compressor ({len(audio) / sample_rate:.1f}s @ {sample_rate} Hz)\n{'='*60}")
+    legacy_time, legacy = timed(lambda: legacy_apply_compression(audio, sample_rate=sample_rate))
+    fast_time, fast = timed(lambda: compress(audio, sample_rate=sample_rate), repeats)
+    stereo = np.stack([audio, np.roll(audio, 7)])
+    linked_time, _ = timed(lambda: compress(stereo, sample_rate=sample_rate, lookahead=0.005), repeats)
+
+    print(f"   legacy loop:        {legacy_time * 1000:9.1f} ms")
+    print(f"   vectorized:         {fast_time * 1000:9.1f} ms  ({legacy_time / fast_time:.0f}x faster)")
+    print(f"   stereo + lookahead: {linked_time * 1000:9.1f} ms")
+    print(f"   output difference:  {difference_db(legacy, fast):9.1f} dB (relative to legacy output)")
+    print(f"   peak difference:    {np.max(np.abs(legacy - fast)):9.4f}")
+    return {
+        'legacy_seconds': legacy_time,
+        'vectorized_seconds': fast_time,
+        'speedup': legacy_time / fast_time,
+        'difference_db': difference_db(legacy, fast),
+    }
+
+
+def eq_response_deviation_db(sample_rate, gains):
+    """SOS bankasının eski EQ'ya göre en büyük frekans cevabı farkı (dB, 20 Hz - Nyquist)"""
+    freqs = np.geomspace(20, sample_rate / 2 * 0.95, 1000)
+    sos = design_eq_bank(sample_rate, three_band(*gains), True)
+    if sos is None:
+        return 0.0
+    _, h = signal.sosfreqz(sos, worN=freqs, fs=sample_rate)
+    return float(np.max(np.abs(40 * np.log10(np.abs(h)) - legacy_eq_response_db(freqs, sample_rate, *gains))))
+
+
+def preset_gains(name):
+    preset = get_preset(name)
+    return preset['bass_boost'], preset['mid_boost'], preset['treble_boost']
+
+
+def benchmark_eq(audio, sample_rate, repeats, preset='default'):
+    gains = preset_gains(preset)
+    print(f"\n{'='*60}\n🎛️  EQ bank ('{preset}': bass {gains[0]} / mid {gains[1]} / treble {gains[2]} dB)\n{'='*60}")
+    bands = three_band(*gains)
+    legacy_time, legacy = timed(lambda: legacy_apply_eq(audio, sample_rate, *gains), repeats)
+    design_eq_bank.cache_clear()
+    cold_time, _ = timed(lambda: apply_eq_bank(audio, sample_rate, bands))
+    fast_time, fast = timed(lambda: apply_eq_bank(audio, sample_rate, bands), repeats)
+    chunk_time, _ = timed(lambda: apply_eq_bank(audio, sample_rate, bands, chunk_size=65536), repeats)
+    stereo = np.stack([audio, np.roll(audio, 7)])
+    stereo_time, _ = timed(lambda: apply_eq_bank(stereo, sample_rate, bands), repeats)
+
+    print(f"   legacy 3x filtfilt: {legacy_time * 1000:9.1f} ms")
+    print(f"   SOS bank (cold):    {cold_time * 1000:9.1f} ms")
+    print(f"   SOS bank (cached):  {fast_time * 1000:9.1f} ms  ({legacy_time / fast_time:.1f}x faster)")
+    print(f"   chunked (causal):   {chunk_time * 1000:9.1f} ms")
+    print(f"   stereo:             {stereo_time * 1000:9.1f} ms")
+    print(f"   output difference:  {difference_db(legacy, fast):9.1f} dB (relative to legacy output)")
+    deviations = {name: eq_response_deviation_db(sample_rate, preset_gains(name)) for name in preset_names()}
+    for name, deviation in deviations.items():
+        print(f"   response deviation {name:17s} {deviation:.2e} dB (max, 20 Hz - Nyquist)")
+    return {
+        'legacy_seconds': legacy_time,
+        'vectorized_seconds': fast_time,
+        'speedup': legacy_time / fast_time,
+        'response_deviation_db': deviations,
+    }
+
+
+def benchmark_reverb(audio, sample_rate, repeats, block_size=65536):
+    print(f"\n{'='*60}\n🏛️  Convolution reverb\n{'='*60}")
+    legacy_time, _ = timed(lambda: legacy_apply_reverb(audio, sample_rate, room_size=0.3, wet_level=0.15), repeats)
+    results = {'legacy_seconds': legacy_time}
+    print(f"   legacy delay lines: {legacy_time * 1000:9.1f} ms")
+    for preset in ('small', 'hall'):
+        fast_time, full = timed(lambda: convolution_reverb(audio, sample_rate, wet_level=0.15, preset=preset), repeats)
+
+        def blockwise():
+            reverb = ConvolutionReverb(sample_rate, wet_level=0.15, preset=preset)
+            return np.concatenate([reverb.process(audio[i:i + block_size])
+                                   for i in range(0, len(audio), block_size)])
+        block_time, blocks = timed(blockwise, repeats)
+        print(f"   {preset + ' (full)':19s} {fast_time * 1000:9.1f} ms")
+        print(f"   {preset + ' (blocks)':19s} {block_time * 1000:9.1f} ms  "
+              f"(block/full difference {difference_db(full, blocks):.0f} dB)")
+        results[preset] = {'full_seconds': fast_time, 'block_seconds': block_time}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mastering Zinciri Benchmark')
+    parser.add_argument('input', type=str, nargs='?', default=None,
+                       help='Test için WAV dosyası (varsayılan: sentetik sinyal)')
+    parser.add_argument('--duration', type=float, default=30.0,
+                       help='Sentetik sinyal süresi (saniye)')
+    parser.add_argument('--sample-rate', type=int, default=32000,
+                       help='Sentetik sinyal sample rate')
+    parser.add_argument('--eq-preset', type=str, default='default', choices=preset_names(),
+                       help='EQ süresi ölçülen mastering preset\'i')
+    parser.add_argument('--repeats', type=int, default=3,
+                       help='Vektörel işlemler için tekrar sayısı (en iyi süre alınır)')
+
+    args = parser.parse_args()
+
+    if args.input:
+        audio, sample_rate = load_track(args.input)
+    else:
+        audio, sample_rate = synthetic_track(args.duration, args.sample_rate), args.sample_rate
+
+    benchmark_compression(audio, sample_rate, args.repeats)
+    benchmark_eq(audio, sample_rate, args.repeats, args.eq_preset)
+    benchmark_reverb(audio, sample_rate, args.repeats)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Ortak önbellek klasörü yardımcıları
+Tüm disk önbellekleri (prompt embedding, analiz, mastering) aynı kök altında tutulur
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+# Önbellek kök klasörünü değiştirmek için ortam değişkeni
+CACHE_DIR_ENV = 'NEURAL_BEATS_CACHE_DIR'
+
+
+def get_cache_dir(*parts):
+    """
+    Önbellek klasörünü döndürür (yoksa oluşturur)
+
+    Args:
+        *parts: Kök altındaki alt klasörler (örn: 'prompt_embeddings', 'small')
+
+    Returns:
+        str: Klasör yolu
+    """
+    root = os.environ.get(CACHE_DIR_ENV) or str(Path.home() / '.cache' / 'neural_beats_studio')
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def text_hash(*parts):
+    """Metin parçalarından kararlı sha256 anahtarı"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def source_hash(*module_names):
+    """
+    src/ altındaki modüllerin kaynak kodu hash'i (kod değişince önbellekler geçersiz olur)
+
+    Args:
+        *module_names: Dosya adları (örn: 'reverb.py')
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in module_names:
+        with open(os.path.join(directory, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
@@ -8,44 +8,14 @@ import sys
 import subprocess
 import argparse
 
+from media_tools import find_ffmpeg
+
 # Windows konsol encoding sorununu çöz
 if sys.platform == 'win32':
     import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-def find_ffmpeg():
-    """FFmpeg yolunu bulur"""
-    # PATH'te ara
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], 
-                               capture_output=True, 
-                               timeout=5)
-        if result.returncode == 0:
-            return 'ffmpeg'
-    except:
-        pass
-    
-    # Winget yolu (Windows)
-    import glob
-    winget_pattern = os.path.expanduser(
-        r'~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_*\ffmpeg-*\bin\ffmpeg.exe'
-    )
-    matches = glob.glob(winget_pattern)
-    if matches:
-        return matches[0]
-    
-    # Common locations
-    common_paths = [
-        r'C:\ffmpeg\bin\ffmpeg.exe',
-        r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-    ]
-    for path in common_paths:
-        if os.path.exists(path):
-            return path
-    
-    return None
-
 def combine_video_with_music(video_file, music_file, output_file=None, 
                              video_volume=0.3, music_volume=0.7):
     """
@@ -0,0 +1,167 @@
+"""
+Vektörel kompresör motoru
+Eski örnek-örnek döngünün kazanç kuralı döngü olmadan, birebir hesaplanır
+
+Azaltım d = 1 - kazanç olmak üzere her örnekteki adım d → min(C, A·d + B) biçimindedir
+(eşik üstü: attack/anında bırakma, eşik altı: üstel release). Bu biçimdeki fonksiyonların
+bileşimi yine aynı biçimde olduğundan tekrar, eşik üstü örnekler üzerinde log(N) adımlı
+paralel prefix taramasıyla çözülür; eşik altı örnekler kapalı formla doldurulur.
+Tarama sabit boyutlu bloklarda yapılır, blok sonundaki azaltım sonraki bloğa taşınır.
+"""
+
+import numpy as np
+
+# gain_curve tarama bloğu (örnek): log(blok) adımlı tarama, bellek bloğa sınırlı
+GAIN_BLOCK_SIZE = 65536
+
+
+def target_gain_reduction(envelope, threshold, ratio):
+    """
+    Anlık hedef kazanç azaltımı (0 = azaltım yok, 1 = tamamen kısılmış)
+
+    Args:
+        envelope: Mutlak seviye (|x|), [..., samples]
+        threshold: Eşik değeri (0-1)
+        ratio: Kompresyon oranı
+    """
+    envelope = np.maximum(envelope, 1e-12)
+    target_level = threshold + (envelope - threshold) / ratio
+    return 1.0 - np.minimum(1.0, target_level / envelope)
+
+
+def _min_affine_prefix(C, A, B):
+    """
+    f_k(d) = min(C_k, A_k·d + B_k) için F_k = f_k ∘ ... ∘ f_0 (Hillis-Steele taraması)
+
+    Bileşim: (C2, A2, B2) ∘ (C1, A1, B1) = (min(C2, A2·C1 + B2), A2·A1, A2·B1 + B2), A ≥ 0
+    """
+    C, A, B = C.copy(), A.copy(), B.copy()
+    shift = 1
+    while shift < len(C):
+        new_C = np.minimum(C[shift:], A[shift:] * C[:-shift] + B[shift:])
+        new_B = A[shift:] * B[:-shift] + B[shift:]
+        new_A = A[shift:] * A[:-shift]
+        C[shift:], A[shift:], B[shift:] = new_C, new_A, new_B
+        shift *= 2
+    return C, A, B
+
+
+def _reduction_curve(reduction, alpha, beta, start):
+    """Tek kanal için azaltım eğrisi ve bloğun son değeri"""
+    samples = len(reduction)
+    above_idx = np.flatnonzero(reduction > 0)
+    index = np.arange(samples)
+
+    if len(above_idx) == 0:
+        curve = start * beta ** (index + 1)
+        return curve, curve[-1]
+
+    # Eşik üstü örnek k: d = min(t, (1-α)·d_önceki + α·t), araya giren eşik altı örnekler β^boşluk
+    gaps = np.diff(above_idx, prepend=-1) - 1
+    targets = reduction[above_idx]
+    C, A, B = _min_affine_prefix(targets, (1.0 - alpha) * beta ** gaps, alpha * targets)
+    above_values = np.minimum(C, A * start + B)
+
+    # Eşik altı örnekler: son eşik üstü değerden (yoksa bloğa giren değerden) üstel sönüm
+    last = np.maximum.accumulate(np.where(reduction > 0, index, -1))
+    has_above = last >= 0
+    held = np.zeros(samples)
+    held[above_idx] = above_values
+    base = np.where(has_above, held[last], start * beta)
+    decay = np.where(has_above, index - last, index)
+    curve = base * np.exp(decay * np.log(beta)) if beta > 0 else np.where(decay == 0, base, 0.0)
+    return curve, curve[-1]
+
+
+def _gain_block(envelope, threshold, ratio, alpha, beta, state):
+    """Bir bloğun kazancı; state = bloğa giren azaltım (None = sinyalin başı)"""
+    envelope = np.asarray(envelope, dtype=np.float64)
+    reduction = target_gain_reduction(envelope, threshold, ratio)
+    channel_shape = reduction.shape[:-1]
+    samples = reduction.shape[-1]
+
+    if state is None:
+        # İlk örnekte kazanç 1 (eski döngüyle aynı)
+        reduction[..., 0] = 0.0
+        state = np.zeros(channel_shape)
+
+    flat = reduction.reshape(-1, samples)
+    starts = np.broadcast_to(state, channel_shape).reshape(-1)
+    curves = np.empty_like(flat)
+    ends = np.empty(len(flat))
+    for channel in range(len(flat)):
+        curves[channel], ends[channel] = _reduction_curve(flat[channel], alpha, beta, starts[channel])
+
+    return 1.0 - curves.reshape(reduction.shape), ends.reshape(channel_shape)
+
+
+def gain_curve(envelope, threshold=0.7, ratio=4.0, attack_samples=96, release_samples=3200,
+               state=None, block_size=GAIN_BLOCK_SIZE):
+    """
+    Kazanç eğrisini hesaplar
+
+    Eşik üstünde azaltım hedefe 1/attack_samples adımıyla yaklaşır, daha az azaltım
+    gerekiyorsa hemen bırakılır; eşik altında 1/release_samples adımıyla 1'e döner.
+    Tarama block_size'lık bloklarda yapılır, azaltım bloklar arasında taşınır
+    (bellek sinyal uzunluğundan bağımsız, sonuç tek blokla aynı)
+
+    Args:
+        envelope: Dedektör sinyali (|x| veya kanalların maksimumu), [..., samples]
+        threshold: Eşik değeri (0-1)
+        ratio: Kompresyon oranı (örn: 4:1)
+        attack_samples: Attack süresi (örnek)
+        release_samples: Release süresi (örnek)
+        state: Önceki bloğun son azaltım değeri (blok blok işleme için), None = sıfırdan
+        block_size: Tarama bloğu (örnek)
+
+    Returns:
+        (gain [..., samples], state)
+    """
+    envelope = np.asarray(envelope)
+    samples = envelope.shape[-1]
+    if samples == 0:
+        return np.ones(envelope.shape), state
+
+    alpha = 1.0 / max(attack_samples, 1)
+    beta = 1.0 - 1.0 / max(release_samples, 1)
+
+    gain = np.empty(envelope.shape)
+    for start in range(0, samples, block_size):
+        block = slice(start, start + block_size)
+        gain[..., block], state = _gain_block(envelope[..., block], threshold, ratio, alpha, beta, state)
+    return gain, state
+
+
+def compress(audio, threshold=0.7, ratio=4.0, attack=0.003, release=0.1, sample_rate=32000,
+             lookahead=0.0, stereo_link=True):
+    """
+    Kompresyon uygular
+
+    Args:
+        audio: Mono [samples] veya çok kanallı [channels, samples] audio
+        threshold: Eşik değeri (0-1)
+        ratio: Kompresyon oranı
+        attack: Saldırı süresi (saniye)
+        release: Bırakma süresi (saniye)
+        sample_rate: Sample rate
+        lookahead: İleri bakma süresi (saniye) - kazanç tepeden önce iner
+        stereo_link: Tüm kanallara aynı kazanç (stereo görüntü kaymaz)
+    """
+    envelope = np.abs(audio)
+    if audio.ndim > 1 and stereo_link:
+        envelope = envelope.max(axis=0)
+
+    gain, _ = gain_curve(
+        envelope, threshold=threshold, ratio=ratio,
+        attack_samples=int(attack * sample_rate),
+        release_samples=int(release * sample_rate)
+    )
+
+    lookahead_samples = min(int(lookahead * sample_rate), gain.shape[-1])
+    if lookahead_samples > 0:
+        # Sinyal yerine kazancı öne kaydır (çıktı uzunluğu ve hizası değişmez)
+        tail = np.repeat(gain[..., -1:], lookahead_samples, axis=-1)
+        gain = np.concatenate([gain[..., lookahead_samples:], tail], axis=-1)
+
+    # float64 çarpım, doğrudan giriş dtype'ına yazılır (tam boy float64 ara dizi yok)
+    return np.multiply(audio, gain, out=np.empty(audio.shape, dtype=audio.dtype), casting='same_kind')
@@ -14,41 +14,14 @@ from PIL import Image, ImageDraw, ImageFilter
 import random
 import math
 
+from media_tools import find_ffmpeg, h264_encoder
+
 # Windows konsol encoding sorununu çöz
 if sys.platform == 'win32':
     import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-def find_ffmpeg():
-    """FFmpeg yolunu bulur"""
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], 
-                               capture_output=True, 
-                               timeout=5)
-        if result.returncode == 0:
-            return 'ffmpeg'
-    except:
-        pass
-    
-    import glob
-    winget_pattern = os.path.expanduser(
-        r'~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_*\ffmpeg-*\bin\ffmpeg.exe'
-    )
-    matches = glob.glob(winget_pattern)
-    if matches:
-        return matches[0]
-    
-    common_paths = [
-        r'C:\ffmpeg\bin\ffmpeg.exe',
-        r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-    ]
-    for path in common_paths:
-        if os.path.exists(path):
-            return path
-    
-    return None
-
 def create_rain_effect(width, height, frame_count, intensity=0.5):
     """
     Yağmur efekti oluşturur
@@ -512,15 +485,16 @@ def frames_to_video(frames, output_path, fps=30, audio_file=None):
     # FFmpeg ile video oluştur
     print(f"[VIDEO] Creating video from frames...")
     
-    # Önce sadece video oluştur (ses olmadan)
+    # Önce sadece video oluştur (ses olmadan) - libx264 yoksa donanım encoder'ı
+    encoder = h264_encoder()
     cmd_video = [
         ffmpeg,
         '-y',  # Overwrite
         '-framerate', str(fps),
         '-i', os.path.join(temp_dir, 'frame_%06d.jpg'),
-        '-c:v', 'libx264',
+        '-c:v', encoder,
         '-pix_fmt', 'yuv420p',
-        '-crf', '23',
+        *(['-crf', '23'] if encoder == 'libx264' else ['-b:v', '8M']),
         '-an',  # Ses yok (şimdilik)
         temp_video
     ]
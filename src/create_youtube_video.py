@@ -10,44 +10,14 @@ import subprocess
 import argparse
 from pathlib import Path
 
+from media_tools import find_ffmpeg, h264_encoder
+
 # Windows konsol encoding sorununu çöz
 if sys.platform == 'win32':
     import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-def find_ffmpeg():
-    """FFmpeg yolunu bulur"""
-    # PATH'te ara
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], 
-                               capture_output=True, 
-                               timeout=5)
-        if result.returncode == 0:
-            return 'ffmpeg'
-    except:
-        pass
-    
-    # Winget yolu (Windows)
-    import glob
-    winget_pattern = os.path.expanduser(
-        r'~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_*\ffmpeg-*\bin\ffmpeg.exe'
-    )
-    matches = glob.glob(winget_pattern)
-    if matches:
-        return matches[0]
-    
-    # Common locations
-    common_paths = [
-        r'C:\ffmpeg\bin\ffmpeg.exe',
-        r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-    ]
-    for path in common_paths:
-        if os.path.exists(path):
-            return path
-    
-    return None
-
 def create_youtube_video(music_file, image_file, output_file=None, 
                          width=1920, height=1080, duration=None):
     """
@@ -74,14 +44,17 @@ def create_youtube_video(music_file, image_file, output_file=None,
     
     os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
     
+    # Video encoder: libx264 yoksa donanım H.264 encoder'ı (stillimage tune sadece x264'te)
+    encoder = h264_encoder()
+    video_opts = ['-c:v', encoder] + (['-tune', 'stillimage'] if encoder == 'libx264' else ['-b:v', '4M'])
+    
     # FFmpeg komutu: Statik görüntü + müzik = video
     cmd = [
         ffmpeg,
         '-loop', '1',  # Görüntüyü loop'la
         '-i', image_file,  # Görüntü
         '-i', music_file,  # Müzik
-        '-c:v', 'libx264',  # Video codec
-        '-tune', 'stillimage',  # Statik görüntü için optimize
+        *video_opts,  # Video codec (statik görüntü için optimize)
         '-c:a', 'aac',  # Audio codec
         '-b:a', '192k',  # Audio bitrate
         '-pix_fmt', 'yuv420p',  # YouTube uyumlu
@@ -98,8 +71,7 @@ def create_youtube_video(music_file, image_file, output_file=None,
             '-loop', '1',
             '-i', image_file,
             '-i', music_file,
-            '-c:v', 'libx264',
-            '-tune', 'stillimage',
+            *video_opts,
             '-c:a', 'aac',
             '-b:a', '192k',
             '-pix_fmt', 'yuv420p',
@@ -2,7 +2,7 @@
 Özel prompt oluşturucu - Kullanıcı enstrümanları ve özellikleri manuel belirler
 """
 
-from generate import MusicGenerator
+from generation_server import get_generator
 import argparse
 
 def create_custom_prompt(instruments, genre, tempo=None, style=None, mood=None, additional=None, 
@@ -148,7 +148,8 @@ def create_custom_prompt(instruments, genre, tempo=None, style=None, mood=None,
 def generate_with_custom_prompt(instruments, genre, output_dir='output', duration=30,
                                 model_size='small', tempo=None, style=None, mood=None,
                                 additional=None, auto_master=False, guidance_scale=3.5,
-                                num_generations=1, seed=None, prompt_style='detailed'):
+                                num_generations=1, seed=None, prompt_style='detailed',
+                                batch_variations=False, scorer='energy'):
     """
     Özel prompt ile müzik üretir (geliştirilmiş versiyon)
     
@@ -167,6 +168,8 @@ def generate_with_custom_prompt(instruments, genre, output_dir='output', duratio
         num_generations: int - Kaç farklı versiyon üret (en iyisini seçmek için)
         seed: int - Random seed (reproducible results)
         prompt_style: str - 'detailed' veya 'concise'
+        batch_variations: bool - Varyasyonları tek batch çağrısında üret
+        scorer: str - En iyi varyasyon seçme kriteri
     """
     prompt = create_custom_prompt(instruments, genre, tempo, style, mood, additional, prompt_style)
     
@@ -180,7 +183,7 @@ def generate_with_custom_prompt(instruments, genre, output_dir='output', duratio
     if seed is not None:
         print(f"   🎲 Seed: {seed}")
     
-    generator = MusicGenerator(model_size=model_size)
+    generator = get_generator(model_size=model_size)
     results = generator.generate(
         [prompt],
         output_dir=output_dir,
@@ -189,7 +192,9 @@ def generate_with_custom_prompt(instruments, genre, output_dir='output', duratio
         master_preset='default',
         guidance_scale=guidance_scale,
         num_generations=num_generations,
-        seed=seed
+        seed=seed,
+        batch_variations=batch_variations,
+        scorer=scorer
     )
     
     if results:
@@ -3,14 +3,17 @@
 Melodik yapı, ritim pattern'leri, dinamikler, spektral özellikler
 """
 
-import numpy as np
 import librosa
+import numpy as np
 import scipy.io.wavfile as wavfile
 from scipy import signal
 import os
 from collections import Counter
 import json
 
+from audio_features import KARADENIZ_BANDS, FeatureContext
+from audio_io import load_segment
+
 # Enstrüman frekans aralıkları (daha detaylı)
 INSTRUMENT_FREQUENCIES = {
     'bass': (20, 250),
@@ -35,62 +38,100 @@ INSTRUMENT_FREQUENCIES = {
     'accordion': (100, 3000),  # Akordeon
 }
 
-def analyze_melodic_structure(y, sr):
+KEY_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+# Krumhansl-Schmuckler major ve minor profile'ları (basitleştirilmiş)
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+# 24x12 profil matrisi: satırlar (C major, C minor, C# major, C# minor, ...)
+KEY_PROFILES = np.array([np.roll(profile, i) for i in range(12) for profile in (MAJOR_PROFILE, MINOR_PROFILE)])
+
+PITCH_TRACKERS = ('piptrack', 'pyin')
+
+# pyin için düşürülmüş sample rate (C7'ye kadar yeterli, ~4x daha az örnek)
+PYIN_SAMPLE_RATE = 11025
+
+# Analiz profilleri: 'full' (zaman bölgesi HPSS) veya 'fast' (harmonik oran 22.05 kHz'e
+# inmiş sinyalin genlik spektrogramında küçük kernel'li HPSS'inden). Diğer tüm analizler
+# (key, tempo, enstrüman...) iki profilde de orijinal sample rate'te aynıdır
+ANALYSIS_PROFILES = ('full', 'fast')
+FAST_SAMPLE_RATE = 22050
+FAST_HPSS_KERNEL = 15
+
+
+def estimate_key(chroma_mean):
+    """
+    Ortalama chroma'yı 24 key profiliyle tek matris işleminde korele eder
+    
+    Returns:
+        (key, mode, correlation): Chroma sabitse (None, None, -1)
+    """
+    profiles = KEY_PROFILES - KEY_PROFILES.mean(axis=1, keepdims=True)
+    chroma = np.asarray(chroma_mean, dtype=np.float64)
+    chroma = chroma - chroma.mean()
+    norm = np.linalg.norm(chroma)
+    if norm == 0:
+        return None, None, -1
+    correlations = profiles @ chroma / (np.linalg.norm(profiles, axis=1) * norm)
+    best = int(np.argmax(correlations))
+    return KEY_NAMES[best // 2], ('major', 'minor')[best % 2], float(correlations[best])
+
+
+def dominant_pitches(pitches, magnitudes, threshold=0.1):
+    """
+    piptrack çıktısından frame başına baskın pitch (vektörel)
+    
+    Returns:
+        np.ndarray: Genliği threshold'u geçen frame'lerin pitch'leri (Hz)
+    """
+    frames = np.arange(pitches.shape[1])
+    idx = np.argmax(pitches, axis=0)
+    voiced = magnitudes[idx, frames] > threshold
+    return pitches[idx, frames][voiced]
+
+
+def pyin_pitches(y, sr, target_sr=PYIN_SAMPLE_RATE):
+    """
+    pyin ile temel frekans konturu (düşürülmüş sample rate üzerinde)
+    
+    Returns:
+        np.ndarray: Sesli (voiced) frame'lerin f0 değerleri (Hz)
+    """
+    if sr > target_sr:
+        y = librosa.resample(y, orig_sr=sr, target_sr=target_sr)
+        sr = target_sr
+    f0, voiced, _ = librosa.pyin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'), sr=sr)
+    return f0[voiced & np.isfinite(f0)]
+
+
+def analyze_melodic_structure(y, sr, ctx=None, pitch_tracker='piptrack'):
     """
     Melodik yapı analizi
     - Scale (major/minor)
     - Key detection (daha hassas)
     - Chord progression
     - Melodic contour
+    
+    Args:
+        ctx: Paylaşılan FeatureContext (None ise oluşturulur)
+        pitch_tracker: 'piptrack' (paylaşılan STFT) veya 'pyin' (daha doğru f0, daha yavaş)
     """
     print("   🎼 Analyzing melodic structure...")
+    ctx = ctx or FeatureContext(y, sr)
     
     # Chroma features (12 perde sınıfı)
-    chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+    chroma = ctx.chroma
     chroma_mean = np.mean(chroma, axis=1)
     
-    # Key detection (Krumhansl-Schmuckler algorithm benzeri)
-    keys = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-    
-    # Major ve minor profile'ları (basitleştirilmiş)
-    major_profile = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
-    minor_profile = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
-    
-    # Her key için correlation hesapla
-    best_key = None
-    best_mode = None
-    best_correlation = -1
-    
-    for i, key in enumerate(keys):
-        # Major için
-        rotated_major = np.roll(major_profile, i)
-        corr_major = np.corrcoef(chroma_mean, rotated_major)[0, 1]
-        
-        # Minor için
-        rotated_minor = np.roll(minor_profile, i)
-        corr_minor = np.corrcoef(chroma_mean, rotated_minor)[0, 1]
-        
-        if corr_major > best_correlation:
-            best_correlation = corr_major
-            best_key = key
-            best_mode = 'major'
-        
-        if corr_minor > best_correlation:
-            best_correlation = corr_minor
-            best_key = key
-            best_mode = 'minor'
+    # Key detection (Krumhansl-Schmuckler algorithm benzeri, 24 key tek seferde)
+    best_key, best_mode, best_correlation = estimate_key(chroma_mean)
     
     # Melodic contour (pitch over time)
-    pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-    pitch_times = librosa.frames_to_time(np.arange(pitches.shape[1]), sr=sr)
-    
-    # Dominant pitch'leri bul
-    pitch_values = []
-    for t in range(pitches.shape[1]):
-        col = pitches[:, t]
-        idx = np.argmax(col)
-        if magnitudes[idx, t] > 0.1:
-            pitch_values.append(pitches[idx, t])
+    if pitch_tracker == 'pyin':
+        pitch_values = pyin_pitches(y, sr)
+    else:
+        pitch_values = dominant_pitches(*ctx.piptrack)
     
     # Melodic direction (ascending/descending/stable)
     if len(pitch_values) > 10:
@@ -115,37 +156,39 @@ def analyze_melodic_structure(y, sr):
         'chroma_mean': chroma_mean.tolist()
     }
 
-def analyze_rhythm_pattern(y, sr, tempo):
+def analyze_rhythm_pattern(y, sr, tempo, ctx=None):
     """
     Ritim pattern analizi
     - Time signature
     - Beat pattern (strong/weak)
     - Groove
     - Rhythmic complexity
+    
+    Args:
+        ctx: Paylaşılan FeatureContext (beat grid ve onset'ler buradan alınır)
     """
     print("   🥁 Analyzing rhythm pattern...")
+    ctx = ctx or FeatureContext(y, sr)
     
-    # Beat tracking
-    tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-    beat_times = librosa.frames_to_time(beats, sr=sr)
+    # Beat tracking (bağlamda bir kez hesaplanır)
+    tempo, beats = ctx.beat_track
+    beat_times = ctx.frames_to_time(beats)
+    
+    # Onset'ler
+    onset_times = ctx.frames_to_time(ctx.onsets)
     
     # Time signature detection (basit: 4/4, 3/4, 2/4)
     if len(beat_times) > 4:
         beat_intervals = np.diff(beat_times)
         avg_interval = np.mean(beat_intervals)
         
-        # Strong beats (daha yüksek enerji)
-        onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
-        onset_times = librosa.frames_to_time(onset_frames, sr=sr)
-        
-        # Beat'lerdeki enerji
-        rms = librosa.feature.rms(y=y)[0]
-        rms_times = librosa.frames_to_time(np.arange(len(rms)), sr=sr)
+        # Beat'lerdeki enerji (strong beats: daha yüksek enerji)
+        rms = ctx.rms
+        rms_times = ctx.frames_to_time(np.arange(len(rms)))
         
-        beat_energies = []
-        for beat_time in beat_times:
-            idx = np.argmin(np.abs(rms_times - beat_time))
-            beat_energies.append(rms[idx])
+        # En yakın RMS frame'i (vektörel)
+        nearest = np.abs(rms_times[None, :] - beat_times[:, None]).argmin(axis=1)
+        beat_energies = list(rms[nearest])
         
         # Strong beat pattern (4/4 için her 4'te bir güçlü)
         if len(beat_energies) >= 4:
@@ -197,18 +240,21 @@ def analyze_rhythm_pattern(y, sr, tempo):
         'beat_count': len(beat_times)
     }
 
-def analyze_dynamics(y, sr):
+def analyze_dynamics(y, sr, ctx=None):
     """
     Dinamik analiz
     - Loudness contour
     - Dynamic range
     - Energy distribution
+    
+    Args:
+        ctx: Paylaşılan FeatureContext
     """
     print("   🔊 Analyzing dynamics...")
+    ctx = ctx or FeatureContext(y, sr)
     
     # RMS energy over time
-    rms = librosa.feature.rms(y=y)[0]
-    rms_times = librosa.frames_to_time(np.arange(len(rms)), sr=sr)
+    rms = ctx.rms
     
     # Dynamic range
     dynamic_range = np.max(rms) - np.min(rms)
@@ -246,40 +292,61 @@ def analyze_dynamics(y, sr):
         'energy_end': float(energy_end)
     }
 
-def analyze_spectral_features(y, sr):
+def fast_harmonic_ratio(y, sr, target_sr=FAST_SAMPLE_RATE, kernel_size=FAST_HPSS_KERNEL):
+    """
+    Hızlı profilin harmonik oranı: sinyal target_sr'a iner, HPSS genlik spektrogramında
+    küçük kernel ile yapılır ve sinyaller istft ile geri üretilmez (sadece enerji oranı)
+
+    Args:
+        y: Mono sinyal
+        sr: Sample rate
+        target_sr: Oran için kullanılacak sample rate
+        kernel_size: HPSS median filtre boyutu
+    """
+    if sr > target_sr:
+        y = librosa.resample(y, orig_sr=sr, target_sr=target_sr)
+        sr = target_sr
+    return FeatureContext(y, sr).harmonic_ratio(kernel_size=kernel_size)
+
+def analyze_spectral_features(y, sr, ctx=None, profile='full'):
     """
     Spektral özellikler
     - Harmonic content
     - Spectral centroid
     - Spectral rolloff
     - Zero crossing rate
+    
+    Args:
+        ctx: Paylaşılan FeatureContext
+        profile: 'full' (HPSS + istft) veya 'fast' (bkz. fast_harmonic_ratio)
     """
     print("   📊 Analyzing spectral features...")
+    ctx = ctx or FeatureContext(y, sr)
     
-    # Harmonic and percussive separation
-    y_harmonic, y_percussive = librosa.effects.hpss(y)
-    
-    # Harmonic ratio
-    harmonic_energy = np.sum(y_harmonic ** 2)
-    percussive_energy = np.sum(y_percussive ** 2)
-    total_energy = harmonic_energy + percussive_energy
-    
-    if total_energy > 0:
-        harmonic_ratio = harmonic_energy / total_energy
+    if profile == 'fast':
+        harmonic_ratio = fast_harmonic_ratio(y, sr)
     else:
-        harmonic_ratio = 0.5
+        # Harmonic and percussive separation (paylaşılan STFT üzerinden)
+        y_harmonic, y_percussive = ctx.hpss
+        
+        # Harmonic ratio
+        harmonic_energy = np.sum(y_harmonic ** 2)
+        percussive_energy = np.sum(y_percussive ** 2)
+        total_energy = harmonic_energy + percussive_energy
+        
+        if total_energy > 0:
+            harmonic_ratio = harmonic_energy / total_energy
+        else:
+            harmonic_ratio = 0.5
     
     # Spectral centroid (brightness)
-    spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-    avg_centroid = np.mean(spectral_centroids)
+    avg_centroid = np.mean(ctx.spectral_centroid)
     
     # Spectral rolloff (high frequency content)
-    spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-    avg_rolloff = np.mean(spectral_rolloff)
+    avg_rolloff = np.mean(ctx.spectral_rolloff)
     
     # Zero crossing rate (noisiness)
-    zcr = librosa.feature.zero_crossing_rate(y)[0]
-    avg_zcr = np.mean(zcr)
+    avg_zcr = np.mean(ctx.zero_crossing_rate)
     
     # Brightness classification
     if avg_centroid > 3000:
@@ -297,14 +364,20 @@ def analyze_spectral_features(y, sr):
         'brightness': brightness
     }
 
-def analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores):
+def analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores, ctx=None):
     """
     Karadeniz müziği için özel karakteristik analiz
     - Kemençe karakteristikleri
     - Tulum karakteristikleri
     - Karadeniz ritim pattern'leri
+    
+    Args:
+        ctx: Paylaşılan FeatureContext
     """
     print("   🎵 Analyzing Karadeniz characteristics...")
+    ctx = ctx or FeatureContext(y, sr)
+    magnitude = ctx.magnitude
+    frequency_bins = ctx.frequencies
     
     characteristics = {
         'has_kemenche': False,
@@ -320,10 +393,6 @@ def analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores):
         characteristics['has_kemenche'] = True
         
         # Kemençe stili (vibrato, glissando detection)
-        stft = librosa.stft(y)
-        magnitude = np.abs(stft)
-        frequency_bins = librosa.fft_frequencies(sr=sr)
-        
         # Kemençe frekans aralığı (800-2500 Hz)
         kemenche_range = (frequency_bins >= 800) & (frequency_bins <= 2500)
         if np.any(kemenche_range):
@@ -331,12 +400,9 @@ def analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores):
             
             # Vibrato detection (frequency modulation)
             # Basit: spektral centroid'in zaman içinde değişimi
-            centroid_over_time = []
-            for t in range(kemenche_spectrum.shape[1]):
-                col = kemenche_spectrum[:, t]
-                if np.sum(col) > 0:
-                    weighted_freq = np.sum(frequency_bins[kemenche_range] * col) / np.sum(col)
-                    centroid_over_time.append(weighted_freq)
+            column_sums = kemenche_spectrum.sum(axis=0)
+            voiced = column_sums > 0
+            centroid_over_time = (frequency_bins[kemenche_range] @ kemenche_spectrum[:, voiced]) / column_sums[voiced]
             
             if len(centroid_over_time) > 10:
                 centroid_variance = np.var(centroid_over_time)
@@ -352,10 +418,6 @@ def analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores):
         characteristics['has_tulum'] = True
         
         # Tulum: sürekli ton, düşük varyans
-        stft = librosa.stft(y)
-        magnitude = np.abs(stft)
-        frequency_bins = librosa.fft_frequencies(sr=sr)
-        
         tulum_range = (frequency_bins >= 400) & (frequency_bins <= 1800)
         if np.any(tulum_range):
             tulum_spectrum = magnitude[tulum_range, :]
@@ -381,190 +443,106 @@ def analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores):
     
     return characteristics
 
-def convert_to_wav_if_needed(audio_file):
-    """
-    MP3/WebM dosyalarını WAV'a çevirir (FFmpeg ile)
-    """
-    if not os.path.exists(audio_file):
-        return None
-    
-    # Zaten WAV ise
-    if audio_file.lower().endswith('.wav'):
-        return audio_file
-    
-    # WAV'a çevir
-    import tempfile
-    import subprocess
-    import glob
-    
-    temp_dir = os.path.join(os.path.dirname(audio_file) or '.', 'temp')
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    wav_file = os.path.join(temp_dir, os.path.basename(audio_file).rsplit('.', 1)[0] + '.wav')
-    
-    # FFmpeg yolunu bul
-    ffmpeg_cmd = None
-    
-    # PATH'te ara
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], 
-                               capture_output=True, 
-                               timeout=5)
-        if result.returncode == 0:
-            ffmpeg_cmd = 'ffmpeg'
-    except:
-        pass
-    
-    # Winget yolu
-    if not ffmpeg_cmd:
-        winget_pattern = os.path.expanduser(
-            r'~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_*\ffmpeg-*\bin\ffmpeg.exe'
-        )
-        matches = glob.glob(winget_pattern)
-        if matches:
-            ffmpeg_cmd = matches[0]
-    
-    # Program Files yolu
-    if not ffmpeg_cmd:
-        program_files_patterns = [
-            r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-            r'C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe',
-        ]
-        for pattern in program_files_patterns:
-            if os.path.exists(pattern):
-                ffmpeg_cmd = pattern
-                break
-    
-    # FFmpeg ile çevir
-    if ffmpeg_cmd:
-        try:
-            result = subprocess.run(
-                [ffmpeg_cmd, '-i', audio_file, '-y', '-acodec', 'pcm_s16le', '-ar', '44100', wav_file],
-                capture_output=True,
-                check=True,
-                timeout=60
-            )
-            if os.path.exists(wav_file):
-                print(f"   ✅ Converted to WAV: {wav_file}")
-                return wav_file
-        except Exception as e:
-            print(f"   ⚠️  FFmpeg conversion failed: {e}")
-    else:
-        print(f"   ⚠️  FFmpeg not found, trying direct load...")
-    
-    return audio_file  # Orijinal dosyayı döndür
-
-def detailed_analyze_audio(audio_file, skip_seconds=5, analysis_duration=120):
+def detailed_analyze_audio(audio_file, skip_seconds=5, analysis_duration=120, pitch_tracker='piptrack',
+                           profile='full'):
     """
     Çok detaylı audio analizi
+    
+    Args:
+        pitch_tracker: Melodik kontur için 'piptrack' veya 'pyin'
+        profile: 'full' veya 'fast' (sadece harmonik oran 22.05 kHz'de, istft'siz hesaplanır)
     """
     print("="*70)
     print("🔍 DETAILED AUDIO ANALYSIS")
     print("="*70)
     print(f"\n📁 Analyzing: {audio_file}")
     
-    # MP3/WebM ise WAV'a çevir
-    audio_file = convert_to_wav_if_needed(audio_file)
-    if audio_file is None:
+    # MP3/WebM gibi formatlar audio_io'da ffmpeg pipe ile doğrudan decode edilir (geçici WAV yok)
+    if not os.path.exists(audio_file):
         print("❌ Could not process audio file")
         return None
     
-    # Audio yükle
+    # Audio yükle (dosya bir kez decode edilir, bölüm kopyasız view)
     try:
-        y, sr = librosa.load(audio_file, sr=None, offset=skip_seconds, duration=analysis_duration)
+        y, sr = load_segment(audio_file, offset=skip_seconds, duration=analysis_duration)
+        if len(y) == 0:
+            # Offset dosya sonunu aşıyorsa baştan al
+            y, sr = load_segment(audio_file, duration=analysis_duration)
         print(f"   ✅ Loaded {len(y)/sr:.1f}s of audio")
     except Exception as e:
-        print(f"   ⚠️  Error with offset, trying without: {e}")
-        try:
-            y, sr = librosa.load(audio_file, sr=None, duration=analysis_duration)
-            print(f"   ✅ Loaded {len(y)/sr:.1f}s of audio (no offset)")
-        except Exception as e2:
-            try:
-                y, sr = librosa.load(audio_file, sr=None, duration=60)
-                print(f"   ✅ Loaded {len(y)/sr:.1f}s of audio (fallback)")
-            except Exception as e3:
-                print(f"❌ Error loading audio: {e3}")
-                return None
+        print(f"❌ Error loading audio: {e}")
+        return None
     
     print(f"\n📊 Analysis Components:")
     
+    # Tüm bölümler aynı STFT / onset envelope / beat grid'i paylaşır
+    ctx = FeatureContext(y, sr)
+    
     # 1. Tempo analizi
     print("\n1️⃣  TEMPO ANALYSIS")
-    tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-    if isinstance(tempo, np.ndarray):
-        tempo = float(tempo[0]) if len(tempo) > 0 else 120.0
-    else:
-        tempo = float(tempo)
-    tempo = int(round(tempo))
+    tempo = int(round(ctx.tempo))
     print(f"   ⏱️  Tempo: {tempo} BPM")
     
     # 2. Melodik yapı
     print("\n2️⃣  MELODIC STRUCTURE")
-    melodic = analyze_melodic_structure(y, sr)
+    melodic = analyze_melodic_structure(y, sr, ctx, pitch_tracker)
     print(f"   🎹 Key: {melodic['key']} {melodic['mode']} (confidence: {melodic['key_confidence']:.2f})")
     print(f"   📈 Melodic direction: {melodic['melodic_direction']}")
     
     # 3. Ritim pattern
     print("\n3️⃣  RHYTHM PATTERN")
-    rhythm = analyze_rhythm_pattern(y, sr, tempo)
+    rhythm = analyze_rhythm_pattern(y, sr, tempo, ctx)
     print(f"   🥁 Time signature: {rhythm['time_signature']}")
     print(f"   🎯 Rhythmic complexity: {rhythm['rhythmic_complexity']}")
     print(f"   🎵 Groove: {rhythm['groove_type']}")
     
     # 4. Dinamikler
     print("\n4️⃣  DYNAMICS")
-    dynamics = analyze_dynamics(y, sr)
+    dynamics = analyze_dynamics(y, sr, ctx)
     print(f"   🔊 Energy level: {dynamics['energy_level']}")
     print(f"   📊 Dynamic range: {dynamics['dynamic_range']:.3f}")
     print(f"   📈 Energy contour: {dynamics['energy_contour']}")
     
     # 5. Spektral özellikler
     print("\n5️⃣  SPECTRAL FEATURES")
-    spectral = analyze_spectral_features(y, sr)
+    spectral = analyze_spectral_features(y, sr, ctx, profile)
     print(f"   🎨 Brightness: {spectral['brightness']}")
     print(f"   🎵 Harmonic ratio: {spectral['harmonic_ratio']:.2f}")
     print(f"   📊 Spectral centroid: {spectral['spectral_centroid']:.0f} Hz")
     
     # 6. Enstrüman tespiti (detaylı)
     print("\n6️⃣  INSTRUMENT DETECTION")
-    stft = librosa.stft(y)
-    magnitude = np.abs(stft)
-    frequency_bins = librosa.fft_frequencies(sr=sr)
+    magnitude = ctx.magnitude
+    frequency_bins = ctx.frequencies
     
-    instrument_scores = {}
-    for instrument, (low_freq, high_freq) in INSTRUMENT_FREQUENCIES.items():
-        freq_mask = (frequency_bins >= low_freq) & (frequency_bins <= high_freq)
-        if np.any(freq_mask):
-            energy = np.mean(magnitude[freq_mask, :])
-            instrument_scores[instrument] = energy
+    # Tüm bant enerjileri tek matris çarpımıyla
+    instrument_scores = ctx.band_energies(INSTRUMENT_FREQUENCIES)
+    band_energy = ctx.band_energies(KARADENIZ_BANDS)
     
     # Karadeniz enstrümanları için özel tespit
     mean_energy = np.mean(list(instrument_scores.values()))
     
     # Kemençe (daha hassas)
-    kemenche_range = (frequency_bins >= 800) & (frequency_bins <= 2500)
-    if np.any(kemenche_range):
-        kemenche_energy = np.mean(magnitude[kemenche_range, :])
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        high_centroid = np.mean(spectral_centroids) > 2000
+    if 'kemenche' in band_energy:
+        kemenche_energy = band_energy['kemenche']
+        high_centroid = np.mean(ctx.spectral_centroid) > 2000
         
         if kemenche_energy > mean_energy * 1.3 or (kemenche_energy > mean_energy * 1.1 and high_centroid):
             instrument_scores['kemenche'] = instrument_scores.get('kemenche', 0) + kemenche_energy * 0.8
     
     # Tulum
-    tulum_range = (frequency_bins >= 400) & (frequency_bins <= 1800)
-    if np.any(tulum_range):
-        tulum_energy = np.mean(magnitude[tulum_range, :])
+    if 'tulum' in band_energy:
+        tulum_energy = band_energy['tulum']
+        low, high = KARADENIZ_BANDS['tulum']
+        tulum_range = (frequency_bins >= low) & (frequency_bins <= high)
         tulum_variance = np.var(magnitude[tulum_range, :])
         if tulum_energy > mean_energy * 1.2 and tulum_variance < np.var(magnitude) * 0.8:
             instrument_scores['tulum'] = instrument_scores.get('tulum', 0) + tulum_energy * 0.6
     
     # Davul
-    davul_range = (frequency_bins >= 50) & (frequency_bins <= 300)
-    if np.any(davul_range):
-        davul_energy = np.mean(magnitude[davul_range, :])
-        onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
-        rhythmic = len(onset_frames) > 10
+    if 'davul' in band_energy:
+        davul_energy = band_energy['davul']
+        rhythmic = len(ctx.onsets) > 10
         
         if davul_energy > mean_energy * 1.1 and rhythmic:
             instrument_scores['davul'] = instrument_scores.get('davul', 0) + davul_energy * 0.7
@@ -580,7 +558,7 @@ def detailed_analyze_audio(audio_file, skip_seconds=5, analysis_duration=120):
     
     # 7. Karadeniz karakteristikleri
     print("\n7️⃣  KARADENIZ CHARACTERISTICS")
-    karadeniz = analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores)
+    karadeniz = analyze_karadeniz_characteristics(y, sr, tempo, instrument_scores, ctx)
     if karadeniz['has_kemenche']:
         print(f"   ✅ Kemenche detected: {karadeniz['kemenche_style']}")
     if karadeniz['has_tulum']:
@@ -742,6 +720,10 @@ def main():
                        help='Analiz sonrası prompt oluştur')
     parser.add_argument('--output', type=str, default=None,
                        help='Analiz sonuçlarını JSON olarak kaydet')
+    parser.add_argument('--pitch-tracker', type=str, default='piptrack', choices=PITCH_TRACKERS,
+                       help='Melodik kontur için pitch tracker (pyin: daha doğru, daha yavaş)')
+    parser.add_argument('--profile', type=str, default='full', choices=ANALYSIS_PROFILES,
+                       help='Analiz profili (fast: harmonik oran 22.05 kHz\'de, istft\'siz)')
     
     args = parser.parse_args()
     
@@ -749,7 +731,9 @@ def main():
     analysis = detailed_analyze_audio(
         args.audio_file,
         skip_seconds=args.skip,
-        analysis_duration=args.duration
+        analysis_duration=args.duration,
+        pitch_tracker=args.pitch_tracker,
+        profile=args.profile
     )
     
     if analysis is None:
@@ -0,0 +1,138 @@
+"""
+Önbellekli EQ filtre bankası (second-order sections)
+Tüm bantlar tek bir SOS kaskadında birleşir; tasarımlar (sample_rate, bant ayarları)
+başına bir kez hesaplanır. Zero-phase (sosfiltfilt) veya blok blok nedensel (sosfilt) uygulanır.
+"""
+
+import functools
+import math
+
+import numpy as np
+from scipy import signal
+
+# Bant tipleri: ('lowshelf' | 'highshelf', kesim Hz, kazanç dB) veya ('band', (alt Hz, üst Hz), kazanç dB)
+# Her bant eski 'x + (g - 1) * filtfilt(butter(4))' aşamasının raf karşılığıdır
+ORDER = 4
+
+
+def band_between(low_hz, high_hz, gain_db):
+    """İki kesim frekansı arasını vurgulayan bant (Butterworth band-pass ile aynı kenarlar)"""
+    return ('band', (float(low_hz), float(high_hz)), float(gain_db))
+
+
+def three_band(bass_db=0, mid_db=0, treble_db=0):
+    """Bas (<250 Hz), orta (250-4000 Hz), tiz (>4000 Hz) bantları"""
+    return (
+        ('lowshelf', 250.0, float(bass_db)),
+        band_between(250.0, 4000.0, mid_db),
+        ('highshelf', 4000.0, float(treble_db)),
+    )
+
+
+def _butterworth_shelf(kind, freq, gain_db, sample_rate):
+    """
+    Butterworth raf filtresi → SOS satırları
+
+    Prototip G(s) = Π(s - r·p) / Π(s - p), p = Butterworth kutupları, r = A^(1/ORDER):
+    |G|² = 1 + (A² - 1) / (1 + Ω^(2·ORDER)). Yani A² = g iken iki geçiş (filtfilt)
+    eski 1 + (g - 1)·|H_butter|² cevabını birebir verir. Kesimler butter() gibi
+    bilinear dönüşüm için ön-bükülür.
+    """
+    amplitude = 10 ** (gain_db / 20)
+    _, poles, _ = signal.buttap(ORDER)
+    zeros = poles * amplitude ** (1 / ORDER)
+
+    def warp(hz):
+        return 2 * sample_rate * math.tan(math.pi * hz / sample_rate)
+
+    if kind == 'lowshelf':
+        z, p, k = signal.lp2lp_zpk(zeros, poles, 1.0, wo=warp(freq))
+    elif kind == 'highshelf':
+        z, p, k = signal.lp2hp_zpk(zeros, poles, 1.0, wo=warp(freq))
+    elif kind == 'band':
+        low, high = warp(freq[0]), warp(freq[1])
+        z, p, k = signal.lp2bp_zpk(zeros, poles, 1.0, wo=math.sqrt(low * high), bw=high - low)
+    else:
+        raise ValueError(f"Unknown EQ band type: {kind}")
+
+    z, p, k = signal.bilinear_zpk(z, p, k, fs=sample_rate)
+    return signal.zpk2sos(z, p, k)
+
+
+@functools.lru_cache(maxsize=256)
+def design_eq_bank(sample_rate, bands, zero_phase=True):
+    """
+    Bantları tek SOS dizisine çevirir (sonuç önbelleklenir)
+
+    Args:
+        sample_rate: Sample rate
+        bands: Tuple[(tip, frekans, kazanç_dB), ...] (hashlenebilir olmalı)
+        zero_phase: True ise sosfiltfilt içindir (ileri-geri geçiş kazancı ikiler, dB yarıya bölünür)
+
+    Returns:
+        np.ndarray [n_sections, 6] (paylaşılır, değiştirilmemeli) veya None (tüm kazançlar 0)
+    """
+    nyquist = sample_rate / 2
+    sections = []
+    for kind, freq, gain_db in bands:
+        if gain_db == 0 or max(np.atleast_1d(freq)) >= nyquist:
+            continue
+        sections.append(_butterworth_shelf(kind, freq, gain_db / 2 if zero_phase else gain_db, sample_rate))
+    if not sections:
+        return None
+    return np.concatenate(sections)
+
+
+class EQBank:
+    """Blok blok nedensel EQ (filtre durumu bloklar arasında taşınır)"""
+
+    def __init__(self, sample_rate, bands):
+        """
+        Args:
+            sample_rate: Sample rate
+            bands: Bant listesi (bkz. three_band, band_between)
+        """
+        self.sos = design_eq_bank(sample_rate, tuple(bands), zero_phase=False)
+        self.zi = None
+
+    def process(self, block):
+        """
+        Bir bloğu filtreler
+
+        Args:
+            block: [samples] veya [channels, samples]
+        """
+        if self.sos is None:
+            return block
+        if self.zi is None:
+            self.zi = np.zeros((self.sos.shape[0],) + block.shape[:-1] + (2,))
+        filtered, self.zi = signal.sosfilt(self.sos, block, axis=-1, zi=self.zi)
+        return filtered.astype(block.dtype, copy=False)
+
+
+def apply_eq_bank(audio, sample_rate, bands, zero_phase=True, chunk_size=None):
+    """
+    EQ bankasını uygular
+
+    Args:
+        audio: [samples] veya [channels, samples] (kanallar ayrı ayrı filtrelenir)
+        sample_rate: Sample rate
+        bands: Bant listesi (bkz. three_band, band_between)
+        zero_phase: Faz kayması olmadan (sosfiltfilt). chunk_size verilirse kullanılmaz
+        chunk_size: Uzun dosyalar için blok boyutu (örnek) - nedensel filtre, ek bellek sabit
+    """
+    if chunk_size:
+        eq = EQBank(sample_rate, bands)
+        output = np.empty_like(audio)
+        for start in range(0, audio.shape[-1], chunk_size):
+            output[..., start:start + chunk_size] = eq.process(audio[..., start:start + chunk_size])
+        return output
+
+    sos = design_eq_bank(sample_rate, tuple(bands), zero_phase=zero_phase)
+    if sos is None:
+        return audio
+    if zero_phase:
+        filtered = signal.sosfiltfilt(sos, audio, axis=-1)
+    else:
+        filtered = signal.sosfilt(sos, audio, axis=-1)
+    return filtered.astype(audio.dtype, copy=False)
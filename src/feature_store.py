@@ -0,0 +1,379 @@
+"""
+Analiz özellik deposu (SQLite) ve toplu kütüphane analizi
+Analiz sonuçları dosya içeriği hash'i + analiz ayarları (+ analiz kodu sürümü) ile saklanır.
+Kütüphane taramasında sadece yeni veya değişmiş dosyalar process havuzunda analiz edilir;
+prompt üreticileri aynı dosya için depodaki sonucu tekrar analiz etmeden kullanır.
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cache_utils import get_cache_dir, source_hash, text_hash
+from loudness import AUDIO_EXTENSIONS, collect_audio_files
+from mastering_cache import file_hash
+
+DB_NAME = 'features.sqlite'
+
+# Kütüphane taramasında analiz edilen uzantılar (sıkıştırılmış formatlar ffmpeg ile çözülür)
+ANALYSIS_EXTENSIONS = AUDIO_EXTENSIONS + ('.mp3', '.m4a', '.aac', '.opus', '.webm')
+
+# Sonucu etkileyen modüller: kaynakları değişince eski sonuçlar kullanılmaz
+ANALYSIS_MODULES = ('audio_analyzer.py', 'detailed_audio_analyzer.py', 'audio_features.py', 'audio_io.py')
+
+# Analiz türü → varsayılan parametreler (anahtar her zaman tam parametre seti üzerinden alınır)
+ANALYSIS_KINDS = {
+    'basic': {'skip_seconds': 5, 'analysis_duration': 90},
+    'detailed': {'skip_seconds': 5, 'analysis_duration': 120, 'pitch_tracker': 'piptrack', 'profile': 'full'},
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS features (
+    content_hash TEXT NOT NULL,
+    config TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (content_hash, config)
+);
+"""
+
+
+def _json_default(value):
+    """numpy skaler/dizilerini JSON'a çevirir"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+@functools.lru_cache(maxsize=1)
+def code_version():
+    """Analiz kodunun kaynak hash'i"""
+    return source_hash(*ANALYSIS_MODULES)
+
+
+def analysis_params(kind, **params):
+    """Varsayılanlarla tamamlanmış analiz parametreleri"""
+    if kind not in ANALYSIS_KINDS:
+        raise ValueError(f"Unknown analysis kind: {kind} (choices: {', '.join(ANALYSIS_KINDS)})")
+    return {**ANALYSIS_KINDS[kind], **params}
+
+
+def config_key(kind, params):
+    """Analiz türü + parametreler + analiz kodu sürümü → ayar anahtarı"""
+    return text_hash(kind, json.dumps(params, sort_keys=True), code_version())
+
+
+class FeatureStore:
+    """Analiz sonuçlarının SQLite deposu (içerik hash'i + ayar anahtarı)"""
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path: SQLite dosyası (None = ortak önbellek kökü altında 'analysis/features.sqlite')
+        """
+        self.db_path = db_path or os.path.join(get_cache_dir('analysis'), DB_NAME)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._conn.close()
+
+    def content_hash(self, path):
+        """
+        Dosya içeriği hash'i (yol + mtime + boyut değişmediyse depodaki değer, yoksa okunur)
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute('SELECT mtime_ns, size, content_hash FROM files WHERE path = ?',
+                                     (path,)).fetchone()
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+
+        digest = file_hash(path)
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash) '
+                               'VALUES (?, ?, ?, ?)', (path, stat.st_mtime_ns, stat.st_size, digest))
+        return digest
+
+    def get(self, path, kind, params):
+        """
+        Dosyanın depodaki analizi
+
+        Returns:
+            dict veya None (yoksa)
+        """
+        digest = self.content_hash(path)
+        with self._lock:
+            row = self._conn.execute('SELECT analysis FROM features WHERE content_hash = ? AND config = ?',
+                                     (digest, config_key(kind, params))).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, path, kind, params, analysis):
+        """Analiz sonucunu depoya yazar"""
+        digest = self.content_hash(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO features (content_hash, config, kind, path, analysis, created) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (digest, config_key(kind, params), kind, os.path.abspath(path),
+                 json.dumps(analysis, default=_json_default), time.time())
+            )
+
+    def query(self, kind=None, genre=None):
+        """
+        Depodaki analizler (en yeni önce)
+
+        Args:
+            kind: 'basic' / 'detailed' (None = hepsi)
+            genre: estimated_genre filtresi
+
+        Returns:
+            list: {'path', 'kind', 'analysis'} dict'leri
+        """
+        sql = 'SELECT path, kind, analysis FROM features'
+        args = ()
+        if kind:
+            sql += ' WHERE kind = ?'
+            args = (kind,)
+        sql += ' ORDER BY created DESC'
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+
+        results = []
+        for path, row_kind, analysis in rows:
+            analysis = json.loads(analysis)
+            if genre and analysis.get('estimated_genre') != genre:
+                continue
+            results.append({'path': path, 'kind': row_kind, 'analysis': analysis})
+        return results
+
+    def stats(self):
+        """Depo istatistikleri"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM features').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def analyze_file(path, kind='basic', **params):
+    """Dosyayı depoya bakmadan analiz eder (analyze_audio / detailed_analyze_audio)"""
+    params = analysis_params(kind, **params)
+    if kind == 'detailed':
+        from detailed_audio_analyzer import detailed_analyze_audio
+        return detailed_analyze_audio(path, **params)
+    from audio_analyzer import analyze_audio
+    return analyze_audio(path, **params)
+
+
+def analyze_cached(path, kind='basic', store=None, **params):
+    """
+    Depoda varsa kayıtlı analizi döndürür, yoksa analiz edip kaydeder
+
+    Args:
+        path: Audio dosyası
+        kind: 'basic' (analyze_audio) veya 'detailed' (detailed_analyze_audio)
+        store: FeatureStore (None = varsayılan depo)
+        **params: Analiz parametreleri (skip_seconds, analysis_duration...)
+
+    Returns:
+        dict veya None (analiz başarısızsa)
+    """
+    params = analysis_params(kind, **params)
+    own_store = store is None
+    store = store or FeatureStore()
+    try:
+        analysis = store.get(path, kind, params)
+        if analysis is not None:
+            print(f"♻️  Feature store hit: {path}")
+            return analysis
+
+        analysis = analyze_file(path, kind, **params)
+        if analysis is not None:
+            store.put(path, kind, params, analysis)
+        return analysis
+    except OSError as e:
+        # Eksik / okunamayan dosya: analyze_audio gibi hata basıp None döner
+        print(f"❌ Error loading audio: {e}")
+        return None
+    finally:
+        if own_store:
+            store.close()
+
+
+def _analyze_one(task):
+    """Worker: tek dosyayı analiz eder (çıktı bastırılır, hatalar sonuç olarak döner)"""
+    path, kind, params = task
+
+    start = time.perf_counter()
+    result = {'path': path}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            analysis = analyze_file(path, kind, **params)
+        if analysis is None:
+            result.update(status='failed', error='analysis returned no result')
+        else:
+            result.update(status='analyzed', analysis=analysis)
+    except Exception as e:
+        result.update(status='failed', error=str(e))
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def analyze_library(inputs, kind='basic', params=None, workers=None, force=False, store=None,
+                    summary_path=None):
+    """
+    Dosyaları paralel analiz edip depoya yazar (depoda güncel olanlar atlanır)
+
+    Args:
+        inputs: Audio dosyaları (bkz. collect_audio_files)
+        kind: 'basic' veya 'detailed'
+        params: Analiz parametreleri (None = varsayılanlar)
+        workers: Process sayısı (None = CPU sayısı, 1 = havuz kullanmadan sırayla)
+        force: Depodaki sonuçları da yeniden hesapla
+        store: FeatureStore (None = varsayılan depo)
+        summary_path: JSON özetin yazılacağı dosya
+
+    Returns:
+        dict: files (dosya başına status/seconds), analyzed, stored, failed, total_seconds
+    """
+    params = analysis_params(kind, **(params or {}))
+    store = store or FeatureStore()
+
+    start = time.perf_counter()
+    results = {}
+    tasks = []
+    for path in inputs:
+        try:
+            stored = not force and store.get(path, kind, params) is not None
+        except OSError as e:
+            results[path] = {'path': path, 'status': 'failed', 'error': str(e), 'seconds': 0.0}
+            continue
+        if stored:
+            results[path] = {'path': path, 'status': 'stored', 'seconds': 0.0}
+        else:
+            tasks.append((path, kind, params))
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(tasks)) if tasks else 1
+    print(f"🔍 Analyzing {len(tasks)} file(s) ({kind}) with {workers} worker(s), "
+          f"{len(results)} already in store")
+    if workers == 1:
+        finished = map(_analyze_one, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        finished = executor.map(_analyze_one, tasks)
+
+    # Depoya sadece ana process yazar (SQLite tek yazıcı)
+    try:
+        for result in finished:
+            analysis = result.pop('analysis', None)
+            if analysis is not None:
+                store.put(result['path'], kind, params, analysis)
+                print(f"   ✅ {result['path']} ({result['seconds']:.1f}s)")
+            else:
+                print(f"   ❌ {result['path']}: {result['error']}")
+            results[result['path']] = result
+    finally:
+        if executor:
+            executor.shutdown()
+
+    files = [results[path] for path in inputs]
+    summary = {
+        'kind': kind,
+        'params': params,
+        'store': store.db_path,
+        'workers': workers,
+        'files': files,
+        'analyzed': sum(1 for result in files if result['status'] == 'analyzed'),
+        'stored': sum(1 for result in files if result['status'] == 'stored'),
+        'failed': sum(1 for result in files if result['status'] == 'failed'),
+        'total_seconds': time.perf_counter() - start,
+    }
+
+    print(f"✅ Analyzed {summary['analyzed']}, already stored {summary['stored']}, "
+          f"failed {summary['failed']} in {summary['total_seconds']:.1f}s")
+
+    if summary_path:
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Summary saved to: {summary_path}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Müzik Kütüphanesi Analizi ve Özellik Deposu')
+    parser.add_argument('inputs', type=str, nargs='*', help='Audio dosyaları veya klasörler')
+    parser.add_argument('--detailed', action='store_true', help='Detaylı analiz (detailed_analyze_audio)')
+    parser.add_argument('--profile', type=str, default='full', choices=('full', 'fast'),
+                       help='Detaylı analiz profili (fast: harmonik oran 22.05 kHz\'de, istft\'siz)')
+    parser.add_argument('--workers', type=int, default=None, help='Process sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--force', action='store_true', help='Depodaki sonuçları da yeniden analiz et')
+    parser.add_argument('--skip', type=int, default=5, help='Başlangıçtan atlanacak saniye')
+    parser.add_argument('--duration', type=int, default=None, help='Analiz süresi (saniye)')
+    parser.add_argument('--db', type=str, default=None, help='SQLite dosyası (varsayılan: önbellek klasörü)')
+    parser.add_argument('--json', type=str, default=None, help='JSON özet dosyası')
+    parser.add_argument('--list', action='store_true', help='Depodaki analizleri listele')
+    parser.add_argument('--genre', type=str, default=None, help='--list için tür filtresi')
+
+    args = parser.parse_args()
+
+    kind = 'detailed' if args.detailed else 'basic'
+    store = FeatureStore(args.db)
+
+    if args.list:
+        for entry in store.query(kind=kind if args.detailed else None, genre=args.genre):
+            analysis = entry['analysis']
+            print(f"{entry['kind']:8s} {analysis.get('tempo', '?'):>4} BPM  "
+                  f"{analysis.get('estimated_genre', '?'):12s} {entry['path']}")
+        return
+
+    inputs = collect_audio_files(args.inputs, extensions=ANALYSIS_EXTENSIONS)
+    if not inputs:
+        print("❌ No input files found")
+        return
+
+    params = {'skip_seconds': args.skip}
+    if args.duration:
+        params['analysis_duration'] = args.duration
+    if args.detailed:
+        params['profile'] = args.profile
+    analyze_library(inputs, kind, params, workers=args.workers, force=args.force, store=store,
+                    summary_path=args.json)
+
+if __name__ == '__main__':
+    main()
@@ -4,20 +4,70 @@ Sosyal medya için kısa loop'lar üretir
 """
 
 import torch
-from transformers import AutoProcessor, MusicgenForConditionalGeneration
+from transformers.modeling_outputs import BaseModelOutput
 import scipy.io.wavfile as wavfile
+import contextlib
 import os
 from datetime import datetime
 import argparse
 import numpy as np
 
+import model_registry
+from mastering_presets import get_preset, preset_names
+from prompt_cache import get_prompt_cache
+
+# MusicGen tek geçişte ~30 saniyeye kadar üretebilir, daha uzunu pencerelerle üretilir
+LONG_FORM_WINDOW = 30
+LONG_FORM_OVERLAP = 5
+# Uzun parçalarda gain ilk pencereden belirlenir, sonraki pencereler için pay bırakılır
+LONG_FORM_HEADROOM = 0.9
+
+# CPU performans profilleri
+#   quantize: Decoder Linear katmanlarına dinamik int8 quantization
+#   bf16: bfloat16 autocast (CPU destekliyorsa)
+#   compile: Decoder adımını torch.compile ile derle
+#   num_threads / interop_threads: torch thread sayıları (None = torch varsayılanı)
+CPU_PROFILES = {
+    'default': {'quantize': False, 'bf16': False, 'compile': False,
+                'num_threads': None, 'interop_threads': None},
+    'fast': {'quantize': True, 'bf16': False, 'compile': False,
+             'num_threads': os.cpu_count(), 'interop_threads': 1},
+    'bf16': {'quantize': False, 'bf16': True, 'compile': False,
+             'num_threads': os.cpu_count(), 'interop_threads': 1},
+    'compiled': {'quantize': False, 'bf16': False, 'compile': True,
+                 'num_threads': os.cpu_count(), 'interop_threads': 1},
+}
+
+def resolve_cpu_profile(cpu_profile):
+    """Profil adı veya kısmi dict → tam profil dict'i"""
+    if isinstance(cpu_profile, str):
+        if cpu_profile not in CPU_PROFILES:
+            raise ValueError(f"Unknown CPU profile '{cpu_profile}'. Available: {', '.join(CPU_PROFILES)}")
+        return dict(CPU_PROFILES[cpu_profile])
+    return dict(CPU_PROFILES['default'], **(cpu_profile or {}))
+
+def cpu_supports_bf16():
+    """CPU'nun bfloat16 hızlandırması (AVX512-BF16 / AMX) var mı"""
+    for check in ('_is_amx_tile_supported', '_is_avx512_bf16_supported'):
+        fn = getattr(torch.cpu, check, None)
+        if fn is not None:
+            try:
+                if fn():
+                    return True
+            except RuntimeError:
+                pass
+    return False
+
 class MusicGenerator:
-    def __init__(self, model_size='small', device=None):
+    def __init__(self, model_size='small', device=None, cpu_profile='default', prompt_cache=True):
         """
         Args:
             model_size: 'small' (300M), 'medium' (1.5B), 'large' (3.3B)
                        RTX 3070 için 'small' veya 'medium' önerilir
             device: 'cuda', 'cpu' veya None (otomatik seçim)
+            cpu_profile: CPU performans profili ('default', 'fast', 'bf16', 'compiled')
+                         veya CPU_PROFILES formatında dict. Sadece CPU'da uygulanır
+            prompt_cache: Prompt embedding'lerini önbellekle (aynı açıklama tekrar encode edilmez)
         """
         # GPU kontrolü ve otomatik seçim
         if device is None:
@@ -41,24 +91,105 @@ class MusicGenerator:
                 print(f"⚠️  Large model {vram_gb:.1f}GB VRAM için riskli. Medium'a geçiliyor...")
                 model_size = 'medium'
         
-        model_name = f'facebook/musicgen-{model_size}'
-        print(f"Loading {model_name}...")
+        print(f"Loading {model_registry.model_name_for(model_size)}...")
+        
+        # GPU'da FP16 (daha hızlı ve daha az VRAM), CPU'da FP32 veya profil int8 istiyorsa qint8
+        profile = resolve_cpu_profile(cpu_profile) if self.device == 'cpu' else None
+        if self.device == 'cuda':
+            dtype = 'float16'
+        else:
+            dtype = 'qint8' if profile['quantize'] else 'float32'
         
-        self.processor = AutoProcessor.from_pretrained(model_name)
-        self.model = MusicgenForConditionalGeneration.from_pretrained(model_name)
-        self.model = self.model.to(self.device)
+        # Aynı process'te aynı (model, cihaz, dtype, derleme) tekrar yüklenmez; derlenmiş
+        # decoder ayrı registry anahtarında tutulur, diğer profiller eager modeli kullanır
+        self.model_compiled = bool(profile and profile['compile'])
+        self.processor, self.model = model_registry.load_model(model_size, self.device, dtype,
+                                                               compiled=self.model_compiled)
+        self.model_size = model_size
+        self.model_dtype = dtype
+        self.prompt_cache = get_prompt_cache(model_registry.model_name_for(model_size)) if prompt_cache else None
         
-        # GPU optimizasyonları
         if self.device == 'cuda':
-            self.model = self.model.half()  # FP16 - daha hızlı ve daha az VRAM
             print("   ⚡ Using FP16 precision for faster generation")
         
+        self.autocast_dtype = None
+        if self.device == 'cpu':
+            self._apply_cpu_profile(profile)
+        
         self.sample_rate = self.model.config.audio_encoder.sampling_rate
         print("✅ Model loaded!")
     
+    def _apply_cpu_profile(self, profile):
+        """CPU performans profilini uygular (thread, bf16; int8 ve torch.compile registry'de yapılır)"""
+        if profile['num_threads']:
+            torch.set_num_threads(profile['num_threads'])
+        if profile['interop_threads']:
+            try:
+                torch.set_num_interop_threads(profile['interop_threads'])
+            except RuntimeError:
+                # Paralel iş başladıktan sonra değiştirilemez (aynı process'te ikinci model)
+                pass
+        print(f"   🧵 CPU threads: {torch.get_num_threads()} (interop: {torch.get_num_interop_threads()})")
+        
+        if profile['quantize']:
+            print("   ⚡ Decoder linears quantized to int8 (dynamic)")
+        
+        if profile['bf16']:
+            if cpu_supports_bf16():
+                self.autocast_dtype = torch.bfloat16
+                print("   ⚡ Using bfloat16 autocast")
+            else:
+                print("   ⚠️  CPU has no native bfloat16 support, staying in fp32")
+        
+        if profile['compile']:
+            print("   ⚡ Using the registry's torch.compile'd decoder")
+    
+    def _autocast(self):
+        if self.autocast_dtype is not None:
+            return torch.autocast(device_type='cpu', dtype=self.autocast_dtype)
+        return contextlib.nullcontext()
+    
+    def _text_inputs(self, descriptions):
+        """Açıklamaları model girdisine çevirir (önbellek varsa T5 çıktısı tekrar kullanılır)"""
+        if self.prompt_cache is None:
+            return self.processor(
+                text=descriptions,
+                padding=True,
+                return_tensors="pt",
+            ).to(self.device)
+        with torch.no_grad(), self._autocast():
+            return self.prompt_cache.encode(
+                descriptions, self.processor, self.model.text_encoder, self.device,
+                autocast_dtype=self.autocast_dtype
+            )
+    
+    def _model_generate(self, inputs, guidance_scale, max_new_tokens):
+        """model.generate çağrısı (no_grad + profilin autocast ayarı)"""
+        inputs = dict(inputs)
+        hidden = inputs.pop('encoder_hidden_states', None)
+        if hidden is not None:
+            # Önbellekten gelen encoder çıktısı: CFG için koşulsuz (sıfır) yarıyı model
+            # kendisi eklemez, burada eklenir. input_ids sadece batch boyutu için verilir
+            attention_mask = inputs['attention_mask']
+            if guidance_scale is not None and guidance_scale > 1:
+                hidden = torch.cat([hidden, torch.zeros_like(hidden)], dim=0)
+                attention_mask = torch.cat([attention_mask, torch.zeros_like(attention_mask)], dim=0)
+            inputs['attention_mask'] = attention_mask
+            inputs['encoder_outputs'] = BaseModelOutput(last_hidden_state=hidden)
+        with torch.no_grad(), self._autocast():
+            audio_values = self.model.generate(
+                **inputs,
+                do_sample=True,
+                guidance_scale=guidance_scale,
+                max_new_tokens=max_new_tokens
+            )
+        return audio_values.float() if self.autocast_dtype is not None else audio_values
+    
     def generate(self, descriptions, output_dir='output', duration=30, 
                  auto_master=False, master_preset='default',
-                 guidance_scale=3.0, num_generations=1, seed=None):
+                 guidance_scale=3.0, num_generations=1, seed=None,
+                 batch_variations=False, scorer='energy', chunked=None,
+                 window=LONG_FORM_WINDOW, overlap=LONG_FORM_OVERLAP):
         """
         Müzik üretir
         
@@ -67,13 +198,39 @@ class MusicGenerator:
             output_dir: Çıktı klasörü
             duration: Süre (saniye)
             auto_master: Otomatik mastering uygula
-            master_preset: Mastering preset ('default', 'bass_heavy', 'vocal', 'cinematic')
+            master_preset: Mastering preset (bkz. mastering_presets.MASTERING_PRESETS)
             guidance_scale: Guidance scale (1.0-10.0, yüksek = prompt'a daha sadık)
             num_generations: Her prompt için kaç farklı versiyon üret (en iyisini seçmek için)
             seed: Random seed (reproducible results için)
+            batch_variations: Tüm varyasyonları tek bir batch'te üret (daha hızlı, daha fazla bellek)
+            scorer: En iyi varyasyonu seçme kriteri ('energy', 'loudness', 'flatness', 'clap')
+            chunked: Pencereli (uzun parça) üretim. None = duration > window ise otomatik
+            window: Pencereli üretimde pencere süresi (saniye)
+            overlap: Pencereler arası örtüşme/crossfade süresi (saniye)
         """
         os.makedirs(output_dir, exist_ok=True)
         
+        if chunked is None:
+            chunked = duration > window
+        if chunked:
+            if num_generations > 1:
+                print("   ⚠️  Variations are not supported in chunked mode, generating one take per prompt")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            results = []
+            for idx, desc in enumerate(descriptions):
+                results.append(self.generate_long(
+                    desc,
+                    output_file=f"{output_dir}/track_{timestamp}_{idx:02d}.wav",
+                    duration=duration,
+                    window=window,
+                    overlap=overlap,
+                    guidance_scale=guidance_scale,
+                    seed=seed
+                ))
+            if auto_master and results:
+                return self._master_results(results, master_preset)
+            return results
+        
         print(f"\n🎵 Generating {len(descriptions)} track(s)...")
         if num_generations > 1:
             print(f"   🔄 Generating {num_generations} variations per prompt (best will be selected)")
@@ -90,52 +247,48 @@ class MusicGenerator:
             torch.cuda.empty_cache()
         
         # Prompt'ları işle
-        inputs = self.processor(
-            text=descriptions,
-            padding=True,
-            return_tensors="pt",
-        ).to(self.device)
+        inputs = self._text_inputs(descriptions)
+        if self.prompt_cache is not None:
+            stats = self.prompt_cache.stats()
+            print(f"   🧠 Prompt cache: {stats['hit_rate']:.0%} hit rate "
+                  f"({stats['hits'] + stats['disk_hits']} hits, {stats['misses']} misses)")
+        
+        max_new_tokens = int(duration * self.sample_rate / self.model.config.audio_encoder.hop_length)
         
         # Üretim
-        all_audio_values = []
-        with torch.no_grad():
+        if num_generations > 1 and batch_variations:
+            # Her prompt'u num_generations kez tekrarla, tek çağrıda üret
+            print(f"   ⚡ Generating all {num_generations} variations in one batched call...")
+            batched_inputs = {
+                key: value.repeat_interleave(num_generations, dim=0)
+                for key, value in inputs.items()
+            }
+            audio_values = self._model_generate(batched_inputs, guidance_scale, max_new_tokens)
+            # [batch * num_generations, ...] → [batch, num_generations, ...]
+            candidates = audio_values.view(len(descriptions), num_generations, *audio_values.shape[1:])
+        else:
+            all_audio_values = []
             for gen_idx in range(num_generations):
                 if num_generations > 1:
                     print(f"   Generating variation {gen_idx + 1}/{num_generations}...")
                 
-                audio_values = self.model.generate(
-                    **inputs, 
-                    do_sample=True, 
-                    guidance_scale=guidance_scale,
-                    max_new_tokens=int(duration * self.sample_rate / self.model.config.audio_encoder.hop_length)
-                )
+                audio_values = self._model_generate(inputs, guidance_scale, max_new_tokens)
                 all_audio_values.append(audio_values)
+            min_length = min(values.shape[-1] for values in all_audio_values)
+            candidates = torch.stack([values[..., :min_length] for values in all_audio_values], dim=1)
         
-        # En iyi versiyonu seç (basit: en yüksek enerji)
+        # En iyi versiyonu seç (tek vektörel skorlama, cihaz üzerinde)
         if num_generations > 1:
-            print("   🎯 Selecting best variation...")
-            best_indices = []
-            for desc_idx in range(len(descriptions)):
-                best_energy = -1
-                best_idx = 0
-                for gen_idx in range(num_generations):
-                    audio = all_audio_values[gen_idx][desc_idx].cpu().numpy()
-                    if len(audio.shape) > 1:
-                        audio = np.mean(audio, axis=0) if audio.shape[0] > 1 else audio[0]
-                    energy = np.mean(np.abs(audio))
-                    if energy > best_energy:
-                        best_energy = energy
-                        best_idx = gen_idx
-                best_indices.append(best_idx)
-                print(f"      Track {desc_idx + 1}: Selected variation {best_idx + 1}")
+            from take_scorer import select_best_takes
             
-            # En iyi versiyonları seç
-            audio_values = torch.stack([
-                all_audio_values[best_indices[i]][i] 
-                for i in range(len(descriptions))
-            ])
+            print(f"   🎯 Selecting best variation (scorer: {scorer if isinstance(scorer, str) else 'custom'})...")
+            audio_values, best_indices = select_best_takes(
+                candidates, self.sample_rate, scorer=scorer, descriptions=descriptions
+            )
+            for desc_idx, best_idx in enumerate(best_indices.tolist()):
+                print(f"      Track {desc_idx + 1}: Selected variation {best_idx + 1}")
         else:
-            audio_values = all_audio_values[0]
+            audio_values = candidates[:, 0]
         
         # Kaydet
         results = []
@@ -145,9 +298,9 @@ class MusicGenerator:
         audio_values = audio_values.cpu().numpy()
         
         for idx, (desc, audio) in enumerate(zip(descriptions, audio_values)):
-            # Eğer stereo ise mono'ya çevir (ortalamasını al)
+            # Mono → [samples]; stereo modeller kanalları korur → [samples, channels] (WAV düzeni)
             if len(audio.shape) > 1 and audio.shape[0] > 1:
-                audio = np.mean(audio, axis=0)
+                audio = audio.T
             elif len(audio.shape) > 1:
                 audio = audio[0]
             
@@ -167,34 +320,144 @@ class MusicGenerator:
         
         # Otomatik mastering
         if auto_master and results:
-            from advanced_mixing import process_audio_advanced
+            return self._master_results(results, master_preset)
+        
+        return results
+    
+    def _master_results(self, results, master_preset):
+        """Üretilen dosyalara mastering preset'ini uygular (process içinde sırayla, sıra korunur)"""
+        from batch_mastering import master_batch
+        
+        preset = get_preset(master_preset)
+        
+        print("\n🎚️  Applying automatic mastering...")
+        # Havuz yok: model ve batcher thread'lerini tutan process fork edilmemeli;
+        # 1-3 dosya için havuz açmak da kazanç getirmez. Yeni dosyalar için manifest gereksiz.
+        summary = master_batch(results, settings={**preset, 'stereo_widen': False},
+                               workers=1, manifest=False)
+        # Girişle bire bir hizalı kalmalı (batcher sonuçları sıraya göre dağıtır):
+        # masterlanamayan dosyanın yerine masterlanmamış hali döner
+        mastered = []
+        for entry in summary['files']:
+            if entry['status'] == 'failed':
+                print(f"   ⚠️  Keeping unmastered file: {entry['input']}")
+                mastered.append(entry['input'])
+            else:
+                mastered.append(entry['output'])
+        return mastered
+    
+    def generate_long(self, description, output_file, duration=180,
+                      window=LONG_FORM_WINDOW, overlap=LONG_FORM_OVERLAP,
+                      guidance_scale=3.0, seed=None, on_segment=None):
+        """
+        Model penceresinden uzun parçaları pencereli devam ettirme ile üretir
+        
+        Her pencere bir öncekinin son `overlap` saniyesiyle (audio prompt) koşullanır,
+        birleşim yerleri crossfade ile yumuşatılır ve ses WAV'a parça parça yazılır.
+        Bellek kullanımı parça süresinden bağımsızdır.
+        
+        Args:
+            description: str - Müzik açıklaması
+            output_file: Çıktı WAV dosyası
+            duration: Toplam süre (saniye)
+            window: Pencere süresi (saniye)
+            overlap: Örtüşme / crossfade süresi (saniye, > 0 - sonraki pencerenin audio prompt'u)
+            guidance_scale: Guidance scale
+            seed: Random seed
+            on_segment: callable(output_file, seconds_written) - her pencere yazıldığında çağrılır
+        
+        Returns:
+            str: Çıktı dosya yolu
+        """
+        import soundfile as sf
+        
+        if overlap >= window:
+            raise ValueError("overlap must be shorter than window")
+        
+        if seed is not None:
+            torch.manual_seed(seed)
+            if torch.cuda.is_available():
+                torch.cuda.manual_seed_all(seed)
+        
+        hop_length = self.model.config.audio_encoder.hop_length
+        frame_rate = self.sample_rate / hop_length
+        # Örtüşmeyi codec frame sınırına hizala (prompt yeniden kodlandığında kayma olmasın)
+        overlap_samples = int(overlap * frame_rate) * hop_length
+        if overlap_samples <= 0:
+            # Sonraki pencereler tail ile koşullanır; örtüşme olmadan devam ettirilemez
+            raise ValueError(f"overlap must be at least one codec frame ({1 / frame_rate:.3f}s)")
+        
+        print(f"\n🎵 Generating {duration}s track in {window}s windows ({overlap}s overlap)...")
+        print(f"   Description: {description}")
+        
+        first_seconds = min(window, duration)
+        text_inputs = self._text_inputs([description])
+        inputs = text_inputs
+        segment = self._model_generate(
+            inputs, guidance_scale, int(first_seconds * frame_rate)
+        )[0].float().cpu().numpy()  # [channels, samples]
+        
+        channels = segment.shape[0]
+        peak = np.max(np.abs(segment))
+        gain = LONG_FORM_HEADROOM / peak if peak > 0 else 1.0
+        produced = first_seconds
+        
+        with sf.SoundFile(output_file, 'w', samplerate=self.sample_rate,
+                          channels=channels, subtype='PCM_16') as out:
+            seconds_written = 0.0
             
-            mastering_presets = {
-                'default': {'bass_boost': 2.0, 'mid_boost': 0, 'treble_boost': 1.0, 'compression': True, 'reverb': True},
-                'bass_heavy': {'bass_boost': 4.0, 'mid_boost': 0, 'treble_boost': 0.5, 'compression': True, 'reverb': False},
-                'vocal': {'bass_boost': 1.0, 'mid_boost': 2.0, 'treble_boost': 1.5, 'compression': True, 'reverb': True},
-                'cinematic': {'bass_boost': 3.0, 'mid_boost': 1.0, 'treble_boost': 2.0, 'compression': True, 'reverb': True},
-                'folk_traditional': {'bass_boost': 2.5, 'mid_boost': 1.5, 'treble_boost': 2.0, 'compression': True, 'reverb': True}  # Karadeniz için
-            }
+            def write(block):
+                nonlocal seconds_written
+                out.write(np.clip(block * gain, -1.0, 1.0).T)
+                out.flush()
+                seconds_written += block.shape[-1] / self.sample_rate
+                if on_segment is not None:
+                    on_segment(output_file, seconds_written)
             
-            preset = mastering_presets.get(master_preset, mastering_presets['default'])
+            if produced >= duration:
+                write(segment)
+                tail = None
+            else:
+                write(segment[:, :-overlap_samples])
+                tail = segment[:, -overlap_samples:]
+            print(f"   ✅ Window 1: {seconds_written:.1f}s written")
             
-            print("\n🎚️  Applying automatic mastering...")
-            mastered_results = []
-            for result_file in results:
-                mastered = process_audio_advanced(
-                    result_file,
-                    bass_boost=preset['bass_boost'],
-                    mid_boost=preset['mid_boost'],
-                    treble_boost=preset['treble_boost'],
-                    compression=preset['compression'],
-                    reverb=preset['reverb'],
-                    stereo_widen=False
-                )
-                mastered_results.append(mastered)
-            return mastered_results
+            window_idx = 1
+            while tail is not None and produced < duration:
+                window_idx += 1
+                new_seconds = min(window - overlap, duration - produced)
+                
+                # Metin koşulu tüm pencerelerde aynı, sadece audio prompt değişir
+                audio_inputs = self.processor(
+                    audio=tail[0] if channels == 1 else tail,
+                    sampling_rate=self.sample_rate,
+                    return_tensors="pt",
+                ).to(self.device)
+                inputs = {**text_inputs, **audio_inputs}
+                # Çıktı = yeniden kodlanmış prompt (tail) + devam
+                segment = self._model_generate(
+                    inputs, guidance_scale, int(new_seconds * frame_rate)
+                )[0].float().cpu().numpy()
+                
+                # Model bazen birkaç frame kısa döner: crossfade gerçek tail uzunluğuyla yapılır
+                fade_samples = min(tail.shape[-1], segment.shape[-1])
+                # Equal-power crossfade eğrileri
+                fade = np.linspace(0, np.pi / 2, fade_samples, dtype=np.float32)
+                head = segment[:, :fade_samples]
+                joined = tail[:, :fade_samples] * np.cos(fade) + head * np.sin(fade)
+                continuation = segment[:, fade_samples:]
+                produced += new_seconds
+                
+                if produced >= duration:
+                    write(np.concatenate([joined, continuation], axis=1))
+                    tail = None
+                else:
+                    write(np.concatenate([joined, continuation[:, :-overlap_samples]], axis=1))
+                    tail = continuation[:, -overlap_samples:]
+                print(f"   ✅ Window {window_idx}: {seconds_written:.1f}s written")
         
-        return results
+        print(f"✅ Saved: {output_file}")
+        return output_file
 
 def main():
     parser = argparse.ArgumentParser(description='AI Music Generator')
@@ -210,18 +473,37 @@ def main():
     parser.add_argument('--master', action='store_true',
                        help='Otomatik mastering uygula')
     parser.add_argument('--master-preset', type=str, default='default',
-                       choices=['default', 'bass_heavy', 'vocal', 'cinematic'],
+                       choices=preset_names(),
                        help='Mastering preset')
+    parser.add_argument('--variations', type=int, default=1,
+                       help='Kaç farklı versiyon üret (en iyisini seçer)')
+    parser.add_argument('--batch-variations', action='store_true',
+                       help='Tüm varyasyonları tek bir batch çağrısında üret')
+    parser.add_argument('--scorer', type=str, default='energy',
+                       choices=['energy', 'loudness', 'flatness', 'clap'],
+                       help='En iyi varyasyonu seçme kriteri')
+    parser.add_argument('--cpu-profile', type=str, default='default',
+                       choices=list(CPU_PROFILES),
+                       help='CPU performans profili (int8 / bf16 / torch.compile, sadece CPU)')
+    parser.add_argument('--window', type=int, default=LONG_FORM_WINDOW,
+                       help='Uzun parçalarda pencere süresi (saniye, duration bunu aşarsa pencereli üretim)')
+    parser.add_argument('--overlap', type=int, default=LONG_FORM_OVERLAP,
+                       help='Pencereler arası crossfade süresi (saniye)')
     
     args = parser.parse_args()
     
-    generator = MusicGenerator(model_size=args.model)
+    generator = MusicGenerator(model_size=args.model, cpu_profile=args.cpu_profile)
     results = generator.generate(
         [args.prompt], 
         output_dir=args.output, 
         duration=args.duration,
         auto_master=args.master,
-        master_preset=args.master_preset
+        master_preset=args.master_preset,
+        num_generations=args.variations,
+        batch_variations=args.batch_variations,
+        scorer=args.scorer,
+        window=args.window,
+        overlap=args.overlap
     )
     print(f"\n🎉 {len(results)} track generated!")
 
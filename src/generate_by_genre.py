@@ -2,8 +2,9 @@
 Müzik türüne göre müzik üretimi
 """
 
-from generate import MusicGenerator
+from generation_server import get_generator
 from prompt_engineer import SOCIAL_MEDIA_PROMPTS, get_prompt
+from mastering_presets import preset_names
 import argparse
 
 def list_genres():
@@ -50,7 +51,7 @@ def generate_by_genre(genre, output_dir='output', duration=30, model_size='small
         print(f"   Recommended mastering preset: {master_preset}")
     
     # Müzik üret
-    generator = MusicGenerator(model_size=model_size)
+    generator = get_generator(model_size=model_size)
     results = generator.generate(
         [prompt], 
         output_dir=output_dir, 
@@ -91,7 +92,7 @@ def main():
     parser.add_argument('--master', action='store_true',
                        help='Otomatik mastering uygula')
     parser.add_argument('--master-preset', type=str, default=None,
-                       choices=['default', 'bass_heavy', 'vocal', 'cinematic'],
+                       choices=preset_names(),
                        help='Mastering preset (None = genre-based auto)')
     
     args = parser.parse_args()
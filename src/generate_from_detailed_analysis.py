@@ -3,12 +3,14 @@ Detaylı analiz sonuçlarını kullanarak müzik üretimi
 """
 
 import argparse
-from detailed_audio_analyzer import detailed_analyze_audio, detailed_analysis_to_prompt
-from generate import MusicGenerator
+from detailed_audio_analyzer import detailed_analysis_to_prompt
+from feature_store import analyze_cached
+from generation_server import get_generator
 
 def generate_from_detailed_analysis(audio_file, output_dir='output', duration=30,
                                     model_size='medium', guidance_scale=3.5,
-                                    num_generations=3, auto_master=True, seed=None):
+                                    num_generations=3, auto_master=True, seed=None,
+                                    batch_variations=False, scorer='energy'):
     """
     Detaylı analiz yapıp, sonuçlara göre müzik üretir
     """
@@ -16,9 +18,9 @@ def generate_from_detailed_analysis(audio_file, output_dir='output', duration=30
     print("🎵 GENERATE FROM DETAILED ANALYSIS")
     print("="*70)
     
-    # 1. Detaylı analiz
+    # 1. Detaylı analiz (özellik deposunda varsa tekrar analiz edilmez)
     print("\n📊 Step 1: Detailed Analysis")
-    analysis = detailed_analyze_audio(audio_file, skip_seconds=5, analysis_duration=120)
+    analysis = analyze_cached(audio_file, 'detailed', skip_seconds=5, analysis_duration=120)
     
     if analysis is None:
         print("❌ Analysis failed!")
@@ -47,7 +49,7 @@ def generate_from_detailed_analysis(audio_file, output_dir='output', duration=30
     
     # 3. Müzik üret
     print("\n🎵 Step 3: Generate Music")
-    generator = MusicGenerator(model_size=model_size)
+    generator = get_generator(model_size=model_size)
     results = generator.generate(
         [prompt],
         output_dir=output_dir,
@@ -56,7 +58,9 @@ def generate_from_detailed_analysis(audio_file, output_dir='output', duration=30
         master_preset='folk_traditional',
         guidance_scale=guidance_scale,
         num_generations=num_generations,
-        seed=seed
+        seed=seed,
+        batch_variations=batch_variations,
+        scorer=scorer
     )
     
     if results:
@@ -96,6 +100,11 @@ def main():
                        help='Random seed')
     parser.add_argument('--no-master', action='store_true',
                        help='Mastering uygulama')
+    parser.add_argument('--batch-variations', action='store_true',
+                       help='Tüm varyasyonları tek bir batch çağrısında üret')
+    parser.add_argument('--scorer', type=str, default='energy',
+                       choices=['energy', 'loudness', 'flatness', 'clap'],
+                       help='En iyi varyasyonu seçme kriteri')
     
     args = parser.parse_args()
     
@@ -107,7 +116,9 @@ def main():
         guidance_scale=args.guidance,
         num_generations=args.variations,
         auto_master=not args.no_master,
-        seed=args.seed
+        seed=args.seed,
+        batch_variations=args.batch_variations,
+        scorer=args.scorer
     )
 
 if __name__ == '__main__':
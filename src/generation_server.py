@@ -0,0 +1,307 @@
+"""
+Kalıcı müzik üretim sunucusu (generation daemon)
+Modeli bellekte tutar ve tüm CLI'lardan gelen üretim işlerini kabul eder,
+böylece her track için modelin diskten tekrar yüklenmesi beklenmez
+"""
+
+import argparse
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import model_registry
+import prompt_cache
+from batch_scheduler import GenerationBatcher
+from generate import CPU_PROFILES, MusicGenerator
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Sunucu adresi (örn: http://127.0.0.1:8765). 'off' ise sunucu hiç denenmez
+SERVER_URL_ENV = 'NBS_GENERATION_SERVER'
+
+MODEL_SIZES = ('small', 'medium', 'large')
+
+
+class GenerationService:
+    """Model boyutu başına tek bir yüklü MusicGenerator tutar"""
+
+    def __init__(self, device=None, batch_window=0.25, max_batch_size=8, cpu_profile='default'):
+        """
+        Args:
+            device: 'cuda', 'cpu' veya None (otomatik seçim)
+            cpu_profile: CPU performans profili (bkz. generate.CPU_PROFILES)
+            batch_window: Eşzamanlı işleri toplamak için bekleme penceresi (saniye)
+            max_batch_size: Tek model.generate çağrısındaki maksimum prompt sayısı
+        """
+        self.device = device
+        self.cpu_profile = cpu_profile
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.jobs_done = 0
+        self._generators = {}
+        self._batchers = {}
+        self._model_locks = {}
+        self._lock = threading.Lock()
+
+    def get_generator(self, model_size):
+        """Model boyutu için yüklü generator'ı döndürür (gerekirse yükler)"""
+        if model_size not in MODEL_SIZES:
+            raise ValueError(f"Unknown model size: {model_size}")
+
+        with self._lock:
+            if model_size not in self._model_locks:
+                self._model_locks[model_size] = threading.Lock()
+            model_lock = self._model_locks[model_size]
+
+        # Yükleme model kilidi altında yapılır, diğer modellerin işleri beklemez
+        with model_lock:
+            if model_size not in self._generators:
+                generator = MusicGenerator(model_size=model_size, device=self.device,
+                                           cpu_profile=self.cpu_profile)
+                self._generators[model_size] = generator
+                # Model thread-safe değil: tüm işler modelin batcher worker'ından geçer
+                self._batchers[model_size] = GenerationBatcher(
+                    generator, window=self.batch_window, max_batch_size=self.max_batch_size
+                )
+        return self._generators[model_size]
+
+    def loaded_models(self):
+        return sorted(self._generators)
+
+    def run_job(self, job):
+        """
+        Tek bir üretim işini çalıştırır
+
+        Args:
+            job: dict - 'descriptions', 'model_size' ve MusicGenerator.generate parametreleri
+
+        Returns:
+            list: Üretilen dosya yolları
+        """
+        job = dict(job)
+        descriptions = job.pop('descriptions', None)
+        if not descriptions:
+            raise ValueError("'descriptions' is required")
+        model_size = job.pop('model_size', 'small')
+
+        self.get_generator(model_size)
+        # Eşzamanlı işler aynı ayarlara sahipse tek batch'te üretilir
+        results = self._batchers[model_size].submit(descriptions, **job)
+        with self._lock:
+            self.jobs_done += 1
+        return results
+
+    def batch_stats(self):
+        return {
+            model_size: {'batches': batcher.batches_run, 'prompts': batcher.prompts_run}
+            for model_size, batcher in self._batchers.items()
+        }
+
+
+class GenerationRequestHandler(BaseHTTPRequestHandler):
+    """GET /health ve POST /generate uç noktaları"""
+
+    service = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': 'not found'})
+            return
+        self._send_json(200, {
+            'status': 'ok',
+            'models': self.service.loaded_models(),
+            'jobs_done': self.service.jobs_done,
+            'batches': self.service.batch_stats(),
+            'model_loads': model_registry.get_load_stats(),
+            'prompt_cache': prompt_cache.get_cache_stats()
+        })
+
+    def do_POST(self):
+        if self.path != '/generate':
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            job = json.loads(self.rfile.read(length).decode('utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {'error': f'invalid job: {e}'})
+            return
+
+        try:
+            results = self.service.run_job(job)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            print(f"❌ Job failed: {e}")
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, {'results': results})
+
+    def log_message(self, format, *args):
+        print(f"   [server] {self.address_string()} - {format % args}")
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, device=None, preload=None,
+          batch_window=0.25, max_batch_size=8, cpu_profile='default'):
+    """
+    Üretim sunucusunu başlatır (Ctrl+C ile durur)
+
+    Args:
+        host: Dinlenecek adres (varsayılan sadece localhost)
+        port: Port
+        device: 'cuda', 'cpu' veya None (otomatik seçim)
+        preload: List[str] - Başlangıçta yüklenecek model boyutları
+        batch_window: Eşzamanlı işleri toplamak için bekleme penceresi (saniye)
+        max_batch_size: Tek model.generate çağrısındaki maksimum prompt sayısı
+        cpu_profile: CPU performans profili (bkz. generate.CPU_PROFILES)
+    """
+    service = GenerationService(device=device, batch_window=batch_window,
+                                max_batch_size=max_batch_size, cpu_profile=cpu_profile)
+    for model_size in preload or []:
+        service.get_generator(model_size)
+
+    handler = type('BoundGenerationRequestHandler', (GenerationRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"🚀 Generation server listening on http://{host}:{port}")
+    print(f"   Loaded models: {', '.join(service.loaded_models()) or 'none (lazy)'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping generation server...")
+    finally:
+        server.server_close()
+
+
+def get_server_url():
+    """Ortam değişkeninden veya varsayılandan sunucu adresini döndürür (kapalıysa None)"""
+    url = os.environ.get(SERVER_URL_ENV, f'http://{DEFAULT_HOST}:{DEFAULT_PORT}')
+    if url.strip().lower() in ('', 'off', 'none', '0'):
+        return None
+    return url.rstrip('/')
+
+
+def is_server_running(server_url, timeout=0.5):
+    """Sunucu /health'e cevap veriyor mu kontrol eder"""
+    try:
+        with urllib.request.urlopen(f'{server_url}/health', timeout=timeout) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+class RemoteMusicGenerator:
+    """
+    MusicGenerator ile aynı generate() arayüzü, işi çalışan sunucuya gönderir
+    """
+
+    def __init__(self, model_size='small', server_url=None):
+        self.model_size = model_size
+        self.server_url = server_url or get_server_url()
+
+    def generate(self, descriptions, output_dir='output', **kwargs):
+        """
+        Müzik üretir (sunucuda)
+
+        Args:
+            descriptions: List[str] - Müzik açıklamaları
+            output_dir: Çıktı klasörü (sunucuya mutlak yol olarak gönderilir)
+            **kwargs: MusicGenerator.generate ile aynı parametreler
+        """
+        job = dict(kwargs)
+        job['descriptions'] = list(descriptions)
+        job['output_dir'] = os.path.abspath(output_dir)
+        job['model_size'] = self.model_size
+
+        request = urllib.request.Request(
+            f'{self.server_url}/generate',
+            data=json.dumps(job, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json; charset=utf-8'},
+            method='POST'
+        )
+        print(f"\n📡 Sending {len(job['descriptions'])} prompt(s) to generation server ({self.server_url})...")
+        try:
+            with urllib.request.urlopen(request) as response:
+                payload = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error', str(e))
+            except ValueError:
+                message = str(e)
+            raise RuntimeError(f"Generation server error: {message}") from e
+
+        results = payload['results']
+        for result in results:
+            print(f"✅ Saved: {result}")
+        return results
+
+
+def get_generator(model_size='small', device=None):
+    """
+    Sunucu çalışıyorsa uzak generator, değilse yerel MusicGenerator döndürür
+
+    Args:
+        model_size: 'small', 'medium', 'large'
+        device: Yerel yükleme için cihaz (sunucu kendi cihazını kullanır)
+    """
+    server_url = get_server_url()
+    if server_url and is_server_running(server_url):
+        print(f"⚡ Using running generation server: {server_url}")
+        return RemoteMusicGenerator(model_size=model_size, server_url=server_url)
+    return MusicGenerator(model_size=model_size, device=device)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Kalıcı Müzik Üretim Sunucusu',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Örnek kullanım:
+  # Sunucuyu başlat (small modeli önceden yükle)
+  python generation_server.py --preload small
+
+  # Diğer terminalde: tüm CLI'lar sunucuyu otomatik kullanır
+  python generate_by_genre.py --genre rock --duration 30
+
+  # Sunucuyu devre dışı bırakmak için
+  NBS_GENERATION_SERVER=off python generate_by_genre.py --genre rock
+        """
+    )
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST,
+                       help='Dinlenecek adres')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                       help='Port')
+    parser.add_argument('--device', type=str, default=None,
+                       choices=['cuda', 'cpu'],
+                       help='Cihaz (varsayılan: otomatik)')
+    parser.add_argument('--preload', type=str, nargs='*', default=['small'],
+                       choices=list(MODEL_SIZES),
+                       help='Başlangıçta yüklenecek model boyutları')
+    parser.add_argument('--batch-window', type=float, default=0.25,
+                       help='Eşzamanlı istekleri toplama penceresi (saniye, 0 = batching yok)')
+    parser.add_argument('--max-batch-size', type=int, default=8,
+                       help='Tek üretim çağrısındaki maksimum prompt sayısı')
+    parser.add_argument('--cpu-profile', type=str, default='default',
+                       choices=list(CPU_PROFILES),
+                       help='CPU performans profili (int8 / bf16 / torch.compile)')
+
+    args = parser.parse_args()
+
+    serve(host=args.host, port=args.port, device=args.device, preload=args.preload,
+          batch_window=args.batch_window, max_batch_size=args.max_batch_size,
+          cpu_profile=args.cpu_profile)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+ITU-R BS.1770 loudness ölçümü
+K-weighting, 400 ms / %75 örtüşmeli gating ile integrated loudness (LUFS) ve
+4x oversampling ile true-peak (dBTP). Ölçüm blok blok yapılır, bu yüzden hem tam
+diziler hem de streaming işleme için aynı ölçer kullanılır.
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+TRUE_PEAK_OVERSAMPLE = 4
+# True-peak interpolasyon filtresinin her iki yanda ihtiyaç duyduğu örnek sayısı (giriş hızında)
+TRUE_PEAK_CONTEXT = 16
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg', '.aiff', '.aif')
+
+
+@functools.lru_cache(maxsize=32)
+def k_weighting_sos(sample_rate):
+    """
+    K-weighting filtresi (pre-filter high shelf + RLB high-pass) → SOS [2, 6]
+    48 kHz'deki BS.1770 katsayılarını her sample rate için bilinear dönüşümle yeniden üretir.
+    """
+    # 1. Aşama: high shelf (~+4 dB, kafa etkisi)
+    K = math.tan(math.pi * 1681.974450955533 / sample_rate)
+    Q = 0.7071752369554196
+    Vh = 10 ** (3.999843853973347 / 20)
+    Vb = Vh ** 0.4996667741545416
+    a0 = 1 + K / Q + K * K
+    shelf = [(Vh + Vb * K / Q + K * K) / a0, 2 * (K * K - Vh) / a0, (Vh - Vb * K / Q + K * K) / a0,
+             1.0, 2 * (K * K - 1) / a0, (1 - K / Q + K * K) / a0]
+
+    # 2. Aşama: RLB high-pass (~38 Hz)
+    K = math.tan(math.pi * 38.13547087602444 / sample_rate)
+    Q = 0.5003270373238773
+    a0 = 1 + K / Q + K * K
+    highpass = [1.0, -2.0, 1.0, 1.0, 2 * (K * K - 1) / a0, (1 - K / Q + K * K) / a0]
+
+    return np.array([shelf, highpass])
+
+
+def _to_db(value):
+    return 10 * np.log10(value) if value > 0 else float('-inf')
+
+
+class LoudnessMeter:
+    """Blok blok beslenen BS.1770 ölçer"""
+
+    def __init__(self, sample_rate, channels=1):
+        """
+        Args:
+            sample_rate: Sample rate
+            channels: Kanal sayısı (her kanal ağırlığı 1.0 - mono/stereo)
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sos = k_weighting_sos(sample_rate)
+        self.zi = np.zeros((self.sos.shape[0], channels, 2))
+        # Gating blokları 100 ms'lik alt blokların toplamıdır (400 ms pencere, 100 ms adım)
+        self.step = int(round(0.1 * sample_rate))
+        self.pending = np.zeros((channels, 0))
+        self.step_energies = []
+        self.sample_peak = 0.0
+        self.true_peak = 0.0
+        self.peak_context = np.zeros((channels, 0))
+        self.samples = 0
+
+    def add(self, block):
+        """
+        Ölçüme blok ekler
+
+        Args:
+            block: [samples] (mono) veya [channels, samples]
+        """
+        block = np.atleast_2d(np.asarray(block, dtype=np.float64))
+        if block.shape[-1] == 0:
+            return
+        self.samples += block.shape[-1]
+        self.sample_peak = max(self.sample_peak, float(np.max(np.abs(block))))
+
+        # K-weighted kareler → 100 ms alt blok enerjileri (artan örnekler sonraki bloğa taşınır)
+        weighted, self.zi = signal.sosfilt(self.sos, block, axis=-1, zi=self.zi)
+        squares = np.concatenate([self.pending, weighted ** 2], axis=-1)
+        complete = squares.shape[-1] // self.step * self.step
+        if complete:
+            sums = squares[:, :complete].reshape(self.channels, -1, self.step).sum(axis=-1)
+            self.step_energies.append(sums)
+        self.pending = squares[:, complete:]
+
+        # True-peak: her iki yanda yeterli bağlamı olan örnekler oversample edilir
+        extended = np.concatenate([self.peak_context, block], axis=-1)
+        if extended.shape[-1] > 2 * TRUE_PEAK_CONTEXT:
+            self._update_true_peak(extended, TRUE_PEAK_CONTEXT, extended.shape[-1] - TRUE_PEAK_CONTEXT)
+            self.peak_context = extended[:, -2 * TRUE_PEAK_CONTEXT:]
+        else:
+            self.peak_context = extended
+
+    def _update_true_peak(self, extended, start, end):
+        """extended[start:end] aralığının oversample edilmiş tepe değeri"""
+        if end <= start:
+            return
+        upsampled = signal.resample_poly(extended, TRUE_PEAK_OVERSAMPLE, 1, axis=-1)
+        segment = upsampled[:, start * TRUE_PEAK_OVERSAMPLE:end * TRUE_PEAK_OVERSAMPLE]
+        if segment.size:
+            self.true_peak = max(self.true_peak, float(np.max(np.abs(segment))))
+
+    def _finish_true_peak(self):
+        # Son bağlam: sondaki örneklerin sağında sinyal yok (sıfır dolgu gerçek son)
+        context = self.peak_context
+        start = min(TRUE_PEAK_CONTEXT, context.shape[-1]) if self.samples > context.shape[-1] else 0
+        self._update_true_peak(context, start, context.shape[-1])
+        return max(self.true_peak, self.sample_peak)
+
+    def integrated_loudness(self):
+        """Gated integrated loudness (LUFS), sessizlik/çok kısa sinyal için -inf"""
+        if not self.step_energies:
+            return float('-inf')
+        steps = np.concatenate(self.step_energies, axis=-1)
+        if steps.shape[-1] < 4:
+            return float('-inf')
+        # 400 ms blokların ortalama karesi (kanal başına) → kanal toplamı
+        window = steps[:, :-3] + steps[:, 1:-2] + steps[:, 2:-1] + steps[:, 3:]
+        power = window.sum(axis=0) / (4 * self.step)
+        loudness = -0.691 + 10 * np.log10(np.maximum(power, 1e-20))
+
+        gated = power[loudness > ABSOLUTE_GATE_LUFS]
+        if gated.size == 0:
+            return float('-inf')
+        relative_gate = -0.691 + _to_db(gated.mean()) + RELATIVE_GATE_LU
+        gated = power[(loudness > ABSOLUTE_GATE_LUFS) & (loudness > relative_gate)]
+        if gated.size == 0:
+            return float('-inf')
+        return -0.691 + _to_db(gated.mean())
+
+    def result(self):
+        """
+        Returns:
+            dict: integrated_lufs, true_peak_dbtp, sample_peak_dbfs, duration
+        """
+        true_peak = self._finish_true_peak()
+        return {
+            'integrated_lufs': self.integrated_loudness(),
+            'true_peak_dbtp': 20 * np.log10(true_peak) if true_peak > 0 else float('-inf'),
+            'sample_peak_dbfs': 20 * np.log10(self.sample_peak) if self.sample_peak > 0 else float('-inf'),
+            'duration': self.samples / self.sample_rate,
+        }
+
+
+def measure_loudness(audio, sample_rate):
+    """
+    Bir dizinin loudness ölçümü
+
+    Args:
+        audio: [samples] (mono) veya [channels, samples]
+        sample_rate: Sample rate
+    """
+    audio = np.atleast_2d(audio)
+    meter = LoudnessMeter(sample_rate, channels=audio.shape[0])
+    meter.add(audio)
+    return meter.result()
+
+
+def integrated_loudness(audio, sample_rate):
+    """Integrated loudness (LUFS)"""
+    audio = np.atleast_2d(audio)
+    meter = LoudnessMeter(sample_rate, channels=audio.shape[0])
+    meter.add(audio)
+    return meter.integrated_loudness()
+
+
+def meter_file(path, block_size=65536):
+    """
+    Dosyayı blok blok okuyarak ölçer (bellek dosya boyutundan bağımsız)
+
+    Returns:
+        dict: measure_loudness sonucu + 'file'
+    """
+    with sf.SoundFile(path) as f:
+        meter = LoudnessMeter(f.samplerate, channels=f.channels)
+        for block in f.blocks(blocksize=block_size, dtype='float32', always_2d=True):
+            meter.add(block.T)
+    result = meter.result()
+    result['file'] = path
+    return result
+
+
+def _meter_file_safe(path):
+    try:
+        return meter_file(path)
+    except Exception as e:
+        return {'file': path, 'error': str(e)}
+
+
+def collect_audio_files(paths, extensions=AUDIO_EXTENSIONS):
+    """Dosya ve klasör listesinden ses dosyalarını toplar (klasörler recursive)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(extensions))
+        else:
+            files.append(path)
+    return files
+
+
+def meter_files(paths, workers=None):
+    """
+    Birden çok dosyayı paralel ölçer (process havuzu)
+
+    Args:
+        paths: Dosya yolları
+        workers: Process sayısı (None = CPU sayısı)
+
+    Returns:
+        list: Dosya başına sonuç dict'leri (sıra korunur)
+    """
+    if workers == 1 or len(paths) <= 1:
+        return [_meter_file_safe(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_meter_file_safe, paths, chunksize=4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BS.1770 Loudness Ölçer (LUFS / true-peak)')
+    parser.add_argument('inputs', type=str, nargs='+', help='Ses dosyaları veya klasörler')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Paralel process sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--json', type=str, default=None,
+                       help='Sonuçları JSON olarak kaydet')
+
+    args = parser.parse_args()
+
+    files = collect_audio_files(args.inputs)
+    print(f"📏 Metering {len(files)} file(s)...")
+    results = meter_files(files, workers=args.workers)
+
+    for result in results:
+        if 'error' in result:
+            print(f"❌ {result['file']}: {result['error']}")
+        else:
+            print(f"   {result['integrated_lufs']:7.1f} LUFS  {result['true_peak_dbtp']:6.1f} dBTP  "
+                  f"{result['duration']:7.1f}s  {result['file']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,7 @@ MusicGen şarkı sözlerini direkt çeviremez, ama duyguyu analiz edip prompt'a
 """
 
 import re
-from generate import MusicGenerator
+from generation_server import get_generator
 import argparse
 
 # Duygusal kelime analizi (basit)
@@ -109,7 +109,7 @@ def generate_from_lyrics(lyrics, output_dir='output', duration=30, model_size='s
     print(f"\n🎵 Generated prompt: {prompt}\n")
     
     # Müzik üret
-    generator = MusicGenerator(model_size=model_size)
+    generator = get_generator(model_size=model_size)
     results = generator.generate([prompt], output_dir=output_dir, duration=duration)
     
     if not results:
@@ -2,8 +2,8 @@
 Manuel prompt oluşturucu - Analiz sonuçlarını gösterir, kullanıcı prompt'u düzenleyebilir
 """
 
-from audio_analyzer import analyze_audio, convert_to_wav_if_needed
-from generate import MusicGenerator
+from feature_store import analyze_cached
+from generation_server import get_generator
 import argparse
 import os
 
@@ -14,9 +14,8 @@ def interactive_prompt_creation(audio_file, output_dir='output', duration=30,
     """
     print(f"🔍 Analyzing: {audio_file}\n")
     
-    # Analiz
-    audio_file = convert_to_wav_if_needed(audio_file)
-    analysis = analyze_audio(audio_file, skip_seconds=0, analysis_duration=60)
+    # Analiz (özellik deposunda varsa tekrar analiz edilmez)
+    analysis = analyze_cached(audio_file, 'basic', skip_seconds=0, analysis_duration=60)
     
     if not analysis:
         return None
@@ -45,7 +44,7 @@ def interactive_prompt_creation(audio_file, output_dir='output', duration=30,
     print("   (Gelecekte interaktif düzenleme eklenebilir)\n")
     
     # Müzik üret
-    generator = MusicGenerator(model_size=model_size)
+    generator = get_generator(model_size=model_size)
     results = generator.generate(
         [suggested_prompt],
         output_dir=output_dir,
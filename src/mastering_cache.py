@@ -0,0 +1,151 @@
+"""
+Mastering sonuç önbelleği (içerik adresli)
+Anahtar: hash(giriş ses baytları, mastering ayarları + reverb IR içeriği, mastering kodu sürümü).
+Aynı giriş aynı ayarlarla tekrar masterlanmak istendiğinde önceki çıktı kopyalanır.
+Disk kullanımı boyut sınırlıdır; en uzun süredir kullanılmayan sonuçlar silinir (LRU).
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+
+from cache_utils import get_cache_dir, source_hash, text_hash
+
+# Önbellek boyut sınırını değiştirmek için ortam değişkeni (MB)
+CACHE_SIZE_ENV = 'NEURAL_BEATS_MASTERING_CACHE_MB'
+DEFAULT_MAX_MB = 2048
+
+# Çıktıyı etkileyen modüller: kaynakları değişince eski sonuçlar geçersiz olur
+MASTERING_MODULES = ('advanced_mixing.py', 'compressor.py', 'eq_bank.py', 'loudness.py',
+                     'reverb.py', 'streaming_mastering.py')
+
+
+@functools.lru_cache(maxsize=1)
+def code_version():
+    """Mastering zincirinin kaynak kodu hash'i"""
+    return source_hash(*MASTERING_MODULES)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Dosya içeriğinin sha256'sı (parça parça okunur)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_key(settings):
+    """Ayarların kararlı metni; reverb IR dosyası varsa yolu yerine içeriğinin hash'i de girer"""
+    key = json.dumps(settings, sort_keys=True)
+    if settings.get('reverb_ir'):
+        key += f"|reverb_ir:{file_hash(settings['reverb_ir'])}"
+    return key
+
+
+class MasteringCache:
+    """Mastering çıktılarının disk önbelleği (boyut sınırlı LRU)"""
+
+    def __init__(self, max_bytes=None, cache_dir=None):
+        """
+        Args:
+            max_bytes: Maksimum toplam boyut (None = NEURAL_BEATS_MASTERING_CACHE_MB veya 2 GB)
+            cache_dir: Önbellek klasörü (None = ortak önbellek kökü altında 'mastering')
+        """
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or get_cache_dir('mastering')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, input_file, settings):
+        """Giriş içeriği + ayarlar (IR içeriği dahil) + kod sürümü → önbellek anahtarı"""
+        return text_hash(file_hash(input_file), settings_key(settings), code_version())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, key, output_file):
+        """
+        Önbellekteki sonucu output_file'a kopyalar
+
+        Returns:
+            bool: Önbellekte bulunduysa True
+        """
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, output_file)
+            os.utime(path)  # LRU: son kullanım zamanı
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def put(self, key, output_file):
+        """Yeni mastering çıktısını önbelleğe ekler ve boyut sınırını uygular"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(output_file, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Toplam boyut sınırı aşılırsa en eski kullanılan sonuçları siler"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.wav'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        """Önbellek istatistikleri"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def master_file_cached(input_file, output_file, settings, cache=None):
+    """
+    process_audio_advanced'ı önbellek üzerinden çalıştırır
+
+    Args:
+        input_file: Giriş dosyası
+        output_file: Çıktı dosyası
+        settings: process_audio_advanced ayarları
+        cache: MasteringCache (None = varsayılan)
+
+    Returns:
+        bool: Sonuç önbellekten geldiyse True
+    """
+    from advanced_mixing import process_audio_advanced
+
+    cache = cache or MasteringCache()
+    key = cache.key(input_file, settings)
+    if cache.get(key, output_file):
+        print(f"♻️  Mastering cache hit: {output_file}")
+        return True
+    process_audio_advanced(input_file, output_file, **settings)
+    cache.put(key, output_file)
+    return False
@@ -0,0 +1,62 @@
+"""
+Mastering preset kayıt defteri
+Preset ayarları (process_audio_advanced parametreleri) ve tür → preset eşlemesi tek yerde tutulur
+"""
+
+# Preset adı → process_audio_advanced ayarları
+MASTERING_PRESETS = {
+    'default': {'bass_boost': 2.0, 'mid_boost': 0, 'treble_boost': 1.0, 'compression': True, 'reverb': True},
+    'bass_heavy': {'bass_boost': 4.0, 'mid_boost': 0, 'treble_boost': 0.5, 'compression': True, 'reverb': False},
+    'vocal': {'bass_boost': 1.0, 'mid_boost': 2.0, 'treble_boost': 1.5, 'compression': True, 'reverb': True},
+    'cinematic': {'bass_boost': 3.0, 'mid_boost': 1.0, 'treble_boost': 2.0, 'compression': True, 'reverb': True},
+    'folk_traditional': {'bass_boost': 2.5, 'mid_boost': 1.5, 'treble_boost': 2.0, 'compression': True, 'reverb': True}  # Karadeniz için
+}
+
+# Müzik türüne göre önerilen mastering preset'leri
+GENRE_MASTERING_PRESETS = {
+    'rock': 'bass_heavy',
+    'metal': 'bass_heavy',
+    'rap_hiphop': 'bass_heavy',
+    'electronic': 'bass_heavy',
+    'pop': 'default',
+    'jazz': 'vocal',
+    'blues': 'vocal',
+    'classical': 'cinematic',
+    'turkish_pop': 'default',
+    'turkish_traditional': 'vocal',
+    'karadeniz': 'folk_traditional',
+    'country': 'vocal',
+    'latin': 'default',
+    'reggae': 'bass_heavy'
+}
+
+
+def preset_names():
+    """Kayıtlı preset adları (CLI choices için)"""
+    return list(MASTERING_PRESETS)
+
+
+def get_preset(name):
+    """
+    Preset ayarlarının kopyasını döndürür (bilinmeyen/None ad → 'default')
+
+    Args:
+        name: Preset adı
+    """
+    return dict(MASTERING_PRESETS.get(name, MASTERING_PRESETS['default']))
+
+
+def register_preset(name, **settings):
+    """
+    Yeni preset ekler veya mevcut olanı günceller
+
+    Args:
+        name: Preset adı
+        **settings: process_audio_advanced ayarları (bass_boost, reverb, target_lufs...)
+    """
+    MASTERING_PRESETS[name] = dict(settings)
+
+
+def preset_for_genre(genre):
+    """Müzik türüne göre önerilen preset adı"""
+    return GENRE_MASTERING_PRESETS.get(genre, 'default')
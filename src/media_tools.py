@@ -0,0 +1,210 @@
+"""
+FFmpeg / ffprobe bulma ve yetenek tespiti
+Binary yolu process başına bir kez çözülür; doğrulama (-version) ve encoder / hwaccel
+listesi binary'nin mtime'ı ile diskte saklanır, sonraki process'ler ffmpeg çalıştırmaz.
+"""
+
+import functools
+import glob
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+from cache_utils import get_cache_dir
+
+CACHE_FILE = 'media_tools.json'
+
+# PATH dışında aranan yerler (Windows: winget ve yaygın kurulum klasörleri)
+SEARCH_PATTERNS = (
+    r'~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_*\ffmpeg-*\bin\{name}.exe',
+    r'C:\ffmpeg\bin\{name}.exe',
+    r'C:\Program Files\ffmpeg\bin\{name}.exe',
+    r'C:\Program Files (x86)\ffmpeg\bin\{name}.exe',
+)
+
+# Tercih sırasına göre H.264 encoder'ları (libx264 yoksa donanım encoder'ları)
+H264_ENCODERS = ('libx264', 'h264_nvenc', 'h264_qsv', 'h264_videotoolbox', 'h264_amf', 'h264_vaapi')
+
+_cache_lock = threading.Lock()
+
+
+def _cache_path():
+    return os.path.join(get_cache_dir('tools'), CACHE_FILE)
+
+
+def _load_cache():
+    try:
+        with open(_cache_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_cache(name, entry):
+    """Tek bir aracın kaydını disk önbelleğinde günceller"""
+    with _cache_lock:
+        cache = _load_cache()
+        cache[name] = entry
+        path = _cache_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _candidates(name):
+    """PATH ve bilinen kurulum yerleri"""
+    found = shutil.which(name)
+    if found:
+        yield found
+    for pattern in SEARCH_PATTERNS:
+        for match in sorted(glob.glob(os.path.expanduser(pattern.format(name=name)))):
+            yield match
+
+
+def _run(path, *args, timeout=10):
+    result = subprocess.run([path, '-hide_banner', *args], capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout
+
+
+@functools.lru_cache(maxsize=None)
+def find_tool(name):
+    """
+    Aracın çalıştırılabilir yolunu bulur (process başına bir kez, doğrulama diskte önbellekli)
+
+    Args:
+        name: 'ffmpeg' veya 'ffprobe'
+
+    Returns:
+        str veya None (bulunamazsa)
+    """
+    cached = _load_cache().get(name)
+    candidates = list(_candidates(name))
+    if name == 'ffprobe':
+        # ffprobe genelde ffmpeg ile aynı klasördedir
+        ffmpeg = find_tool('ffmpeg')
+        if ffmpeg:
+            sibling = os.path.join(os.path.dirname(ffmpeg), os.path.basename(ffmpeg).replace('ffmpeg', 'ffprobe'))
+            if os.path.exists(sibling) and sibling not in candidates:
+                candidates.append(sibling)
+
+    for path in candidates:
+        mtime = _mtime(path)
+        if cached and cached.get('path') == path and cached.get('mtime') == mtime:
+            return path
+        try:
+            version = _run(path, '-version', timeout=5).splitlines()[0]
+        except (OSError, RuntimeError, IndexError, subprocess.SubprocessError):
+            continue
+        _update_cache(name, {'path': path, 'mtime': mtime, 'version': version})
+        return path
+    return None
+
+
+def find_ffmpeg():
+    """FFmpeg yolunu bulur (None = kurulu değil)"""
+    return find_tool('ffmpeg')
+
+
+def find_ffprobe():
+    """ffprobe yolunu bulur (None = kurulu değil)"""
+    return find_tool('ffprobe')
+
+
+def _parse_encoders(output):
+    """`ffmpeg -encoders` çıktısı → encoder isimleri"""
+    encoders = []
+    started = False
+    for line in output.splitlines():
+        if line.strip().startswith('------'):
+            started = True
+            continue
+        parts = line.split()
+        if started and len(parts) >= 2:
+            encoders.append(parts[1])
+    return encoders
+
+
+def _parse_hwaccels(output):
+    """`ffmpeg -hwaccels` çıktısı → hwaccel isimleri"""
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    return [line for line in lines if not line.endswith(':')]
+
+
+@functools.lru_cache(maxsize=1)
+def ffmpeg_capabilities():
+    """
+    FFmpeg'in sürümü, encoder'ları ve donanım hızlandırmaları (binary mtime ile diskte önbellekli)
+
+    Returns:
+        dict: path, version, encoders (list), hwaccels (list) - ffmpeg yoksa None
+    """
+    path = find_ffmpeg()
+    if not path:
+        return None
+    mtime = _mtime(path)
+    cached = _load_cache().get('ffmpeg_capabilities')
+    if cached and cached.get('path') == path and cached.get('mtime') == mtime:
+        return cached
+
+    try:
+        encoders = _parse_encoders(_run(path, '-encoders'))
+        hwaccels = _parse_hwaccels(_run(path, '-hwaccels'))
+        version = _run(path, '-version').splitlines()[0]
+    except (OSError, RuntimeError, IndexError, subprocess.SubprocessError):
+        return {'path': path, 'mtime': mtime, 'version': None, 'encoders': [], 'hwaccels': []}
+
+    capabilities = {'path': path, 'mtime': mtime, 'version': version, 'encoders': encoders, 'hwaccels': hwaccels}
+    _update_cache('ffmpeg_capabilities', capabilities)
+    return capabilities
+
+
+def has_encoder(name):
+    """FFmpeg'de encoder var mı"""
+    capabilities = ffmpeg_capabilities()
+    return bool(capabilities) and name in capabilities['encoders']
+
+
+def h264_encoder():
+    """
+    Kullanılabilir ilk H.264 encoder'ı (libx264 öncelikli; liste okunamazsa libx264)
+    """
+    capabilities = ffmpeg_capabilities()
+    if not capabilities or not capabilities['encoders']:
+        return 'libx264'
+    for encoder in H264_ENCODERS:
+        if encoder in capabilities['encoders']:
+            return encoder
+    return 'libx264'
+
+
+def main():
+    capabilities = ffmpeg_capabilities()
+    ffprobe = find_ffprobe()
+    if not capabilities:
+        print("❌ FFmpeg not found")
+        print("   Install FFmpeg: https://ffmpeg.org/download.html")
+        return
+    print(f"🎬 ffmpeg:  {capabilities['path']}")
+    print(f"   {capabilities['version']}")
+    print(f"🔎 ffprobe: {ffprobe or 'not found'}")
+    print(f"🎞️  H.264 encoder: {h264_encoder()}")
+    print(f"⚡ hwaccels: {', '.join(capabilities['hwaccels']) or 'none'}")
+    print(f"💾 Cache: {_cache_path()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Process genelinde paylaşılan MusicGen model kayıt defteri
+Aynı (model_size, device, dtype[, compiled]) için model bir kez yüklenir; CPU'da ağırlıklar
+safetensors dosyasından memory-mapped olarak bağlanır, böylece birden çok worker
+process aynı sayfa önbelleğini (page cache) paylaşır
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+
+import torch
+from transformers import AutoProcessor, MusicgenForConditionalGeneration
+
+# Registry dtype adları → torch dtype ('qint8' = fp32 yükle + decoder'a dinamik int8)
+MODEL_DTYPES = {
+    'float32': torch.float32,
+    'float16': torch.float16,
+    'bfloat16': torch.bfloat16,
+    'qint8': torch.float32,
+}
+
+SAFETENSORS_DTYPES = {
+    'F64': torch.float64,
+    'F32': torch.float32,
+    'F16': torch.float16,
+    'BF16': torch.bfloat16,
+    'I64': torch.int64,
+    'I32': torch.int32,
+    'I16': torch.int16,
+    'I8': torch.int8,
+    'U8': torch.uint8,
+    'BOOL': torch.bool,
+}
+
+_models = {}
+_processors = {}
+_load_stats = {}
+_key_locks = {}
+_lock = threading.Lock()
+
+
+def model_name_for(model_size):
+    """'small' → 'facebook/musicgen-small'"""
+    return f'facebook/musicgen-{model_size}'
+
+
+def default_dtype(device):
+    """Cihaz için varsayılan dtype (GPU'da FP16, CPU'da FP32)"""
+    return 'float16' if device == 'cuda' else 'float32'
+
+
+def _registry_key(model_size, device, dtype, compiled):
+    """Derlenmiş decoder'lı model ayrı tutulur (derlenmemiş isteyenler onu paylaşmaz)"""
+    key = (model_size, device, dtype or default_dtype(device))
+    return key + ('compiled',) if compiled else key
+
+
+def _key_name(key):
+    return '/'.join(key)
+
+
+def _stats_for(key):
+    return _load_stats.setdefault(_key_name(key), {
+        'cold_loads': 0,
+        'warm_hits': 0,
+        'load_seconds': None,
+        'mmap_bytes': 0,
+    })
+
+
+def get_processor(model_size):
+    """
+    Processor'ı (tokenizer + feature extractor) döndürür
+
+    Processor cihazdan bağımsızdır, model boyutu başına bir kez yüklenir
+    """
+    model_name = model_name_for(model_size)
+    with _lock:
+        if model_name not in _processors:
+            _processors[model_name] = AutoProcessor.from_pretrained(model_name)
+        return _processors[model_name]
+
+
+def _find_safetensors_files(model_name):
+    """Yerel klasör veya HF önbelleğindeki safetensors dosyalarını bulur (yoksa [])"""
+    if os.path.isdir(model_name):
+        def resolve(filename):
+            path = os.path.join(model_name, filename)
+            return path if os.path.isfile(path) else None
+    else:
+        from huggingface_hub import try_to_load_from_cache
+
+        def resolve(filename):
+            path = try_to_load_from_cache(model_name, filename)
+            return path if isinstance(path, str) else None
+
+    single = resolve('model.safetensors')
+    if single:
+        return [single]
+
+    # Parçalı checkpoint (large model)
+    index = resolve('model.safetensors.index.json')
+    if not index:
+        return []
+    with open(index, 'r', encoding='utf-8') as f:
+        shards = sorted(set(json.load(f)['weight_map'].values()))
+    paths = [resolve(shard) for shard in shards]
+    return paths if all(paths) else []
+
+
+def mmap_safetensors(path):
+    """
+    Safetensors dosyasını kopyalamadan tensörlere açar
+
+    Dosya MAP_PRIVATE ile map edilir: sayfalar diğer process'lerle paylaşılır,
+    yazma olursa sadece o sayfa kopyalanır (dosya değişmez)
+
+    Returns:
+        dict: isim → dosyaya bağlı tensor
+    """
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=os.path.getsize(path))
+    buffer = torch.empty(0, dtype=torch.uint8)
+    buffer.set_(storage)
+
+    data_start = 8 + header_size
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__' or info['dtype'] not in SAFETENSORS_DTYPES:
+            continue
+        begin, end = info['data_offsets']
+        raw = buffer[data_start + begin:data_start + end]
+        try:
+            tensors[name] = raw.view(SAFETENSORS_DTYPES[info['dtype']]).view(info['shape'])
+        except RuntimeError:
+            # Hizalanmamış tensör - bu ağırlık normal (özel) bellekte kalır
+            continue
+    return tensors
+
+
+def _weight_slots(model):
+    """
+    Checkpoint adı → (modül, yerel ad, parametre mi) eşlemesi
+
+    Paylaşılan (tied) ağırlıkların tüm yolları ve weight_norm parametrizasyonlarının
+    checkpoint adları (weight_g / weight_v) da eklenir
+    """
+    slots = {}
+    for module_name, module in model.named_modules(remove_duplicate=False):
+        prefix = f"{module_name}." if module_name else ""
+        for local, is_param in [(n, True) for n in module._parameters] + [(n, False) for n in module._buffers]:
+            name = prefix + local
+            slots[name] = (module, local, is_param)
+            for original, legacy in (('parametrizations.weight.original0', 'weight_g'),
+                                     ('parametrizations.weight.original1', 'weight_v')):
+                if name.endswith(original):
+                    slots[name[:-len(original)] + legacy] = (module, local, is_param)
+    return slots
+
+
+def _bind_mmap_weights(model, files):
+    """
+    Modelin ağırlıklarını safetensors map'ine bağlar (önceki tensörler - meta veya
+    özel kopya - serbest kalır)
+
+    Returns:
+        int: Dosyaya bağlanan byte sayısı
+    """
+    slots = _weight_slots(model)
+    replacements = {}
+    bound = 0
+    for path in files:
+        for name, tensor in mmap_safetensors(path).items():
+            slot = slots.get(name)
+            if slot is None:
+                continue
+            module, local, is_param = slot
+            current = (module._parameters if is_param else module._buffers)[local]
+            if current is None or current.shape != tensor.shape or current.dtype != tensor.dtype:
+                continue
+            if id(current) not in replacements:
+                replacements[id(current)] = (torch.nn.Parameter(tensor, requires_grad=False)
+                                             if is_param else tensor)
+                bound += tensor.numel() * tensor.element_size()
+
+    # Aynı tensörü paylaşan tüm yollar aynı map'li tensöre bağlanır
+    for module, local, is_param in slots.values():
+        table = module._parameters if is_param else module._buffers
+        current = table[local]
+        if current is not None and id(current) in replacements:
+            table[local] = replacements[id(current)]
+    return bound
+
+
+def _load_mmap(model_name, files):
+    """
+    Modeli ağırlık ayırmadan (meta cihazında) kurup safetensors map'ine bağlar
+
+    Ağırlıkların özel bir kopyası hiç oluşmaz, tepe RSS da düşer. Checkpoint'te
+    karşılığı bulunamayan ağırlık kalırsa None döner (normal yüklemeye düşülür)
+    """
+    from accelerate import init_empty_weights
+    from transformers import GenerationConfig
+
+    config = MusicgenForConditionalGeneration.config_class.from_pretrained(model_name)
+    with init_empty_weights():
+        model = MusicgenForConditionalGeneration(config)
+    # Paylaşılan ağırlıklar (ör. T5 embed_tokens ↔ shared) bağlanmadan önce aynı tensör olmalı
+    model.tie_weights()
+    try:
+        model.generation_config = GenerationConfig.from_pretrained(model_name)
+    except OSError:
+        pass
+
+    mmap_bytes = _bind_mmap_weights(model, files)
+    unbound = [name for name, param in model.named_parameters() if param.is_meta]
+    if unbound:
+        print(f"   ⚠️  {len(unbound)} weight(s) not found in safetensors (e.g. {unbound[0]}), "
+              f"loading normally")
+        return None, 0
+    return model, mmap_bytes
+
+
+def _compile_decoder(model):
+    """Decoder adımını torch.compile ile derler (başarısızsa eager kalır)"""
+    try:
+        model.decoder.forward = torch.compile(model.decoder.forward, dynamic=True)
+        print("   ⚡ Decoder step compiled with torch.compile")
+    except Exception as e:
+        print(f"   ⚠️  torch.compile unavailable ({e}), running eager")
+
+
+def _load(model_size, device, dtype, compiled):
+    model_name = model_name_for(model_size)
+    torch_dtype = MODEL_DTYPES[dtype]
+
+    model, mmap_bytes = None, 0
+    if device == 'cpu' and torch_dtype == torch.float32:
+        files = _find_safetensors_files(model_name)
+        if files:
+            model, mmap_bytes = _load_mmap(model_name, files)
+    if model is None:
+        model = MusicgenForConditionalGeneration.from_pretrained(model_name)
+        model = model.to(device=device, dtype=torch_dtype)
+
+    if dtype == 'qint8':
+        # Text/audio encoder map'te kalır, sadece decoder int8'e çevrilir
+        model.decoder = torch.ao.quantization.quantize_dynamic(
+            model.decoder, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    if compiled:
+        _compile_decoder(model)
+    model.eval()
+    return model, mmap_bytes
+
+
+def load_model(model_size='small', device='cpu', dtype=None, compiled=False):
+    """
+    (processor, model) döndürür; aynı anahtar için model tekrar yüklenmez
+
+    Args:
+        model_size: 'small', 'medium', 'large'
+        device: 'cuda' veya 'cpu'
+        dtype: 'float32', 'float16', 'bfloat16', 'qint8' veya None (cihaz varsayılanı)
+        compiled: Decoder'ı torch.compile ile derlenmiş ayrı bir kopya (CPU'da ağırlıklar
+                  aynı safetensors map'ini paylaşır)
+
+    Returns:
+        (processor, MusicgenForConditionalGeneration)
+    """
+    dtype = dtype or default_dtype(device)
+    if dtype not in MODEL_DTYPES:
+        raise ValueError(f"Unknown model dtype '{dtype}'. Available: {', '.join(MODEL_DTYPES)}")
+    key = _registry_key(model_size, device, dtype, compiled)
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Yükleme anahtar kilidi altında: farklı modeller birbirini beklemez
+    with key_lock:
+        start = time.perf_counter()
+        processor = get_processor(model_size)
+        with _lock:
+            stats = _stats_for(key)
+            model = _models.get(key)
+        if model is not None:
+            with _lock:
+                stats['warm_hits'] += 1
+            print(f"♻️  Reusing loaded {model_name_for(model_size)} ({', '.join(key[1:])})")
+            return processor, model
+
+        model, mmap_bytes = _load(model_size, device, dtype, compiled)
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _models[key] = model
+            stats['cold_loads'] += 1
+            stats['load_seconds'] = elapsed
+            stats['mmap_bytes'] = mmap_bytes
+
+    mapped = f", {mmap_bytes / 1e6:.0f}MB memory-mapped" if mmap_bytes else ""
+    print(f"   ⏱️  Cold load: {elapsed:.2f}s{mapped}")
+    return processor, model
+
+
+def unload_model(model_size='small', device='cpu', dtype=None, compiled=False):
+    """Modeli registry'den çıkarır (başka referans yoksa bellek serbest kalır)"""
+    key = _registry_key(model_size, device, dtype, compiled)
+    with _lock:
+        removed = _models.pop(key, None) is not None
+    if removed and device == 'cuda':
+        torch.cuda.empty_cache()
+    return removed
+
+
+def loaded_models():
+    """Yüklü model anahtarları ('small/cpu/float32' formatında)"""
+    with _lock:
+        return sorted(_key_name(key) for key in _models)
+
+
+def get_load_stats():
+    """
+    Anahtar başına yükleme metrikleri
+
+    Returns:
+        dict: 'small/cpu/float32' (veya 'small/cpu/float32/compiled') → {'cold_loads', 'warm_hits', 'load_seconds', 'mmap_bytes'}
+    """
+    with _lock:
+        return {name: dict(stats) for name, stats in _load_stats.items()}
@@ -4,16 +4,17 @@ Ses işleme ve bas vurgulama için post-processing
 
 import numpy as np
 import scipy.io.wavfile as wavfile
-from scipy import signal
 import argparse
 import os
 
+from eq_bank import apply_eq_bank, band_between
+
 def enhance_bass(audio, sample_rate, bass_boost_db=6.0, low_cutoff=60, high_cutoff=250):
     """
     Bas frekanslarını vurgular
     
     Args:
-        audio: Audio array (numpy)
+        audio: Audio array (numpy, mono veya [channels, samples])
         sample_rate: Sample rate
         bass_boost_db: Bas boost miktarı (dB)
         low_cutoff: Alt kesim frekansı (Hz)
@@ -23,18 +24,9 @@ def enhance_bass(audio, sample_rate, bass_boost_db=6.0, low_cutoff=60, high_cuto
     if np.max(np.abs(audio)) > 0:
         audio = audio.astype(np.float32) / np.max(np.abs(audio))
     
-    # Bas frekanslarını filtrele ve boost et
-    nyquist = sample_rate / 2
-    low = low_cutoff / nyquist
-    high = high_cutoff / nyquist
-    
-    # Bandpass filter (bas frekansları için)
-    b, a = signal.butter(4, [low, high], btype='band')
-    bass_freqs = signal.filtfilt(b, a, audio)
-    
-    # Bas'ı boost et
-    bass_boost = 10 ** (bass_boost_db / 20)  # dB'den linear'a çevir
-    enhanced_audio = audio + (bass_freqs * (bass_boost - 1))
+    # Bas bandını (low_cutoff-high_cutoff) peaking filtreyle boost et (önbellekli SOS tasarımı)
+    bands = (band_between(low_cutoff, high_cutoff, bass_boost_db),)
+    enhanced_audio = apply_eq_bank(audio, sample_rate, bands)
     
     # Normalize et (clipping önleme)
     if np.max(np.abs(enhanced_audio)) > 0:
@@ -49,9 +41,10 @@ def process_audio(input_file, output_file=None, bass_boost_db=6.0):
     # Dosyayı oku
     sample_rate, audio = wavfile.read(input_file)
     
-    # Mono'ya çevir (eğer stereo ise)
-    if len(audio.shape) > 1:
-        audio = np.mean(audio, axis=1)
+    # Stereo ise kanallar korunur: [samples, channels] → [channels, samples]
+    is_stereo = len(audio.shape) > 1
+    if is_stereo:
+        audio = audio.T
     
     # Float32'ye çevir
     audio = audio.astype(np.float32)
@@ -65,6 +58,8 @@ def process_audio(input_file, output_file=None, bass_boost_db=6.0):
     
     # Int16'ya çevir
     audio_int16 = (enhanced_audio * 32767).astype(np.int16)
+    if is_stereo:
+        audio_int16 = audio_int16.T
     
     # Çıktı dosya adı
     if output_file is None:
@@ -0,0 +1,196 @@
+"""
+MusicGen prompt embedding önbelleği
+Aynı açıklama metni tekrar tokenize edilip T5 ile encode edilmez: prompt başına
+token id'leri ve encoder hidden state'leri bellekte (LRU) ve diskte tutulur.
+Disk kullanımı boyut sınırlıdır; en uzun süredir kullanılmayan embedding'ler silinir (LRU).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import torch
+
+from cache_utils import get_cache_dir, text_hash
+
+DEFAULT_MAX_ENTRIES = 512
+
+# Disk önbelleği boyut sınırını değiştirmek için ortam değişkeni (MB)
+CACHE_SIZE_ENV = 'NEURAL_BEATS_PROMPT_CACHE_MB'
+DEFAULT_MAX_DISK_MB = 256
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class PromptEmbeddingCache:
+    """Model kimliği + encoder dtype + autocast + prompt metni → (input_ids, encoder hidden state)"""
+
+    def __init__(self, model_id, max_entries=DEFAULT_MAX_ENTRIES, use_disk=True, max_disk_bytes=None):
+        """
+        Args:
+            model_id: Model kimliği (örn: 'facebook/musicgen-small')
+            max_entries: Bellekte tutulacak maksimum prompt sayısı
+            use_disk: Embedding'leri diskte de sakla (process'ler arası paylaşım)
+            max_disk_bytes: Disk önbelleğinin maksimum toplam boyutu
+                            (None = NEURAL_BEATS_PROMPT_CACHE_MB veya 256 MB)
+        """
+        if max_disk_bytes is None:
+            max_disk_bytes = int(float(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAX_DISK_MB)) * 1024 * 1024)
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = get_cache_dir('prompt_embeddings', model_id.replace('/', '--')) if use_disk else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, desc, dtype, autocast_dtype):
+        # fp16 / bf16 çalışmanın hidden state'leri fp32 modele verilmesin
+        return text_hash(self.model_id, dtype, autocast_dtype, desc)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.pt')
+
+    def _get(self, key, device):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if self.disk_dir and os.path.exists(self._disk_path(key)):
+            try:
+                saved = torch.load(self._disk_path(key), map_location=device, weights_only=True)
+                entry = (saved['input_ids'], saved['hidden'])
+                os.utime(self._disk_path(key))  # LRU: son kullanım zamanı
+            except (OSError, RuntimeError, KeyError):
+                # Yarım yazılmış / bozuk / bu arada silinmiş dosya - yeniden encode edilir
+                return None
+            self._put(key, entry)
+            with self._lock:
+                self.disk_hits += 1
+            return entry
+        return None
+
+    def _put(self, key, entry, prompt=None):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        if prompt is not None and self.disk_dir:
+            input_ids, hidden = entry
+            path = self._disk_path(key)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            torch.save({'prompt': prompt, 'input_ids': input_ids.cpu(), 'hidden': hidden.cpu()}, tmp_path)
+            os.replace(tmp_path, path)
+            self.evict()
+
+    def evict(self):
+        """Disk önbelleği boyut sınırını aşarsa en eski kullanılan embedding'leri siler"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.pt'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.disk_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def encode(self, descriptions, processor, text_encoder, device, autocast_dtype=None):
+        """
+        Prompt'ları encode eder (önbellekte olanlar tekrar hesaplanmaz)
+
+        Args:
+            descriptions: List[str] - Müzik açıklamaları
+            processor: MusicGen processor (tokenizer)
+            text_encoder: T5 encoder (model.text_encoder)
+            device: Tensörlerin bulunacağı cihaz
+            autocast_dtype: Encode sırasında aktif autocast dtype'ı (None = autocast yok)
+
+        Returns:
+            dict: 'input_ids' [B, L], 'attention_mask' [B, L], 'encoder_hidden_states' [B, L, D]
+        """
+        dtype = text_encoder.dtype
+        keys = [self._key(desc, dtype, autocast_dtype) for desc in descriptions]
+        entries = [self._get(key, device) for key in keys]
+
+        missing = [idx for idx, entry in enumerate(entries) if entry is None]
+        if missing:
+            with self._lock:
+                self.misses += len(missing)
+            # Aynı batch'te tekrar eden prompt'lar bir kez encode edilir
+            unique = list(dict.fromkeys(descriptions[idx] for idx in missing))
+            inputs = processor(text=unique, padding=True, return_tensors="pt").to(device)
+            hidden = text_encoder(
+                input_ids=inputs['input_ids'], attention_mask=inputs['attention_mask']
+            ).last_hidden_state
+            lengths = inputs['attention_mask'].sum(dim=1).tolist()
+            encoded = {}
+            for row, desc in enumerate(unique):
+                length = int(lengths[row])
+                entry = (inputs['input_ids'][row, :length].clone(), hidden[row, :length].clone())
+                self._put(self._key(desc, dtype, autocast_dtype), entry, prompt=desc)
+                encoded[desc] = entry
+            for idx in missing:
+                entries[idx] = encoded[descriptions[idx]]
+
+        # Sağdan pad'le (padding pozisyonları attention_mask ile maskelenir), encoder dtype'ında
+        max_length = max(input_ids.shape[0] for input_ids, _ in entries)
+        hidden_size = entries[0][1].shape[-1]
+        input_ids = torch.zeros(len(entries), max_length, dtype=torch.long, device=device)
+        attention_mask = torch.zeros(len(entries), max_length, dtype=torch.long, device=device)
+        hidden = torch.zeros(len(entries), max_length, hidden_size, dtype=dtype, device=device)
+        for row, (entry_ids, entry_hidden) in enumerate(entries):
+            length = entry_ids.shape[0]
+            input_ids[row, :length] = entry_ids
+            attention_mask[row, :length] = 1
+            hidden[row, :length] = entry_hidden.to(device=device, dtype=dtype)
+
+        return {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'encoder_hidden_states': hidden,
+        }
+
+    def stats(self):
+        """Hit/miss sayaçları ve hit oranı"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+            }
+
+
+def get_prompt_cache(model_id, use_disk=True):
+    """Model kimliği başına process genelinde tek bir önbellek döndürür"""
+    with _caches_lock:
+        if model_id not in _caches:
+            _caches[model_id] = PromptEmbeddingCache(model_id, use_disk=use_disk)
+        return _caches[model_id]
+
+
+def get_cache_stats():
+    """Tüm önbelleklerin sayaçları (model kimliği → stats)"""
+    with _caches_lock:
+        return {model_id: cache.stats() for model_id, cache in _caches.items()}
@@ -3,24 +3,7 @@ Gelişmiş prompt mühendisliği araçları
 """
 
 from prompt_engineer import SOCIAL_MEDIA_PROMPTS
-
-# Müzik türüne göre önerilen mastering preset'leri
-GENRE_MASTERING_PRESETS = {
-    'rock': 'bass_heavy',
-    'metal': 'bass_heavy',
-    'rap_hiphop': 'bass_heavy',
-    'electronic': 'bass_heavy',
-    'pop': 'default',
-    'jazz': 'vocal',
-    'blues': 'vocal',
-    'classical': 'cinematic',
-    'turkish_pop': 'default',
-    'turkish_traditional': 'vocal',
-    'karadeniz': 'folk_traditional',  # Yeni preset
-    'country': 'vocal',
-    'latin': 'default',
-    'reggae': 'bass_heavy'
-}
+from mastering_presets import preset_for_genre
 
 # Müzik türüne göre önerilen ek prompt'lar
 GENRE_ENHANCEMENTS = {
@@ -71,7 +54,7 @@ def enhance_prompt_for_genre(genre, base_prompt=None, add_emotion=None, add_inst
 
 def get_mastering_preset_for_genre(genre):
     """Müzik türüne göre önerilen mastering preset'i döndürür"""
-    return GENRE_MASTERING_PRESETS.get(genre, 'default')
+    return preset_for_genre(genre)
 
 def create_social_media_prompt(genre, platform='general', mood='energetic'):
     """
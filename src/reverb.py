@@ -0,0 +1,246 @@
+"""
+FFT konvolüsyon reverb
+Sinyal, sentetik veya dosyadan yüklenen bir impulse response (IR) ile bölümlenmiş
+(uniform partitioned) FFT konvolüsyonundan geçirilir. IR bölüm spektrumları
+(sample_rate, oda preset'i / IR dosyası, bölüm boyutu) başına bir kez hesaplanır.
+Streaming bölümlenmiş motoru kullanır; tüm dizi ise sabit boyutlu bloklarda tam IR ile
+overlap-add konvolüsyondan geçer (kuyruk bloklar arasında taşınır).
+"""
+
+import functools
+import math
+import os
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+DEFAULT_PARTITION_SIZE = 2048
+# convolution_reverb (tüm dizi) işleme bloğu
+DEFAULT_BLOCK_SIZE = 65536
+
+# Oda preset'leri: (room_size, damping)
+ROOM_PRESETS = {
+    'small': (0.3, 0.5),
+    'room': (0.5, 0.5),
+    'hall': (0.9, 0.3),
+    'plate': (0.6, 0.2),
+}
+
+
+def _normalize_ir(ir):
+    """IR enerjisini 1'e ölçekler (wet sinyal, kuru sinyalle benzer seviyede)"""
+    energy = np.sqrt(np.sum(ir ** 2))
+    return ir / energy if energy > 0 else ir
+
+
+@functools.lru_cache(maxsize=32)
+def synthetic_ir(sample_rate, room_size=0.5, damping=0.5, seed=0):
+    """
+    Sentetik oda IR'ı: erken yansımalar + üstel sönümlü gürültü kuyruğu
+
+    Args:
+        sample_rate: Sample rate
+        room_size: Oda boyutu (0-1) - ön gecikme ve sönüm süresi (RT60)
+        damping: Sönümleme (0-1) - tizlerin bası göre ne kadar hızlı söndüğü
+        seed: Gürültü kuyruğu için seed (aynı parametreler → aynı IR)
+
+    Returns:
+        np.ndarray [samples] float64 (paylaşılır, değiştirilmemeli)
+    """
+    rt60 = 0.2 + 1.8 * room_size
+    predelay = int(sample_rate * 0.03 * room_size)  # 30ms base delay
+    length = predelay + int(rt60 * sample_rate)
+    ir = np.zeros(length)
+
+    # Erken yansımalar (eski gecikme hatlarıyla aynı konumlar)
+    decay = 1.0 - damping
+    if predelay > 0:
+        for i in range(3):
+            delay = int(predelay * (1 + i * 0.3))
+            ir[delay] += 0.3 * decay ** (delay / predelay)
+
+    # Difüz kuyruk: bas ve tiz bantları ayrı hızlarda söner (-60 dB @ RT60)
+    rng = np.random.default_rng(seed)
+    noise = rng.standard_normal(length - predelay)
+    t = np.arange(len(noise)) / sample_rate
+    sos = signal.butter(2, min(3000.0, sample_rate * 0.45), fs=sample_rate, output='sos')
+    low = signal.sosfiltfilt(sos, noise)
+    high = noise - low
+    high_rt60 = rt60 * (1 - 0.8 * damping)
+    tail = low * np.exp(-6.91 * t / rt60) + high * np.exp(-6.91 * t / high_rt60)
+    ir[predelay:] += 0.1 * tail
+
+    return _normalize_ir(ir)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_ir_cached(path, mtime, sample_rate):
+    ir, file_rate = sf.read(path, dtype='float64', always_2d=True)
+    ir = ir.mean(axis=1)
+    if file_rate != sample_rate:
+        divisor = math.gcd(int(file_rate), int(sample_rate))
+        ir = signal.resample_poly(ir, sample_rate // divisor, file_rate // divisor)
+    return _normalize_ir(ir)
+
+
+def load_ir(path, sample_rate):
+    """
+    IR dosyasını mono olarak yükler ve sample rate'e çevirir (dosya değişmedikçe önbellekten)
+
+    Args:
+        path: IR dosyası (wav/flac...)
+        sample_rate: Hedef sample rate
+    """
+    path = os.path.abspath(path)
+    return _load_ir_cached(path, os.path.getmtime(path), sample_rate)
+
+
+def _ir_key(sample_rate, room_size, damping, preset, ir_file):
+    """IR seçimini hashlenebilir anahtara çevirir: ir_file > preset > room_size/damping"""
+    if ir_file:
+        path = os.path.abspath(ir_file)
+        return ('file', path, os.path.getmtime(path), sample_rate)
+    if preset is not None:
+        if preset not in ROOM_PRESETS:
+            raise ValueError(f"Unknown room preset: {preset} (available: {', '.join(ROOM_PRESETS)})")
+        room_size, damping = ROOM_PRESETS[preset]
+    return ('synthetic', sample_rate, float(room_size), float(damping))
+
+
+def _ir_from_key(key):
+    if key[0] == 'file':
+        return _load_ir_cached(*key[1:])
+    return synthetic_ir(*key[1:])
+
+
+def impulse_response(sample_rate, room_size=0.5, damping=0.5, preset=None, ir_file=None):
+    """IR seçimi: ir_file > preset > room_size/damping"""
+    return _ir_from_key(_ir_key(sample_rate, room_size, damping, preset, ir_file))
+
+
+@functools.lru_cache(maxsize=32)
+def _partition_spectra(key, partition_size):
+    ir = _ir_from_key(key)
+    partitions = -(-len(ir) // partition_size)
+    padded = np.zeros(partitions * partition_size)
+    padded[:len(ir)] = ir
+    # Her bölüm 2P'ye sıfır dolgulanır (lineer konvolüsyon için)
+    return np.fft.rfft(padded.reshape(partitions, partition_size), n=2 * partition_size, axis=-1)
+
+
+def ir_spectra(sample_rate, room_size=0.5, damping=0.5, preset=None, ir_file=None,
+               partition_size=DEFAULT_PARTITION_SIZE):
+    """
+    IR bölüm spektrumları [partitions, partition_size + 1] (sample rate + oda/IR dosyası başına önbellekli)
+
+    Args:
+        sample_rate: Sample rate
+        room_size: Oda boyutu (0-1)
+        damping: Sönümleme (0-1)
+        preset: ROOM_PRESETS anahtarı
+        ir_file: IR dosyası
+        partition_size: Bölüm boyutu (örnek)
+    """
+    return _partition_spectra(_ir_key(sample_rate, room_size, damping, preset, ir_file), partition_size)
+
+
+class ConvolutionReverb:
+    """Blok blok konvolüsyon reverb (kuyruk bloklar arasında taşınır, gecikme yok)"""
+
+    def __init__(self, sample_rate, room_size=0.5, damping=0.5, wet_level=0.3,
+                 preset=None, ir_file=None, partition_size=DEFAULT_PARTITION_SIZE):
+        """
+        Args:
+            sample_rate: Sample rate
+            room_size: Oda boyutu (0-1)
+            damping: Sönümleme (0-1)
+            wet_level: Reverb seviyesi (0-1)
+            preset: ROOM_PRESETS anahtarı (room_size/damping yerine)
+            ir_file: IR dosyası (preset yerine)
+            partition_size: FFT bölüm boyutu (örnek)
+        """
+        self.wet_level = wet_level
+        self.partition_size = partition_size
+        self.spectra = ir_spectra(sample_rate, room_size, damping, preset, ir_file, partition_size)
+        self.tail = None
+
+    def _convolve(self, block):
+        """block * IR (tam uzunluk: len(block) + IR bölümleri)"""
+        P = self.partition_size
+        length = block.shape[-1]
+        chunks = -(-length // P)
+        padded = np.zeros(block.shape[:-1] + (chunks * P,))
+        padded[..., :length] = block
+        spectra = np.fft.rfft(padded.reshape(block.shape[:-1] + (chunks, P)), n=2 * P, axis=-1)
+
+        # Bölüm ekseninde konvolüsyon: Y[m] = Σ X[c]·H[m - c]
+        K = self.spectra.shape[0]
+        combined = np.zeros(block.shape[:-1] + (chunks + K - 1, P + 1), dtype=complex)
+        for k in range(K):
+            combined[..., k:k + chunks, :] += spectra * self.spectra[k]
+        frames = np.fft.irfft(combined, n=2 * P, axis=-1)
+
+        # Overlap-add (hop = P)
+        frame_count = frames.shape[-2]
+        output = np.zeros(block.shape[:-1] + ((frame_count + 1) * P,))
+        output[..., :frame_count * P] += frames[..., :P].reshape(block.shape[:-1] + (-1,))
+        output[..., P:] += frames[..., P:].reshape(block.shape[:-1] + (-1,))
+        return output
+
+    def wet(self, block):
+        """Bir bloğun reverb (wet) sinyali; önceki blokların kuyruğu eklenir"""
+        length = block.shape[-1]
+        if length == 0:
+            return np.zeros(block.shape)
+        convolved = self._convolve(block)
+        if self.tail is not None:
+            overlap = min(self.tail.shape[-1], convolved.shape[-1])
+            convolved[..., :overlap] += self.tail[..., :overlap]
+            if self.tail.shape[-1] > overlap:
+                convolved = np.concatenate([convolved, self.tail[..., overlap:]], axis=-1)
+        self.tail = convolved[..., length:]
+        return convolved[..., :length]
+
+    def process(self, block):
+        """
+        Bir bloğu işler (dry/wet karışımı)
+
+        Args:
+            block: [samples] veya [channels, samples]
+        """
+        mixed = block * (1 - self.wet_level) + self.wet(block) * self.wet_level
+        return mixed.astype(block.dtype, copy=False)
+
+
+def convolution_reverb(audio, sample_rate, room_size=0.5, damping=0.5, wet_level=0.3,
+                       preset=None, ir_file=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Tüm diziye konvolüsyon reverb uygular (çıktı giriş uzunluğunda, kuyruk kesilir)
+
+    Dizi block_size'lık bloklarda overlap-add FFT konvolüsyonundan (tam IR) geçirilir,
+    IR kuyruğu sonraki bloğa taşınır: bellek blok + IR boyutuyla sınırlı.
+
+    Args:
+        audio: [samples] veya [channels, samples]
+        sample_rate: Sample rate
+        room_size: Oda boyutu (0-1)
+        damping: Sönümleme (0-1)
+        wet_level: Reverb seviyesi (0-1)
+        preset: ROOM_PRESETS anahtarı
+        ir_file: IR dosyası
+        block_size: İşleme bloğu (örnek)
+    """
+    ir = impulse_response(sample_rate, room_size, damping, preset, ir_file)
+    ir = ir.reshape((1,) * (audio.ndim - 1) + (-1,))
+    output = np.empty(audio.shape, dtype=audio.dtype)
+    tail = None
+    for start in range(0, audio.shape[-1], block_size):
+        block = audio[..., start:start + block_size]
+        length = block.shape[-1]
+        wet = signal.oaconvolve(block, ir, axes=-1)  # len(block) + len(IR) - 1
+        if tail is not None:
+            wet[..., :tail.shape[-1]] += tail
+        tail = wet[..., length:]
+        output[..., start:start + length] = block * (1 - wet_level) + wet[..., :length] * wet_level
+    return output
@@ -0,0 +1,195 @@
+"""
+Blok blok (streaming) mastering
+Dosya sabit boyutlu bloklar halinde okunur/yazılır; EQ, kompresör ve reverb durumu
+bloklar arasında taşınır. Bellek kullanımı dosya süresinden bağımsızdır (saatlik miksler, DJ setleri).
+
+Global adımlar (giriş peak normalizasyonu, çıkış LUFS normalizasyonu ve limiter) için
+dosya birden fazla kez okunur: 1) giriş tepe değeri, 2) işlenmiş sinyalin LUFS/true-peak ölçümü,
+3) tek global kazançla işleyip int16 yazma.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import soundfile as sf
+
+from advanced_mixing import StereoWidener
+from compressor import gain_curve
+from eq_bank import EQBank, three_band
+from loudness import LoudnessMeter
+from reverb import ROOM_PRESETS, ConvolutionReverb
+
+DEFAULT_BLOCK_SIZE = 65536
+
+
+class StreamingMaster:
+    """master_audio zincirinin durum taşıyan blok blok versiyonu ([channels, samples] bloklar)"""
+
+    def __init__(self, sample_rate, bass_boost=2.0, mid_boost=0, treble_boost=1.0,
+                 compression=True, reverb=True, input_gain=1.0, reverb_preset=None, reverb_ir=None,
+                 stereo_widen=False):
+        """
+        Args:
+            sample_rate: Sample rate
+            bass_boost: Bas boost (dB)
+            mid_boost: Orta boost (dB)
+            treble_boost: Tiz boost (dB)
+            compression: Kompresyon uygula
+            reverb: Reverb ekle
+            input_gain: Girişe uygulanacak kazanç (peak normalizasyonu)
+            reverb_preset: Reverb oda preset'i
+            reverb_ir: Reverb impulse response dosyası
+            stereo_widen: Stereo genişletme (çıktı 2 kanal)
+        """
+        self.input_gain = input_gain
+        self.eq = EQBank(sample_rate, three_band(bass_boost, mid_boost, treble_boost))
+        self.compression = compression
+        self.attack_samples = int(0.003 * sample_rate)
+        self.release_samples = int(0.1 * sample_rate)
+        self.compressor_state = None
+        self.reverb = None
+        if reverb:
+            self.reverb = ConvolutionReverb(sample_rate, room_size=0.3, wet_level=0.15,
+                                            preset=reverb_preset, ir_file=reverb_ir)
+        self.widener = StereoWidener(sample_rate, width=1.3) if stereo_widen else None
+
+    def process(self, block):
+        """Bir [channels, samples] bloğu işler (global normalizasyon hariç)"""
+        block = self.eq.process(block * self.input_gain)
+        if self.compression:
+            # Stereo link: tüm kanallara aynı kazanç
+            gain, self.compressor_state = gain_curve(
+                np.abs(block).max(axis=0), threshold=0.7, ratio=4.0,
+                attack_samples=self.attack_samples, release_samples=self.release_samples,
+                state=self.compressor_state
+            )
+            block = block * gain.astype(np.float32)
+        if self.reverb is not None:
+            block = self.reverb.process(block)
+        if self.widener is not None:
+            block = self.widener.process(block)
+        return block
+
+
+def _blocks(input_file, block_size):
+    """Dosyayı float32 [channels, samples] bloklar halinde okur"""
+    with sf.SoundFile(input_file) as f:
+        for block in f.blocks(blocksize=block_size, dtype='float32', always_2d=True):
+            yield block.T
+
+
+def _input_peak(input_file, block_size):
+    peak = 0.0
+    for block in _blocks(input_file, block_size):
+        peak = max(peak, float(np.max(np.abs(block))) if block.size else 0.0)
+    return peak
+
+
+def _output_gain(measurement, target_lufs, ceiling=0.95):
+    """normalize_audio + apply_limiter'ın tek global kazanca indirgenmiş hali"""
+    gain = 1.0
+    if np.isfinite(measurement['integrated_lufs']):
+        gain = 10 ** ((target_lufs - measurement['integrated_lufs']) / 20)
+    peak = 10 ** (measurement['true_peak_dbtp'] / 20)
+    if peak * gain > ceiling:
+        gain = ceiling / peak
+    return gain
+
+
+def master_file_streaming(input_file, output_file=None,
+                          bass_boost=2.0, mid_boost=0, treble_boost=1.0,
+                          compression=True, reverb=True, stereo_widen=False,
+                          target_lufs=-14.0, block_size=DEFAULT_BLOCK_SIZE,
+                          reverb_preset=None, reverb_ir=None):
+    """
+    Dosyayı blok blok mastering'den geçirir (process_audio_advanced ile aynı zincir)
+
+    Args:
+        input_file: Giriş dosyası
+        output_file: Çıktı dosyası (None = *_mastered.wav)
+        bass_boost: Bas boost (dB)
+        mid_boost: Orta boost (dB)
+        treble_boost: Tiz boost (dB)
+        compression: Kompresyon
+        reverb: Reverb
+        stereo_widen: Stereo genişletme
+        target_lufs: Hedef LUFS
+        block_size: Blok boyutu (örnek)
+        reverb_preset: Reverb oda preset'i
+        reverb_ir: Reverb impulse response dosyası
+    """
+    if output_file is None:
+        base_name = os.path.splitext(input_file)[0]
+        output_file = f"{base_name}_mastered.wav"
+
+    info = sf.info(input_file)
+    sample_rate = info.samplerate
+    channels = 2 if stereo_widen else info.channels
+    settings = dict(bass_boost=bass_boost, mid_boost=mid_boost, treble_boost=treble_boost,
+                    compression=compression, reverb=reverb, stereo_widen=stereo_widen,
+                    reverb_preset=reverb_preset, reverb_ir=reverb_ir)
+
+    print(f"🎚️  Mastering audio (streaming, {block_size} sample blocks)...")
+    # 1. Giriş tepe değeri (peak normalizasyonu)
+    peak = _input_peak(input_file, block_size)
+    input_gain = 1.0 / peak if peak > 0 else 1.0
+
+    # 2. İşlenmiş sinyalin seviyesi (normalizasyon + limiter için)
+    print("   → Measuring processed level...")
+    chain = StreamingMaster(sample_rate, input_gain=input_gain, **settings)
+    meter = LoudnessMeter(sample_rate, channels=channels)
+    for block in _blocks(input_file, block_size):
+        meter.add(chain.process(block))
+    measurement = meter.result()
+    output_gain = _output_gain(measurement, target_lufs)
+    print(f"     {measurement['integrated_lufs']:.1f} LUFS, {measurement['true_peak_dbtp']:.1f} dBTP "
+          f"→ gain {20 * np.log10(output_gain):+.1f} dB")
+
+    # 3. Aynı zinciri tekrar çalıştırıp tek global kazançla yaz
+    print("   → Rendering...")
+    chain = StreamingMaster(sample_rate, input_gain=input_gain, **settings)
+    with sf.SoundFile(output_file, 'w', samplerate=sample_rate, channels=channels, subtype='PCM_16') as out:
+        for block in _blocks(input_file, block_size):
+            processed = chain.process(block) * output_gain
+            out.write(np.clip(processed, -1.0, 1.0).T)
+
+    print(f"✅ Mastered: {output_file}")
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming Mastering (uzun dosyalar için)')
+    parser.add_argument('input', type=str, help='Input audio file')
+    parser.add_argument('--output', type=str, default=None, help='Output file')
+    parser.add_argument('--bass-boost', type=float, default=2.0, help='Bass boost (dB)')
+    parser.add_argument('--mid-boost', type=float, default=0, help='Mid boost (dB)')
+    parser.add_argument('--treble-boost', type=float, default=1.0, help='Treble boost (dB)')
+    parser.add_argument('--no-compression', action='store_true', help='Disable compression')
+    parser.add_argument('--no-reverb', action='store_true', help='Disable reverb')
+    parser.add_argument('--stereo-widen', action='store_true', help='Enable stereo widening')
+    parser.add_argument('--target-lufs', type=float, default=-14.0, help='Target LUFS level')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE, help='Block size (samples)')
+    parser.add_argument('--reverb-preset', type=str, default=None, choices=list(ROOM_PRESETS),
+                       help='Reverb room preset')
+    parser.add_argument('--reverb-ir', type=str, default=None, help='Reverb impulse response file')
+
+    args = parser.parse_args()
+
+    master_file_streaming(
+        args.input,
+        output_file=args.output,
+        bass_boost=args.bass_boost,
+        mid_boost=args.mid_boost,
+        treble_boost=args.treble_boost,
+        compression=not args.no_compression,
+        reverb=not args.no_reverb,
+        stereo_widen=args.stereo_widen,
+        target_lufs=args.target_lufs,
+        block_size=args.block_size,
+        reverb_preset=args.reverb_preset,
+        reverb_ir=args.reverb_ir
+    )
+
+if __name__ == '__main__':
+    main()
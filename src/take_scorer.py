@@ -0,0 +1,138 @@
+"""
+Varyasyon (take) skorlama - best-of-N seçimi için
+Tüm adaylar cihaz üzerinde tek bir tensör işlemiyle skorlanır,
+yüksek skor = daha iyi take
+"""
+
+import inspect
+
+import torch
+
+CLAP_MODEL_NAME = 'laion/clap-htsat-unfused'
+CLAP_SAMPLE_RATE = 48000
+
+_clap_cache = {}
+
+
+def _to_mono(audio):
+    """[batch, channels, samples] veya [batch, samples] → [batch, samples]"""
+    if audio.dim() == 3:
+        return audio.float().mean(dim=1)
+    return audio.float()
+
+
+def score_energy(audio, sample_rate, descriptions=None):
+    """Ortalama mutlak genlik (eski varsayılan seçim kriteri)"""
+    return _to_mono(audio).abs().mean(dim=-1)
+
+
+def score_loudness(audio, sample_rate, descriptions=None):
+    """RMS seviyesi (dB)"""
+    mono = _to_mono(audio)
+    return 10 * torch.log10(mono.pow(2).mean(dim=-1) + 1e-10)
+
+
+def score_spectral_flatness(audio, sample_rate, descriptions=None):
+    """
+    Spektral düzlük (negatif) - gürültü benzeri, dağınık take'ler düşük skor alır
+    """
+    mono = _to_mono(audio)
+    n_fft = 2048 if mono.shape[-1] >= 2048 else 256
+    window = torch.hann_window(n_fft, device=mono.device)
+    power = torch.stft(mono, n_fft=n_fft, hop_length=n_fft // 4, window=window,
+                       return_complex=True).abs().pow(2) + 1e-10
+    # Geometrik ortalama / aritmetik ortalama (frekans ekseninde)
+    flatness = torch.exp(power.log().mean(dim=1)) / power.mean(dim=1)
+    return -flatness.mean(dim=-1)
+
+
+def _load_clap(device):
+    if device not in _clap_cache:
+        from transformers import ClapModel, ClapProcessor
+        print(f"   📥 Loading {CLAP_MODEL_NAME} for prompt similarity scoring...")
+        processor = ClapProcessor.from_pretrained(CLAP_MODEL_NAME)
+        model = ClapModel.from_pretrained(CLAP_MODEL_NAME).to(device).eval()
+        _clap_cache[device] = (processor, model)
+    return _clap_cache[device]
+
+
+def _audio_keyword(processor):
+    """ClapProcessor'ın ses argümanı: eski transformers 'audios=', yenileri 'audio=' bekler"""
+    parameters = inspect.signature(processor.__call__).parameters
+    return 'audios' if 'audios' in parameters else 'audio'
+
+
+def score_clap(audio, sample_rate, descriptions=None):
+    """
+    Prompt-audio CLAP benzerliği (cosine). CLAP yüklenemezse (kurulu değil / indirilemedi)
+    enerjiye düşer; skorlama sırasındaki hatalar yukarı iletilir
+    """
+    if not descriptions:
+        return score_energy(audio, sample_rate)
+
+    try:
+        import torchaudio
+        processor, model = _load_clap(str(audio.device))
+    except (ImportError, OSError) as e:
+        print(f"   ⚠️  CLAP scorer unavailable ({e}), falling back to energy")
+        return score_energy(audio, sample_rate)
+
+    mono = _to_mono(audio)
+    if sample_rate != CLAP_SAMPLE_RATE:
+        mono = torchaudio.functional.resample(mono, sample_rate, CLAP_SAMPLE_RATE)
+
+    with torch.no_grad():
+        inputs = processor(
+            text=list(descriptions),
+            sampling_rate=CLAP_SAMPLE_RATE,
+            padding=True,
+            return_tensors='pt',
+            **{_audio_keyword(processor): [clip.cpu().numpy() for clip in mono]}
+        ).to(mono.device)
+        text_embeds = model.get_text_features(input_ids=inputs['input_ids'],
+                                              attention_mask=inputs['attention_mask'])
+        audio_embeds = model.get_audio_features(input_features=inputs['input_features'])
+    return torch.nn.functional.cosine_similarity(audio_embeds, text_embeds, dim=-1)
+
+
+TAKE_SCORERS = {
+    'energy': score_energy,
+    'loudness': score_loudness,
+    'flatness': score_spectral_flatness,
+    'clap': score_clap,
+}
+
+
+def get_scorer(scorer):
+    """İsim veya callable(audio, sample_rate, descriptions) → skor fonksiyonu"""
+    if callable(scorer):
+        return scorer
+    if scorer not in TAKE_SCORERS:
+        raise ValueError(f"Unknown scorer '{scorer}'. Available: {', '.join(TAKE_SCORERS)}")
+    return TAKE_SCORERS[scorer]
+
+
+def select_best_takes(candidates, sample_rate, scorer='energy', descriptions=None):
+    """
+    Her prompt için en iyi varyasyonu seçer
+
+    Args:
+        candidates: Tensor [num_descriptions, num_generations, channels, samples]
+        sample_rate: Sample rate
+        scorer: Skorlayıcı adı ('energy', 'loudness', 'flatness', 'clap') veya callable
+        descriptions: List[str] - Prompt'lar (CLAP için)
+
+    Returns:
+        (Tensor [num_descriptions, channels, samples], Tensor [num_descriptions] - seçilen indeksler)
+    """
+    num_descriptions, num_generations = candidates.shape[:2]
+    flat = candidates.flatten(0, 1)
+
+    repeated_descriptions = None
+    if descriptions is not None:
+        repeated_descriptions = [desc for desc in descriptions for _ in range(num_generations)]
+
+    scores = get_scorer(scorer)(flat, sample_rate, repeated_descriptions)
+    best_indices = scores.view(num_descriptions, num_generations).argmax(dim=1)
+    best = candidates[torch.arange(num_descriptions, device=candidates.device), best_indices]
+    return best, best_indices
@@ -5,9 +5,10 @@ Medium model indirme durumunu kontrol eder ve hazır olunca test eder
 import os
 import sys
 from pathlib import Path
-from transformers import AutoProcessor, MusicgenForConditionalGeneration
 import torch
 
+import model_registry
+
 def check_model_downloaded():
     """Model indirilmiş mi kontrol et"""
     try:
@@ -16,8 +17,8 @@ def check_model_downloaded():
         if not cache_dir.exists():
             return False
         
-        # pytorch_model.bin dosyasını kontrol et
-        model_files = list(cache_dir.rglob('pytorch_model.bin'))
+        # model.safetensors (tercih edilen, mmap ile yüklenir) veya pytorch_model.bin
+        model_files = list(cache_dir.rglob('model.safetensors')) or list(cache_dir.rglob('pytorch_model.bin'))
         if not model_files:
             return False
         
@@ -44,13 +45,12 @@ def test_medium_model():
     print("="*60 + "\n")
     
     try:
-        print("📥 Loading processor...")
-        processor = AutoProcessor.from_pretrained('facebook/musicgen-medium')
-        print("✅ Processor loaded!")
+        device = "cuda" if torch.cuda.is_available() else "cpu"
         
-        print("\n📥 Loading model (this may take a while)...")
-        model = MusicgenForConditionalGeneration.from_pretrained('facebook/musicgen-medium')
+        print("📥 Loading processor and model (this may take a while)...")
+        processor, model = model_registry.load_model('medium', device)
         print("✅ Model loaded!")
+        print(f"   Load stats: {model_registry.get_load_stats()}")
         
         # Test prompt
         prompt = "Turkish Black Sea music (Karadeniz müziği), kemenche (Karadeniz kemençesi), tulum (Karadeniz bagpipe), drums, bass, 91 BPM, traditional Turkish Black Sea style, energetic, rhythmic, folk music, melodic, emotional, regional Turkish music, authentic Karadeniz sound, modern production, professional quality"
@@ -64,8 +64,6 @@ def test_medium_model():
             return_tensors="pt",
         )
         
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        model.to(device)
         inputs = {k: v.to(device) for k, v in inputs.items()}
         
         print(f"   Using device: {device}")
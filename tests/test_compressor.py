@@ -0,0 +1,81 @@
+"""
+Vektörel kompresör testleri (eski örnek-örnek döngüyle birebir karşılaştırma)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from compressor import compress, gain_curve
+
+SAMPLE_RATE = 32000
+
+
+def reference_compression(audio, threshold=0.7, ratio=4.0, attack=0.003, release=0.1, sample_rate=SAMPLE_RATE):
+    """Eski apply_compression döngüsü (referans)"""
+    attack_samples = int(attack * sample_rate)
+    release_samples = int(release * sample_rate)
+    envelope = np.abs(audio)
+    gain_reduction = np.ones_like(audio)
+    for i in range(1, len(audio)):
+        if envelope[i] > threshold:
+            target_level = threshold + (envelope[i] - threshold) / ratio
+            reduction = target_level / envelope[i]
+            if gain_reduction[i-1] > reduction:
+                gain_reduction[i] = gain_reduction[i-1] - (gain_reduction[i-1] - reduction) / attack_samples
+            else:
+                gain_reduction[i] = reduction
+        else:
+            if gain_reduction[i-1] < 1.0:
+                gain_reduction[i] = gain_reduction[i-1] + (1.0 - gain_reduction[i-1]) / release_samples
+            else:
+                gain_reduction[i] = 1.0
+    return audio * gain_reduction
+
+
+def make_signal(seconds=1.0, seed=0):
+    """Eşiği sık sık aşan vuruşlu sinyal"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    hits = np.exp(-((t * 4) % 1.0) * 12)
+    return np.sin(2 * np.pi * 220 * t) * hits + 0.05 * rng.standard_normal(len(t))
+
+
+@pytest.mark.parametrize('threshold, ratio, attack, release', [
+    (0.7, 4.0, 0.003, 0.1),
+    (0.3, 8.0, 0.001, 0.05),
+    (0.5, 2.0, 0.02, 0.3),
+])
+def test_matches_reference_loop(threshold, ratio, attack, release):
+    audio = make_signal()
+    expected = reference_compression(audio, threshold, ratio, attack, release)
+    result = compress(audio, threshold, ratio, attack, release, sample_rate=SAMPLE_RATE)
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_blocks_match_single_pass():
+    envelope = np.abs(make_signal(seconds=2.0, seed=1))
+    whole, whole_state = gain_curve(envelope, block_size=len(envelope))
+    blocked, blocked_state = gain_curve(envelope, block_size=1000)
+    np.testing.assert_allclose(blocked, whole, rtol=1e-12, atol=1e-12)
+    assert blocked_state == pytest.approx(whole_state)
+
+
+def test_stereo_link_applies_one_gain_to_all_channels():
+    left = make_signal(seed=2)
+    stereo = np.stack([left, 0.5 * left])
+    result = compress(stereo, sample_rate=SAMPLE_RATE)
+    # Kazanç yüksek kanaldan belirlenir, sessiz kanal aynı oranda kısılır
+    np.testing.assert_allclose(result[0], reference_compression(left))
+    np.testing.assert_allclose(result[1], 0.5 * result[0])
+
+
+def test_keeps_dtype_and_shape():
+    audio = make_signal().astype(np.float32)
+    result = compress(audio, sample_rate=SAMPLE_RATE)
+    assert result.dtype == np.float32
+    assert result.shape == audio.shape
@@ -0,0 +1,56 @@
+"""
+generate_long pencere birleştirme testleri (model yüklenmez, sahte generate kullanılır)
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from generate import MusicGenerator
+
+SAMPLE_RATE = 32000
+HOP_LENGTH = 640  # 50 frame/s
+
+
+class FakeInputs(dict):
+    def to(self, device):
+        return self
+
+
+def fake_generator():
+    """Model yüklemeden generate_long'un kullandığı alanları kuran MusicGenerator"""
+    generator = MusicGenerator.__new__(MusicGenerator)
+    generator.device = 'cpu'
+    generator.sample_rate = SAMPLE_RATE
+    generator.model = SimpleNamespace(config=SimpleNamespace(audio_encoder=SimpleNamespace(hop_length=HOP_LENGTH)))
+    generator._text_inputs = lambda descriptions: FakeInputs()
+    generator.processor = lambda audio, sampling_rate, return_tensors: FakeInputs(prompt=np.asarray(audio))
+
+    def model_generate(inputs, guidance_scale, max_new_tokens):
+        # Gerçek model gibi: çıktı = audio prompt + yeni frame'ler
+        prompt = inputs.get('prompt', np.zeros(0, dtype=np.float32))
+        new = np.full(max_new_tokens * HOP_LENGTH, 0.5, dtype=np.float32)
+        return torch.from_numpy(np.concatenate([prompt, new]))[None, None]
+    generator._model_generate = model_generate
+    return generator
+
+
+def test_windows_cover_full_duration(tmp_path):
+    output_file = str(tmp_path / 'long.wav')
+    fake_generator().generate_long('test', output_file, duration=70, window=30, overlap=5)
+    assert sf.info(output_file).frames == 70 * SAMPLE_RATE
+
+
+@pytest.mark.parametrize('overlap', [0, 0.01])
+def test_overlap_shorter_than_a_frame_is_rejected(tmp_path, overlap):
+    output_file = str(tmp_path / 'long.wav')
+    with pytest.raises(ValueError):
+        fake_generator().generate_long('test', output_file, duration=70, window=30, overlap=overlap)
+    assert not os.path.exists(output_file)
@@ -0,0 +1,94 @@
+"""
+BS.1770 loudness ölçer testleri (standart katsayılar ve doğrudan gating referansıyla)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from loudness import LoudnessMeter, integrated_loudness, k_weighting_sos, measure_loudness
+
+SAMPLE_RATE = 48000
+
+# ITU-R BS.1770-4 Tablo 1 ve 2 (48 kHz)
+BS1770_SHELF_B = [1.53512485958697, -2.69169618940638, 1.19839281085285]
+BS1770_SHELF_A = [1.0, -1.69065929318241, 0.73248077421585]
+BS1770_HIGHPASS_B = [1.0, -2.0, 1.0]
+BS1770_HIGHPASS_A = [1.0, -1.99004745483398, 0.99007225036621]
+
+
+def reference_loudness(audio, sample_rate=SAMPLE_RATE):
+    """BS.1770 integrated loudness: 48 kHz tablo katsayıları, açık 400 ms / %75 bloklar"""
+    audio = np.atleast_2d(audio)
+    weighted = signal.lfilter(BS1770_SHELF_B, BS1770_SHELF_A, audio, axis=-1)
+    weighted = signal.lfilter(BS1770_HIGHPASS_B, BS1770_HIGHPASS_A, weighted, axis=-1)
+
+    block, step = int(0.4 * sample_rate), int(0.1 * sample_rate)
+    starts = range(0, audio.shape[-1] - block + 1, step)
+    power = np.array([np.mean(weighted[:, s:s + block] ** 2, axis=-1).sum() for s in starts])
+    loudness = -0.691 + 10 * np.log10(power)
+
+    gated = power[loudness > -70]
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10
+    gated = power[(loudness > -70) & (loudness > relative_gate)]
+    return -0.691 + 10 * np.log10(gated.mean())
+
+
+def program(seconds=6.0, channels=2, seed=0):
+    """Seviyesi değişen (bir kısmı relative gate altında) gürültü + ton"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = np.where(t < seconds / 3, 0.02, 0.3) * (1 + 0.5 * np.sin(2 * np.pi * 0.7 * t))
+    audio = np.sin(2 * np.pi * 440 * t) * envelope + 0.1 * envelope * rng.standard_normal((channels, len(t)))
+    return audio
+
+
+def test_k_weighting_matches_bs1770_coefficients():
+    shelf, highpass = k_weighting_sos(SAMPLE_RATE)
+    np.testing.assert_allclose(shelf[:3], BS1770_SHELF_B, rtol=1e-6)
+    np.testing.assert_allclose(shelf[3:], BS1770_SHELF_A, rtol=1e-6)
+    np.testing.assert_allclose(highpass[:3], BS1770_HIGHPASS_B, rtol=1e-6)
+    np.testing.assert_allclose(highpass[3:], BS1770_HIGHPASS_A, rtol=1e-6)
+
+
+@pytest.mark.parametrize('channels', [1, 2])
+def test_integrated_loudness_matches_reference(channels):
+    audio = program(channels=channels)
+    assert integrated_loudness(audio, SAMPLE_RATE) == pytest.approx(reference_loudness(audio), abs=1e-4)
+
+
+def test_full_scale_sine_reads_minus_three_lufs():
+    # BS.1770: tek kanalda 0 dBFS 997 Hz sinüs → -3.01 LUFS
+    t = np.arange(5 * SAMPLE_RATE) / SAMPLE_RATE
+    audio = np.sin(2 * np.pi * 997 * t)
+    assert integrated_loudness(audio, SAMPLE_RATE) == pytest.approx(-3.01, abs=0.02)
+
+
+def test_blockwise_feeding_matches_one_shot():
+    audio = program(seed=1)
+    meter = LoudnessMeter(SAMPLE_RATE, channels=2)
+    for start in range(0, audio.shape[-1], 12345):
+        meter.add(audio[:, start:start + 12345])
+    blockwise = meter.result()
+    whole = measure_loudness(audio, SAMPLE_RATE)
+    assert blockwise['integrated_lufs'] == pytest.approx(whole['integrated_lufs'], abs=1e-9)
+    assert blockwise['true_peak_dbtp'] == pytest.approx(whole['true_peak_dbtp'], abs=1e-6)
+    assert blockwise['duration'] == pytest.approx(whole['duration'])
+
+
+def test_true_peak_finds_intersample_peak():
+    # fs/4 sinüs 45° fazla: tüm örnekler ±0.707, gerçek tepe 1.0
+    n = np.arange(SAMPLE_RATE)
+    audio = np.sin(2 * np.pi * n / 4 + np.pi / 4)
+    result = measure_loudness(audio, SAMPLE_RATE)
+    assert result['sample_peak_dbfs'] == pytest.approx(-3.01, abs=0.01)
+    assert result['true_peak_dbtp'] == pytest.approx(0.0, abs=0.2)
+
+
+def test_silence_is_minus_infinity():
+    assert integrated_loudness(np.zeros((2, SAMPLE_RATE)), SAMPLE_RATE) == float('-inf')
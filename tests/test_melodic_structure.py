@@ -0,0 +1,69 @@
+"""
+Key tespiti ve melodik kontur testleri (eski döngülü implementasyonla karşılaştırma)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from detailed_audio_analyzer import KEY_NAMES, MAJOR_PROFILE, MINOR_PROFILE, dominant_pitches, estimate_key
+
+
+def reference_key(chroma_mean):
+    """Eski 12 x 2 np.corrcoef döngüsü"""
+    best_key, best_mode, best_correlation = None, None, -1
+    for i, key in enumerate(KEY_NAMES):
+        corr_major = np.corrcoef(chroma_mean, np.roll(MAJOR_PROFILE, i))[0, 1]
+        corr_minor = np.corrcoef(chroma_mean, np.roll(MINOR_PROFILE, i))[0, 1]
+        if corr_major > best_correlation:
+            best_key, best_mode, best_correlation = key, 'major', corr_major
+        if corr_minor > best_correlation:
+            best_key, best_mode, best_correlation = key, 'minor', corr_minor
+    return best_key, best_mode, best_correlation
+
+
+def reference_pitches(pitches, magnitudes, threshold=0.1):
+    """Eski frame başına argmax döngüsü"""
+    values = []
+    for t in range(pitches.shape[1]):
+        idx = np.argmax(pitches[:, t])
+        if magnitudes[idx, t] > threshold:
+            values.append(pitches[idx, t])
+    return np.array(values)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_key_matches_reference_loop(seed):
+    chroma_mean = np.random.default_rng(seed).random(12)
+    key, mode, correlation = estimate_key(chroma_mean)
+    ref_key, ref_mode, ref_correlation = reference_key(chroma_mean)
+    assert (key, mode) == (ref_key, ref_mode)
+    assert correlation == pytest.approx(ref_correlation, abs=1e-12)
+
+
+@pytest.mark.parametrize('shift, profile, expected', [
+    (0, MAJOR_PROFILE, ('C', 'major')),
+    (9, MINOR_PROFILE, ('A', 'minor')),
+    (6, MAJOR_PROFILE, ('F#', 'major')),
+])
+def test_key_profile_is_recognised(shift, profile, expected):
+    key, mode, correlation = estimate_key(np.roll(profile, shift))
+    assert (key, mode) == expected
+    assert correlation == pytest.approx(1.0)
+
+
+def test_flat_chroma_has_no_key():
+    assert estimate_key(np.full(12, 0.5)) == (None, None, -1)
+
+
+def test_dominant_pitches_match_reference_loop():
+    rng = np.random.default_rng(0)
+    # piptrack gibi seyrek: çoğu bin 0, bazı frame'ler tamamen sessiz
+    pitches = rng.uniform(50, 2000, (64, 300)) * (rng.random((64, 300)) < 0.1)
+    magnitudes = rng.random((64, 300)) * 0.3
+    pitches[:, :20] = 0
+    np.testing.assert_array_equal(dominant_pitches(pitches, magnitudes), reference_pitches(pitches, magnitudes))
@@ -0,0 +1,74 @@
+"""
+Konvolüsyon reverb testleri (doğrudan np.convolve referansıyla)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reverb import ConvolutionReverb, convolution_reverb, impulse_response
+
+SAMPLE_RATE = 8000
+WET_LEVEL = 0.3
+
+
+def reference_reverb(audio, ir, wet_level=WET_LEVEL):
+    """Tam doğrusal konvolüsyon, giriş uzunluğunda kesilmiş dry/wet karışımı"""
+    audio = np.atleast_2d(audio)
+    wet = np.stack([np.convolve(channel, ir)[:audio.shape[-1]] for channel in audio])
+    return audio * (1 - wet_level) + wet * wet_level
+
+
+def make_audio(seconds=2.0, channels=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((channels, int(seconds * SAMPLE_RATE)))
+
+
+@pytest.mark.parametrize('block_size', [65536, 3000, 777])
+def test_one_shot_matches_direct_convolution(block_size):
+    audio = make_audio()
+    ir = impulse_response(SAMPLE_RATE, preset='small')
+    result = convolution_reverb(audio, SAMPLE_RATE, wet_level=WET_LEVEL, preset='small', block_size=block_size)
+    np.testing.assert_allclose(result, reference_reverb(audio, ir), atol=1e-9)
+
+
+def test_one_shot_mono_keeps_shape():
+    audio = make_audio(channels=1)[0]
+    ir = impulse_response(SAMPLE_RATE, preset='room')
+    result = convolution_reverb(audio, SAMPLE_RATE, wet_level=WET_LEVEL, preset='room', block_size=5000)
+    assert result.shape == audio.shape
+    np.testing.assert_allclose(result, reference_reverb(audio, ir)[0], atol=1e-9)
+
+
+@pytest.mark.parametrize('block_size, partition_size', [(4096, 1024), (1000, 256), (100, 512)])
+def test_streaming_blocks_match_direct_convolution(block_size, partition_size):
+    audio = make_audio(seed=1)
+    ir = impulse_response(SAMPLE_RATE, preset='hall')
+    reverb = ConvolutionReverb(SAMPLE_RATE, wet_level=WET_LEVEL, preset='hall', partition_size=partition_size)
+    result = np.concatenate([reverb.process(audio[:, start:start + block_size])
+                             for start in range(0, audio.shape[-1], block_size)], axis=-1)
+    np.testing.assert_allclose(result, reference_reverb(audio, ir), atol=1e-9)
+
+
+def test_ir_file_is_resampled_and_used(tmp_path):
+    rng = np.random.default_rng(2)
+    ir_file = str(tmp_path / 'ir.wav')
+    sf.write(ir_file, rng.standard_normal(2 * SAMPLE_RATE // 10) * 0.1, 2 * SAMPLE_RATE, subtype='FLOAT')
+
+    ir = impulse_response(SAMPLE_RATE, ir_file=ir_file)
+    assert len(ir) == SAMPLE_RATE // 10
+    assert np.sum(ir ** 2) == pytest.approx(1.0)
+
+    audio = make_audio(seconds=0.5, seed=3)
+    result = convolution_reverb(audio, SAMPLE_RATE, wet_level=WET_LEVEL, ir_file=ir_file, preset='hall')
+    np.testing.assert_allclose(result, reference_reverb(audio, ir), atol=1e-9)
+
+
+def test_unknown_preset_is_rejected():
+    with pytest.raises(ValueError):
+        ConvolutionReverb(SAMPLE_RATE, preset='cathedral')